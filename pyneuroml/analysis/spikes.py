@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+Utilities for analysing spike times.
+
+These work on whole arrays of spike times at once instead of looping over
+individual cells or bins in Python, so that they remain usable for large
+networks.
+
+File: pyneuroml/analysis/spikes.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import logging
+import typing
+from collections import OrderedDict
+
+import numpy
+from neuroml import Network
+
+from pyneuroml.lems import get_pop_index
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+RATE_KERNELS = ["gaussian", "exponential", "box"]
+
+
+def _rate_kernel(kernel: str, kernel_width: float, bin_size: float) -> numpy.ndarray:
+    """Get a normalised smoothing kernel sampled at the bin size.
+
+    :param kernel: type of kernel, one of :py:data:`RATE_KERNELS`
+    :type kernel: str
+    :param kernel_width: width of kernel in units of time: standard deviation
+        for "gaussian", time constant for "exponential", total width for "box"
+    :type kernel_width: float
+    :param bin_size: size of each bin in units of time
+    :type bin_size: float
+    :returns: kernel values, summing to 1
+    :rtype: numpy.ndarray
+    :raises ValueError: if an unknown kernel is requested
+    """
+    width_bins = kernel_width / bin_size
+    if kernel == "gaussian":
+        half = max(int(numpy.ceil(4 * width_bins)), 1)
+        x = numpy.arange(-half, half + 1)
+        values = numpy.exp(-0.5 * (x / max(width_bins, 1e-12)) ** 2)
+    elif kernel == "exponential":
+        length = max(int(numpy.ceil(5 * width_bins)), 1)
+        x = numpy.arange(0, length)
+        values = numpy.exp(-x / max(width_bins, 1e-12))
+    elif kernel == "box":
+        values = numpy.ones(max(int(round(width_bins)), 1))
+    else:
+        raise ValueError(f"Unknown kernel: {kernel}. Must be one of {RATE_KERNELS}")
+
+    return values / values.sum()
+
+
+def _fft_convolve(signal: numpy.ndarray, kernel: numpy.ndarray) -> numpy.ndarray:
+    """Convolve using the FFT, returning the full convolution.
+
+    :param signal: signal to convolve
+    :type signal: numpy.ndarray
+    :param kernel: kernel to convolve with
+    :type kernel: numpy.ndarray
+    :returns: full convolution, of length len(signal) + len(kernel) - 1
+    :rtype: numpy.ndarray
+    """
+    n = len(signal) + len(kernel) - 1
+    # use a fast length for the transforms
+    nfft = 1 << int(numpy.ceil(numpy.log2(n)))
+    result = numpy.fft.irfft(
+        numpy.fft.rfft(signal, nfft) * numpy.fft.rfft(kernel, nfft), nfft
+    )
+    return result[:n]
+
+
+def smooth_rate(
+    rate: numpy.ndarray, bin_size: float, kernel: str, kernel_width: float
+) -> numpy.ndarray:
+    """Smooth a binned rate using a kernel, through FFT convolution.
+
+    The "gaussian" and "box" kernels are centred on each bin. The
+    "exponential" kernel is causal: each bin only includes contributions
+    from itself and earlier bins.
+
+    .. versionadded:: 1.3.9
+
+    :param rate: binned rate to smooth
+    :type rate: numpy.ndarray
+    :param bin_size: size of each bin in units of time
+    :type bin_size: float
+    :param kernel: type of kernel, one of "gaussian", "exponential", "box"
+    :type kernel: str
+    :param kernel_width: width of kernel in units of time: standard deviation
+        for "gaussian", time constant for "exponential", total width for "box"
+    :type kernel_width: float
+    :returns: smoothed rate, with the same length as `rate`
+    :rtype: numpy.ndarray
+    """
+    kvalues = _rate_kernel(kernel, kernel_width, bin_size)
+    full = _fft_convolve(numpy.asarray(rate, dtype=float), kvalues)
+    if kernel == "exponential":
+        start = 0
+    else:
+        start = (len(kvalues) - 1) // 2
+    return full[start : start + len(rate)]
+
+
+def population_rate(
+    times: typing.Union[numpy.ndarray, typing.Sequence[float]],
+    num_cells: int = 1,
+    t_start: typing.Optional[float] = None,
+    t_stop: typing.Optional[float] = None,
+    bin_size: typing.Optional[float] = None,
+    num_bins: int = 500,
+    kernel: typing.Optional[str] = None,
+    kernel_width: typing.Optional[float] = None,
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """Calculate the mean firing rate per cell of a population.
+
+    All spike times of the population are binned at once, and the counts
+    are divided by the number of cells and the bin size. The rate is in
+    units of 1/(units of `times`): so if spike times are in seconds, the rate
+    is in Hz.
+
+    .. versionadded:: 1.3.9
+
+    .. seealso::
+
+        :py:func:`population_rates`
+            for calculating rates of all populations in a simulation
+
+    :param times: spike times of all cells in the population
+    :type times: array like
+    :param num_cells: number of cells in the population, including silent
+        ones
+    :type num_cells: int
+    :param t_start: start time, defaults to the earliest spike time
+    :type t_start: float
+    :param t_stop: end time, defaults to the latest spike time
+    :type t_stop: float
+    :param bin_size: size of each bin in units of time; if given,
+        `num_bins` is ignored
+    :type bin_size: float
+    :param num_bins: number of bins between `t_start` and `t_stop`
+    :type num_bins: int
+    :param kernel: optional kernel to smooth the rate with: "gaussian",
+        "exponential" or "box"
+    :type kernel: str
+    :param kernel_width: width of smoothing kernel in units of time: standard
+        deviation for "gaussian", time constant for "exponential", total
+        width for "box". Defaults to 5 bins.
+    :type kernel_width: float
+    :returns: tuple of (bin centres, rates)
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    :raises ValueError: if `num_cells` is less than 1
+    """
+    if num_cells < 1:
+        raise ValueError(f"num_cells must be at least 1, got {num_cells}")
+
+    times = numpy.asarray(times, dtype=float)
+    if t_start is None:
+        t_start = float(times.min()) if len(times) > 0 else 0.0
+    if t_stop is None:
+        t_stop = float(times.max()) if len(times) > 0 else t_start
+    if t_stop <= t_start:
+        t_stop = t_start + (bin_size if bin_size else 1.0)
+
+    if bin_size is not None:
+        num_bins = max(int(numpy.ceil((t_stop - t_start) / bin_size)), 1)
+        t_stop = t_start + num_bins * bin_size
+    else:
+        bin_size = (t_stop - t_start) / num_bins
+
+    counts, edges = numpy.histogram(times, bins=num_bins, range=(t_start, t_stop))
+    rate = counts / (num_cells * bin_size)
+
+    if kernel is not None:
+        if kernel_width is None:
+            kernel_width = 5 * bin_size
+        rate = smooth_rate(rate, bin_size, kernel, kernel_width)
+
+    centres = (edges[:-1] + edges[1:]) / 2
+    return centres, rate
+
+
+def population_rates(
+    events: typing.Dict[str, typing.Union[numpy.ndarray, typing.Sequence[float]]],
+    network: typing.Optional[Network] = None,
+    **kwargs: typing.Any,
+) -> typing.Dict[str, typing.Tuple[numpy.ndarray, numpy.ndarray]]:
+    """Calculate firing rates for each population from per-cell spike times.
+
+    The spike times are grouped into populations using the keys, which must
+    be of the forms used in LEMS event selections: :code:`pop[index]` or
+    :code:`pop/index/component`. This is the format of the events returned
+    by :py:func:`pyneuroml.lems.load_sim_data_from_lems_file`. Keys which do
+    not match either form are treated as single populations.
+
+    If a NeuroML network is provided, the sizes of its populations are used
+    as the number of cells, so that silent cells are included in the mean
+    rates. Otherwise, the number of cells with recorded events is used.
+
+    All populations are binned using the same time bins.
+
+    .. versionadded:: 1.3.9
+
+    :param events: dictionary of spike times, keyed by cell
+    :type events: dict
+    :param network: optional NeuroML network
+    :type network: neuroml.Network
+    :param kwargs: other keyword arguments passed to
+        :py:func:`population_rate`
+    :returns: ordered dictionary keyed by population id, with tuples of (bin
+        centres, rates) as values
+    :rtype: dict
+    """
+    grouped = OrderedDict()  # type: typing.Dict[str, typing.List[numpy.ndarray]]
+    for key, times in events.items():
+        try:
+            pop, _ = get_pop_index(key)
+        except (IndexError, ValueError):
+            pop = key
+        grouped.setdefault(pop, []).append(numpy.asarray(times, dtype=float))
+
+    pop_sizes = {}
+    if network is not None:
+        for pop in network.populations:
+            pop_sizes[pop.id] = (
+                len(pop.instances) if len(pop.instances) > 0 else int(pop.size)
+            )
+
+    all_times = [t for tlist in grouped.values() for t in tlist if len(t) > 0]
+    if "t_start" not in kwargs:
+        kwargs["t_start"] = min((t.min() for t in all_times), default=0.0)
+    if "t_stop" not in kwargs:
+        kwargs["t_stop"] = max((t.max() for t in all_times), default=0.0)
+
+    rates = OrderedDict()
+    for pop, tlist in grouped.items():
+        num_cells = pop_sizes.get(pop, len(tlist))
+        logger.debug(f"Calculating rate for {pop} with {num_cells} cells")
+        rates[pop] = population_rate(
+            numpy.concatenate(tlist), num_cells=num_cells, **kwargs
+        )
+
+    return rates
+
+
+def spike_table_from_events(
+    events: typing.Dict[str, typing.Union[numpy.ndarray, typing.Sequence[float]]],
+) -> typing.Tuple[typing.List[str], numpy.ndarray, numpy.ndarray]:
+    """Convert a dictionary of per-cell spike times into a spike table.
+
+    A spike table is a pair of arrays, one of cell indices and one of spike
+    times, with an entry for each spike.
+
+    .. versionadded:: 1.3.9
+
+    :param events: dictionary of spike times, keyed by cell, as returned by
+        :py:func:`pyneuroml.lems.load_sim_data_from_lems_file`
+    :type events: dict
+    :returns: tuple of (list of keys, array of indices into the list of keys,
+        array of spike times)
+    :rtype: (list, numpy.ndarray, numpy.ndarray)
+    """
+    keys = list(events.keys())
+    times_list = [numpy.asarray(events[k], dtype=float) for k in keys]
+    lengths = [len(t) for t in times_list]
+    ids = numpy.repeat(numpy.arange(len(keys)), lengths)
+    times = numpy.concatenate(times_list) if len(times_list) > 0 else numpy.zeros(0)
+    return keys, ids, times
+
+
+def _sorted_spike_table(
+    ids: typing.Union[numpy.ndarray, typing.Sequence[int]],
+    times: typing.Union[numpy.ndarray, typing.Sequence[float]],
+    num_cells: typing.Optional[int] = None,
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Sort a spike table by cell, and by time within each cell.
+
+    :param ids: cell ids of each spike
+    :type ids: array like
+    :param times: spike times
+    :type times: array like
+    :param num_cells: number of cells: if given, ids must be in the range
+        [0, num_cells); otherwise, only cells that spiked are included
+    :type num_cells: int
+    :returns: tuple of (cell ids, cell index of each spike, spike times)
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    :raises ValueError: if lengths of ids and times do not match
+    :raises ValueError: if ids are out of range of `num_cells`
+    """
+    ids = numpy.asarray(ids, dtype=numpy.intp)
+    times = numpy.asarray(times, dtype=float)
+    if len(ids) != len(times):
+        raise ValueError(
+            f"ids ({len(ids)}) and times ({len(times)}) must have the same length"
+        )
+
+    if num_cells is None:
+        cells, index = numpy.unique(ids, return_inverse=True)
+    else:
+        if len(ids) > 0 and (ids.min() < 0 or ids.max() >= num_cells):
+            raise ValueError(f"ids must be in the range [0, {num_cells})")
+        cells = numpy.arange(num_cells)
+        index = ids
+
+    order = numpy.lexsort((times, index))
+    return cells, index[order], times[order]
+
+
+def _binned_count_moments(
+    index: numpy.ndarray,
+    times: numpy.ndarray,
+    num_cells: int,
+    t_start: float,
+    bin_size: float,
+    num_bins: int,
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Get the per-cell mean and variance of spike counts in time bins.
+
+    Only the non-empty (cell, bin) pairs are counted, so this does not
+    allocate a cells × bins matrix.
+
+    :param index: sorted cell index of each spike
+    :type index: numpy.ndarray
+    :param times: spike times, sorted by time within each cell
+    :type times: numpy.ndarray
+    :param num_cells: number of cells
+    :type num_cells: int
+    :param t_start: start time of the first bin
+    :type t_start: float
+    :param bin_size: size of each bin
+    :type bin_size: float
+    :param num_bins: number of bins
+    :type num_bins: int
+    :returns: tuple of (mean, variance, bin of each spike, with -1 for spikes
+        outside the bins)
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    bins = numpy.floor((times - t_start) / bin_size).astype(numpy.intp)
+    bins[(bins < 0) | (bins >= num_bins)] = -1
+    valid = bins >= 0
+
+    # since spikes are sorted by cell, then time, the keys are sorted too
+    keys = index[valid] * num_bins + bins[valid]
+    boundaries = numpy.flatnonzero(numpy.diff(keys)) + 1
+    starts = numpy.concatenate(([0], boundaries)) if len(keys) > 0 else boundaries
+    counts = numpy.diff(numpy.concatenate((starts, [len(keys)])))
+    key_cells = keys[starts] // num_bins
+
+    total = numpy.bincount(key_cells, weights=counts, minlength=num_cells)
+    total_sq = numpy.bincount(key_cells, weights=counts**2, minlength=num_cells)
+    mean = total / num_bins
+    var = numpy.maximum(total_sq / num_bins - mean**2, 0.0)
+    return mean, var, bins
+
+
+def interspike_intervals(
+    ids: typing.Union[numpy.ndarray, typing.Sequence[int]],
+    times: typing.Union[numpy.ndarray, typing.Sequence[float]],
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """Get the inter-spike intervals of all cells in a spike table.
+
+    .. versionadded:: 1.3.9
+
+    :param ids: cell ids of each spike
+    :type ids: array like
+    :param times: spike times
+    :type times: array like
+    :returns: tuple of (cell id of each interval, intervals)
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    cells, index, times = _sorted_spike_table(ids, times)
+    same_cell = index[1:] == index[:-1]
+    isis = numpy.diff(times)[same_cell]
+    return cells[index[1:][same_cell]], isis
+
+
+SPIKE_STATISTICS_DTYPE = numpy.dtype(
+    [
+        ("cell", numpy.intp),
+        ("num_spikes", numpy.intp),
+        ("rate", float),
+        ("isi_mean", float),
+        ("isi_cv", float),
+        ("burst_index", float),
+        ("fano_factor", float),
+        ("synchrony", float),
+    ]
+)
+
+
+def spike_train_statistics(
+    ids: typing.Union[numpy.ndarray, typing.Sequence[int]],
+    times: typing.Union[numpy.ndarray, typing.Sequence[float]],
+    num_cells: typing.Optional[int] = None,
+    t_start: typing.Optional[float] = None,
+    t_stop: typing.Optional[float] = None,
+    burst_isi: float = 0.01,
+    fano_window: float = 0.1,
+    synchrony_bin: typing.Optional[float] = None,
+    synchrony_sample: typing.Optional[int] = None,
+    seed: typing.Optional[int] = None,
+) -> numpy.ndarray:
+    """Calculate statistics of the spike trains of all cells at once.
+
+    The spike table is sorted once by cell and time, and all statistics are
+    then computed with segmented reductions (:code:`numpy.bincount`) over
+    the whole table, without looping over cells in Python.
+
+    The returned table is a numpy structured array with one row per cell,
+    and the following fields:
+
+    - cell: cell id
+    - num_spikes: number of spikes
+    - rate: mean firing rate, in 1/(units of time)
+    - isi_mean: mean inter-spike interval
+    - isi_cv: coefficient of variation of the inter-spike intervals
+    - burst_index: fraction of inter-spike intervals shorter than
+      `burst_isi`
+    - fano_factor: Fano factor of spike counts in windows of `fano_window`
+    - synchrony: mean Pearson correlation of the cell's binned spike counts
+      with those of the other cells (only if `synchrony_bin` is set)
+
+    Values that are not defined for a cell (for example, the ISI statistics
+    of a cell with fewer than two spikes) are NaN.
+
+    The mean pairwise correlation of each cell is calculated from the sum of
+    the z-scored spike counts of all cells, which is linear in the number of
+    spikes and bins rather than quadratic in the number of cells. For very
+    long simulations, `synchrony_sample` can also be used to correlate each
+    cell with a random sample of reference cells instead of all other cells.
+
+    The defaults assume that times are in seconds.
+
+    .. versionadded:: 1.3.9
+
+    :param ids: cell ids of each spike
+    :type ids: array like
+    :param times: spike times
+    :type times: array like
+    :param num_cells: number of cells: if given, ids must be in the range
+        [0, num_cells) and silent cells are included in the table; otherwise,
+        only cells that spiked are included
+    :type num_cells: int
+    :param t_start: start time, defaults to the earliest spike time
+    :type t_start: float
+    :param t_stop: end time, defaults to the latest spike time
+    :type t_stop: float
+    :param burst_isi: inter-spike intervals shorter than this are counted as
+        being within a burst
+    :type burst_isi: float
+    :param fano_window: size of the windows used to calculate Fano factors
+    :type fano_window: float
+    :param synchrony_bin: bin size used to calculate spike count
+        correlations; if None, synchrony is not calculated
+    :type synchrony_bin: float
+    :param synchrony_sample: number of reference cells to randomly sample for
+        synchrony calculations; if None, all cells are used
+    :type synchrony_sample: int
+    :param seed: seed for the random sampling of reference cells
+    :type seed: int
+    :returns: table of statistics, one row per cell
+    :rtype: numpy.ndarray
+    """
+    cells, index, times = _sorted_spike_table(ids, times, num_cells)
+    n = len(cells)
+
+    if t_start is None:
+        t_start = float(times.min()) if len(times) > 0 else 0.0
+    if t_stop is None:
+        t_stop = float(times.max()) if len(times) > 0 else t_start
+    duration = t_stop - t_start
+
+    table = numpy.zeros(n, dtype=SPIKE_STATISTICS_DTYPE)
+    # statistics that cannot be calculated are NaN
+    for field in SPIKE_STATISTICS_DTYPE.names:
+        if SPIKE_STATISTICS_DTYPE[field].kind == "f":
+            table[field] = numpy.nan
+    table["cell"] = cells
+    counts = numpy.bincount(index, minlength=n)
+    table["num_spikes"] = counts
+    if duration > 0:
+        table["rate"] = counts / duration
+
+    # ISI statistics
+    same_cell = index[1:] == index[:-1]
+    isis = numpy.diff(times)[same_cell]
+    isi_cells = index[1:][same_cell]
+    isi_counts = numpy.bincount(isi_cells, minlength=n)
+    has_isis = isi_counts > 0
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        isi_mean = numpy.bincount(isi_cells, weights=isis, minlength=n) / isi_counts
+        deviations = isis - isi_mean[isi_cells]
+        isi_std = numpy.sqrt(
+            numpy.bincount(isi_cells, weights=deviations**2, minlength=n) / isi_counts
+        )
+        bursts = numpy.bincount(isi_cells, weights=isis < burst_isi, minlength=n)
+        table["isi_mean"][has_isis] = isi_mean[has_isis]
+        table["isi_cv"][has_isis] = isi_std[has_isis] / isi_mean[has_isis]
+        table["burst_index"][has_isis] = bursts[has_isis] / isi_counts[has_isis]
+
+    # Fano factor
+    num_windows = int(duration / fano_window) if fano_window > 0 else 0
+    if num_windows >= 2:
+        mean, var, _ = _binned_count_moments(
+            index, times, n, t_start, fano_window, num_windows
+        )
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            table["fano_factor"] = numpy.where(mean > 0, var / mean, numpy.nan)
+
+    # synchrony: mean correlation with other (reference) cells
+    if synchrony_bin is not None and duration > 0:
+        num_bins = max(int(numpy.ceil(duration / synchrony_bin)), 1)
+        mean, var, bins = _binned_count_moments(
+            index, times, n, t_start, synchrony_bin, num_bins
+        )
+        std = numpy.sqrt(var)
+        active = std > 0
+
+        reference = active.copy()
+        if synchrony_sample is not None and synchrony_sample < reference.sum():
+            rng = numpy.random.default_rng(seed)
+            chosen = rng.choice(
+                numpy.flatnonzero(reference), synchrony_sample, replace=False
+            )
+            reference[:] = False
+            reference[chosen] = True
+        num_reference = reference.sum()
+
+        # sum of z-scored counts of reference cells in each bin: only bins
+        # with spikes need to be visited, the means are a constant offset
+        valid = bins >= 0
+        weights = numpy.zeros(n)
+        weights[reference] = 1.0 / std[reference]
+        z_sum = numpy.bincount(
+            bins[valid], weights=weights[index[valid]], minlength=num_bins
+        ) - numpy.sum(mean * weights)
+        # since z_sum sums to zero over bins, the dot product of each cell's
+        # z-scored counts with it only needs the bins where the cell spiked
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            dot = (
+                numpy.bincount(index[valid], weights=z_sum[bins[valid]], minlength=n)
+                / std
+            )
+            # remove each reference cell's correlation with itself
+            dot[reference] -= num_bins
+            others = num_reference - reference
+            synchrony = dot / (num_bins * others)
+        table["synchrony"] = numpy.where(active & (others > 0), synchrony, numpy.nan)
+
+    return table
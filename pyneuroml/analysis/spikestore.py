@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+On-disk store for spike times of large networks.
+
+The spikes of each population are stored twice in an HDF5 group: once
+sorted by cell (and by time for each cell), with an offset index giving
+where the spikes of each cell start, and once sorted by time. Looking up the
+spikes of a cell, or all spikes in a time window, therefore only needs a
+binary search on the stored arrays and a read of the matching slice, so
+queries do not require loading the whole data set into memory.
+
+The layout of the HDF5 group is:
+
+.. code-block:: text
+
+    /<group>/<population>        (attributes: num_cells)
+        cells                    sorted ids of cells that spiked
+        offsets                  start of each cell's spikes in cell_times,
+                                 with a final entry for the total number
+        cell_times               spike times sorted by cell, then time
+        times                    spike times sorted by time
+        time_ids                 cell id of each entry in times
+
+File: pyneuroml/analysis/spikestore.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import bisect
+import logging
+import os
+import typing
+import warnings
+
+import numpy
+
+from pyneuroml.analysis.spikes import population_rate
+from pyneuroml.lems import get_event_output_files, get_pop_index
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+try:
+    import tables  # pytables for HDF5 support
+except ImportError:
+    logger.warning("Please install optional dependencies to use hdf5 features:")
+    logger.warning("pip install pyneuroml[hdf5]")
+
+
+SPIKE_STORE_GROUP = "spike_store"
+
+
+class SpikeStore(object):
+    """HDF5 backed store of spike times, indexed by cell and by time.
+
+    .. versionadded:: 1.3.9
+
+    .. seealso::
+
+        :py:func:`create_spike_store_from_lems_file`,
+        :py:func:`create_spike_store_from_sonata_file`
+            to create stores from simulation outputs
+
+    The store can be used as a context manager:
+
+    .. code-block:: python
+
+        with SpikeStore("spikes.h5") as store:
+            times = store.get_spike_times("pop0", 10)
+            ids, times = store.get_spikes_in_window("pop0", 0.1, 0.2)
+
+    :param file_name: path of HDF5 file
+    :type file_name: str
+    :param mode: mode to open file in: "r" to read, "w" to create a new
+        file, "a" to add to an existing file
+    :type mode: str
+    :param group: name of the group in the file that holds the store
+    :type group: str
+    """
+
+    def __init__(self, file_name: str, mode: str = "r", group: str = SPIKE_STORE_GROUP):
+        self.file_name = file_name
+        self.h5file = tables.open_file(file_name, mode=mode)
+        if mode == "r":
+            self.group = self.h5file.get_node("/", group)
+        else:
+            try:
+                self.group = self.h5file.get_node("/", group)
+            except tables.NoSuchNodeError:
+                self.group = self.h5file.create_group("/", group)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        self.h5file.close()
+
+    def add_population(
+        self,
+        population: str,
+        ids: typing.Union[numpy.ndarray, typing.Sequence[int]],
+        times: typing.Union[numpy.ndarray, typing.Sequence[float]],
+        num_cells: typing.Optional[int] = None,
+    ) -> None:
+        """Add the spikes of a population to the store.
+
+        The spikes of the population are sorted in memory before being
+        written.
+
+        :param population: name of population
+        :type population: str
+        :param ids: cell ids of each spike
+        :type ids: array like
+        :param times: spike times
+        :type times: array like
+        :param num_cells: number of cells in the population, including silent
+            ones; defaults to the number of cells that spiked
+        :type num_cells: int
+        :raises ValueError: if lengths of ids and times do not match
+        """
+        ids = numpy.asarray(ids, dtype=numpy.int64)
+        times = numpy.asarray(times, dtype=numpy.float64)
+        if len(ids) != len(times):
+            raise ValueError(
+                f"ids ({len(ids)}) and times ({len(times)}) must have the same length"
+            )
+
+        by_cell = numpy.lexsort((times, ids))
+        cell_ids = ids[by_cell]
+        cells, starts = numpy.unique(cell_ids, return_index=True)
+        offsets = numpy.append(starts, len(cell_ids)).astype(numpy.int64)
+        by_time = numpy.argsort(times, kind="stable")
+
+        filters = tables.Filters(complevel=5, complib="zlib", shuffle=True)
+        # population names need not be valid Python identifiers
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", tables.NaturalNameWarning)
+            pop_group = self.h5file.create_group(self.group, population)
+            for name, data in [
+                ("cells", cells),
+                ("offsets", offsets),
+                ("cell_times", times[by_cell]),
+                ("times", times[by_time]),
+                ("time_ids", ids[by_time]),
+            ]:
+                self.h5file.create_earray(pop_group, name, obj=data, filters=filters)
+        pop_group._v_attrs.num_cells = (
+            int(num_cells) if num_cells is not None else len(cells)
+        )
+
+        logger.info(
+            f"Stored {len(times)} spikes of {len(cells)} cells for population {population}"
+        )
+
+    def _get_population_group(self, population: str):
+        try:
+            return self.h5file.get_node(self.group, population)
+        except tables.NoSuchNodeError:
+            raise ValueError(
+                f"Population {population} not found in store: {self.get_populations()}"
+            )
+
+    def get_populations(self) -> typing.List[str]:
+        """Get the names of the populations in the store.
+
+        :returns: list of population names
+        :rtype: list(str)
+        """
+        return [g._v_name for g in self.h5file.list_nodes(self.group)]
+
+    def get_num_cells(self, population: str) -> int:
+        """Get the number of cells in a population, including silent ones.
+
+        :param population: name of population
+        :type population: str
+        :returns: number of cells
+        :rtype: int
+        """
+        return int(self._get_population_group(population)._v_attrs.num_cells)
+
+    def get_num_spikes(self, population: str) -> int:
+        """Get the number of spikes of a population.
+
+        :param population: name of population
+        :type population: str
+        :returns: number of spikes
+        :rtype: int
+        """
+        return len(self._get_population_group(population).times)
+
+    def get_time_range(self, population: str) -> typing.Tuple[float, float]:
+        """Get the times of the first and last spikes of a population.
+
+        :param population: name of population
+        :type population: str
+        :returns: tuple of (first spike time, last spike time), or (nan, nan)
+            if the population has no spikes
+        :rtype: (float, float)
+        """
+        times = self._get_population_group(population).times
+        if len(times) == 0:
+            return numpy.nan, numpy.nan
+        return float(times[0]), float(times[-1])
+
+    def get_cells(self, population: str) -> numpy.ndarray:
+        """Get the ids of the cells of a population that spiked.
+
+        :param population: name of population
+        :type population: str
+        :returns: sorted array of cell ids
+        :rtype: numpy.ndarray
+        """
+        return self._get_population_group(population).cells.read()
+
+    def get_spike_times(self, population: str, cell: int) -> numpy.ndarray:
+        """Get the spike times of a cell.
+
+        This does a binary search on the stored cell ids, and then reads
+        only the spikes of the cell.
+
+        :param population: name of population
+        :type population: str
+        :param cell: id of cell
+        :type cell: int
+        :returns: sorted spike times of the cell, empty if it did not spike
+        :rtype: numpy.ndarray
+        """
+        pop_group = self._get_population_group(population)
+        cells = pop_group.cells
+        i = bisect.bisect_left(cells, cell)
+        if i == len(cells) or cells[i] != cell:
+            return numpy.zeros(0)
+        start, end = pop_group.offsets[i : i + 2]
+        return pop_group.cell_times[start:end]
+
+    def get_spikes_in_window(
+        self,
+        population: str,
+        t_start: typing.Optional[float] = None,
+        t_stop: typing.Optional[float] = None,
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """Get all spikes of a population in a time window.
+
+        This does a binary search on the stored times for the start and end
+        of the window, and then reads only the spikes in it.
+
+        :param population: name of population
+        :type population: str
+        :param t_start: start of window (inclusive), defaults to the start
+        :type t_start: float
+        :param t_stop: end of window (exclusive), defaults to the end
+        :type t_stop: float
+        :returns: tuple of (cell ids, spike times), sorted by time
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        pop_group = self._get_population_group(population)
+        times = pop_group.times
+        start = 0 if t_start is None else bisect.bisect_left(times, t_start)
+        end = len(times) if t_stop is None else bisect.bisect_left(times, t_stop)
+        return pop_group.time_ids[start:end], times[start:end]
+
+
+def create_spike_store_from_lems_file(
+    lems_file_name: str,
+    store_file_name: str,
+    base_dir: str = ".",
+    group: str = SPIKE_STORE_GROUP,
+) -> SpikeStore:
+    """Create a spike store from the event output files of a LEMS simulation.
+
+    The select attributes of the event selections (:code:`pop[index]` or
+    :code:`pop/index/component`) are used to group spikes into populations.
+    All selected cells are counted as members of their populations, so
+    silent cells are included in the population sizes.
+
+    .. versionadded:: 1.3.9
+
+    :param lems_file_name: name of LEMS file that was used to generate the data
+    :type lems_file_name: str
+    :param store_file_name: name of HDF5 file to create
+    :type store_file_name: str
+    :param base_dir: directory to look for output files in
+    :type base_dir: str
+    :param group: name of the group in the file that holds the store
+    :type group: str
+    :returns: the new store, opened for reading
+    :rtype: SpikeStore
+    :raises ValueError: if an event output file has an unknown format
+    """
+    # population: (ids, times, indices of selected cells)
+    pop_data = {}  # type: typing.Dict[str, typing.Tuple[typing.List, typing.List, typing.Set[int]]]
+
+    for file_name, format_, selections in get_event_output_files(
+        lems_file_name, base_dir
+    ):
+        logger.info(f"Loading events from {file_name} (format: {format_})")
+        data = numpy.loadtxt(file_name, ndmin=2)
+        if format_ == "TIME_ID":
+            times, file_ids = data[:, 0], data[:, 1].astype(numpy.int64)
+        elif format_ == "ID_TIME":
+            file_ids, times = data[:, 0].astype(numpy.int64), data[:, 1]
+        else:
+            raise ValueError(f"Unknown format of {file_name}: {format_}")
+
+        # map ids used in the file to populations and cell indices
+        sel_ids = numpy.array(sorted(selections.keys()), dtype=numpy.int64)
+        sel_pops = []
+        sel_indices = numpy.zeros(len(sel_ids), dtype=numpy.int64)
+        for i, sel_id in enumerate(sel_ids):
+            pop, index = get_pop_index(selections[sel_id])
+            sel_pops.append(pop)
+            sel_indices[i] = index
+        sel_pops_arr = numpy.array(sel_pops)
+
+        pos = numpy.searchsorted(sel_ids, file_ids)
+        pos[pos == len(sel_ids)] = 0
+        known = sel_ids[pos] == file_ids if len(sel_ids) > 0 else pos < 0
+        if not numpy.all(known):
+            logger.warning(
+                f"{numpy.count_nonzero(~known)} events in {file_name} have ids not in the selections"
+            )
+        pos = pos[known]
+        times = times[known]
+
+        for pop in numpy.unique(sel_pops_arr):
+            in_pop = sel_pops_arr[pos] == pop
+            ids_list, times_list, cell_indices = pop_data.setdefault(
+                str(pop), ([], [], set())
+            )
+            ids_list.append(sel_indices[pos[in_pop]])
+            times_list.append(times[in_pop])
+            # cells may be recorded in more than one file
+            cell_indices.update(sel_indices[sel_pops_arr == pop].tolist())
+
+    with SpikeStore(store_file_name, mode="w", group=group) as store:
+        for pop, (ids_list, times_list, cell_indices) in pop_data.items():
+            store.add_population(
+                pop,
+                numpy.concatenate(ids_list),
+                numpy.concatenate(times_list),
+                num_cells=len(cell_indices),
+            )
+
+    return SpikeStore(store_file_name, mode="r", group=group)
+
+
+def create_spike_store_from_sonata_file(
+    sonata_file_name: str, store_file_name: str, group: str = SPIKE_STORE_GROUP
+) -> SpikeStore:
+    """Create a spike store from a SONATA format HDF5 spike file.
+
+    .. versionadded:: 1.3.9
+
+    :param sonata_file_name: name of SONATA spikes file
+    :type sonata_file_name: str
+    :param store_file_name: name of HDF5 file to create
+    :type store_file_name: str
+    :param group: name of the group in the file that holds the store
+    :type group: str
+    :returns: the new store, opened for reading
+    :rtype: SpikeStore
+    """
+    # imported here to avoid a circular import: pyneuroml.plot uses
+    # pyneuroml.analysis
+    from pyneuroml.plot.PlotSpikes import POP_NAME_SPIKEFILE_WITH_GIDS
+
+    logger.info(
+        f"Loading SONATA spike times from: {sonata_file_name} ({os.path.abspath(sonata_file_name)})"
+    )
+    with tables.open_file(sonata_file_name, mode="r") as h5file:
+        with SpikeStore(store_file_name, mode="w", group=group) as store:
+            if hasattr(h5file.root.spikes, "gids"):
+                store.add_population(
+                    POP_NAME_SPIKEFILE_WITH_GIDS,
+                    h5file.root.spikes.gids.read(),
+                    h5file.root.spikes.timestamps.read(),
+                )
+            else:
+                for pop_group in h5file.root.spikes:
+                    store.add_population(
+                        pop_group._v_name,
+                        pop_group.node_ids.read(),
+                        pop_group.timestamps.read(),
+                    )
+
+    return SpikeStore(store_file_name, mode="r", group=group)
+
+
+def population_rates_from_spike_store(
+    store: SpikeStore,
+    populations: typing.Optional[typing.List[str]] = None,
+    t_start: typing.Optional[float] = None,
+    t_stop: typing.Optional[float] = None,
+    **kwargs: typing.Any,
+) -> typing.Dict[str, typing.Tuple[numpy.ndarray, numpy.ndarray]]:
+    """Calculate firing rates for populations in a spike store.
+
+    Only the spikes in the requested time window are read from the store.
+    The population sizes recorded in the store are used as the number of
+    cells, so silent cells are included in the mean rates.
+
+    .. versionadded:: 1.3.9
+
+    .. seealso::
+
+        :py:func:`pyneuroml.analysis.spikes.population_rates`
+            for rates from in memory spike times
+
+    :param store: spike store to read from
+    :type store: SpikeStore
+    :param populations: populations to calculate rates for, defaults to all
+    :type populations: list(str)
+    :param t_start: start of time window, defaults to the first spike
+    :type t_start: float
+    :param t_stop: end of time window, defaults to the last spike
+    :type t_stop: float
+    :param kwargs: other keyword arguments passed to
+        :py:func:`pyneuroml.analysis.spikes.population_rate`
+    :returns: dictionary keyed by population id, with tuples of (bin centres,
+        rates) as values
+    :rtype: dict
+    """
+    if populations is None:
+        populations = store.get_populations()
+
+    # use common bins for all populations
+    if t_start is None or t_stop is None:
+        ranges = numpy.array([store.get_time_range(pop) for pop in populations])
+        if t_start is None:
+            t_start = float(numpy.nanmin(ranges[:, 0])) if len(ranges) else 0.0
+        if t_stop is None:
+            t_stop = float(numpy.nanmax(ranges[:, 1])) if len(ranges) else 0.0
+
+    rates = {}
+    for pop in populations:
+        # include spikes at t_stop, as population_rate does
+        _, times = store.get_spikes_in_window(
+            pop, t_start, numpy.nextafter(t_stop, numpy.inf)
+        )
+        rates[pop] = population_rate(
+            times,
+            num_cells=store.get_num_cells(pop),
+            t_start=t_start,
+            t_stop=t_stop,
+            **kwargs,
+        )
+    return rates
@@ -478,6 +478,100 @@ def get_pop_index(quantity):
         return pop, index
 
 
+def _get_simulation_element(real_lems_file: str) -> typing.Tuple[typing.Any, str]:
+    """Get the Simulation element from a LEMS file.
+
+    :param real_lems_file: path to LEMS file
+    :type real_lems_file: str
+    :returns: tuple of (Simulation element, namespace prefix used in file)
+    """
+    tree = etree.parse(real_lems_file)
+
+    sim = tree.getroot().find("Simulation")
+    ns_prefix = ""
+
+    possible_prefixes = ["{http://www.neuroml.org/lems/0.7.2}"]
+    if sim is None:
+        for pre in possible_prefixes:
+            for comp in tree.getroot().findall(pre + "Component"):
+                if comp.attrib["type"] == "Simulation":
+                    ns_prefix = pre
+                    sim = comp
+
+    return sim, ns_prefix
+
+
+def _get_event_output_files(
+    sim: typing.Any, ns_prefix: str, base_dir: str, base_lems_file_path: str
+) -> typing.List[typing.Tuple[str, str, typing.Dict[int, str]]]:
+    """Get the event output files of a LEMS Simulation element.
+
+    :param sim: Simulation element
+    :param ns_prefix: namespace prefix used in the LEMS file
+    :type ns_prefix: str
+    :param base_dir: directory to look for output files in
+    :type base_dir: str
+    :param base_lems_file_path: directory of the LEMS file, where output
+        files are looked for if they are not found in `base_dir`
+    :type base_lems_file_path: str
+    :returns: list of tuples of (file name, format, dictionary of event
+        selection ids and their select attributes)
+    :raises OSError: if an output file cannot be found
+    """
+    output_files = []
+    event_output_files = sim.findall(ns_prefix + "EventOutputFile")
+    for of in event_output_files:
+        name = of.attrib["fileName"]
+        file_name = os.path.join(base_dir, name)
+        if not os.path.isfile(file_name):  # If not relative to the LEMS file...
+            file_name = os.path.join(base_lems_file_path, name)
+
+        # if not os.path.isfile(file_name): # If not relative to the LEMS file...
+        #    file_name = os.path.join(os.getcwd(),name)
+        # ... try relative to cwd.
+        # if not os.path.isfile(file_name): # If not relative to the LEMS file...
+        #    file_name = os.path.join(os.getcwd(),'NeuroML2','results',name)
+        # ... try relative to cwd in NeuroML2/results subdir.
+        if not os.path.isfile(file_name):  # If not relative to the base dir...
+            raise OSError("Could not find simulation output file %s" % file_name)
+        format_ = of.attrib["format"]
+        selections = {}
+        for col in of.findall(ns_prefix + "EventSelection"):
+            id_ = int(col.attrib["id"])
+            select = col.attrib["select"]
+            selections[id_] = select
+
+        output_files.append((file_name, format_, selections))
+
+    return output_files
+
+
+def get_event_output_files(
+    lems_file_name: str, base_dir: str = "."
+) -> typing.List[typing.Tuple[str, str, typing.Dict[int, str]]]:
+    """Get the event output files specified in a LEMS simulation file.
+
+    .. versionadded:: 1.3.9
+
+    :param lems_file_name: name of LEMS file that was used to generate the data
+    :type lems_file_name: str
+    :param base_dir: directory to look for output files in
+    :type base_dir: str
+    :returns: list of tuples of (file name, format, dictionary of event
+        selection ids and their select attributes), one for each
+        EventOutputFile
+    :raises OSError: if an output file cannot be found
+    """
+    if not os.path.isfile(lems_file_name):
+        real_lems_file = os.path.realpath(os.path.join(base_dir, lems_file_name))
+    else:
+        real_lems_file = os.path.realpath(lems_file_name)
+    base_lems_file_path = os.path.dirname(os.path.realpath(lems_file_name))
+
+    sim, ns_prefix = _get_simulation_element(real_lems_file)
+    return _get_event_output_files(sim, ns_prefix, base_dir, base_lems_file_path)
+
+
 def load_sim_data_from_lems_file(
     lems_file_name: str,
     base_dir: str = ".",
@@ -538,47 +632,17 @@ def load_sim_data_from_lems_file(
     events = {}  # type: dict
 
     base_lems_file_path = os.path.dirname(os.path.realpath(lems_file_name))
-    tree = etree.parse(real_lems_file)
-
-    sim = tree.getroot().find("Simulation")
-    ns_prefix = ""
-
-    possible_prefixes = ["{http://www.neuroml.org/lems/0.7.2}"]
-    if sim is None:
-        for pre in possible_prefixes:
-            for comp in tree.getroot().findall(pre + "Component"):
-                if comp.attrib["type"] == "Simulation":
-                    ns_prefix = pre
-                    sim = comp
+    sim, ns_prefix = _get_simulation_element(real_lems_file)
 
     if get_events:
-        event_output_files = sim.findall(ns_prefix + "EventOutputFile")
-        for i, of in enumerate(event_output_files):
-            name = of.attrib["fileName"]
-            file_name = os.path.join(base_dir, name)
-            if not os.path.isfile(file_name):  # If not relative to the LEMS file...
-                file_name = os.path.join(base_lems_file_path, name)
-
-            # if not os.path.isfile(file_name): # If not relative to the LEMS file...
-            #    file_name = os.path.join(os.getcwd(),name)
-            # ... try relative to cwd.
-            # if not os.path.isfile(file_name): # If not relative to the LEMS file...
-            #    file_name = os.path.join(os.getcwd(),'NeuroML2','results',name)
-            # ... try relative to cwd in NeuroML2/results subdir.
-            if not os.path.isfile(file_name):  # If not relative to the base dir...
-                raise OSError(
-                    ("Could not find simulation output " "file %s" % file_name)
-                )
-            format_ = of.attrib["format"]
+        for file_name, format_, selections in _get_event_output_files(
+            sim, ns_prefix, base_dir, base_lems_file_path
+        ):
             logger.info(
                 "Loading saved events from %s (format: %s)" % (file_name, format_)
             )
-            selections = {}
-            for col in of.findall(ns_prefix + "EventSelection"):
-                id_ = int(col.attrib["id"])
-                select = col.attrib["select"]
+            for select in selections.values():
                 events[select] = []
-                selections[id_] = select
 
             with open(file_name) as f:
                 for line in f:
@@ -15,12 +15,203 @@ from typing import Optional
 import matplotlib
 import matplotlib.animation as animation
 import matplotlib.axes
+import matplotlib.collections
+import matplotlib.lines
+import numpy
 import progressbar
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+def _minmax_decimate(
+    x: numpy.ndarray,
+    y: numpy.ndarray,
+    num_buckets: int,
+    xlim: typing.Optional[typing.Tuple[float, float]] = None,
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """Decimate a series by keeping the minimum and maximum of each bucket.
+
+    The samples in view are split into `num_buckets` runs of consecutive
+    samples, and only the samples with the minimum and maximum y values in
+    each run are kept, in their original order. For regularly sampled data
+    and one bucket per horizontal pixel, the drawn line is indistinguishable
+    from the full resolution line: all peaks (spikes) are preserved.
+
+    :param x: x values, sorted in increasing order
+    :type x: numpy.ndarray
+    :param y: y values
+    :type y: numpy.ndarray
+    :param num_buckets: number of buckets, usually the width of the axes in
+        pixels
+    :type num_buckets: int
+    :param xlim: x range in view, only samples in it (and one on either side)
+        are kept; all samples are used if None
+    :type xlim: (float, float)
+    :returns: tuple of decimated (x, y) values
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    start = 0
+    stop = len(x)
+    if xlim is not None:
+        start = max(int(numpy.searchsorted(x, min(xlim), side="left")) - 1, 0)
+        stop = min(int(numpy.searchsorted(x, max(xlim), side="right")) + 1, stop)
+
+    num_samples = stop - start
+    if num_samples <= 2 * num_buckets:
+        return x[start:stop], y[start:stop]
+
+    bucket_size = -(-num_samples // num_buckets)
+    num_buckets = -(-num_samples // bucket_size)
+    # pad the last bucket with its last value so that buckets can be reshaped
+    buckets = numpy.pad(
+        y[start:stop], (0, num_buckets * bucket_size - num_samples), mode="edge"
+    ).reshape(num_buckets, bucket_size)
+    bucket_starts = numpy.arange(num_buckets) * bucket_size
+    indices = numpy.unique(
+        numpy.concatenate(
+            (
+                [0, num_samples - 1],
+                bucket_starts + numpy.argmin(buckets, axis=1),
+                bucket_starts + numpy.argmax(buckets, axis=1),
+            )
+        )
+    )
+    indices += start
+    return x[indices], y[indices]
+
+
+def _add_minmax_decimation(
+    ax: matplotlib.axes.Axes,
+    lines: typing.List[
+        typing.Tuple[matplotlib.lines.Line2D, numpy.ndarray, numpy.ndarray]
+    ],
+    collections: typing.Optional[
+        typing.List[
+            typing.Tuple[
+                matplotlib.collections.LineCollection,
+                typing.List[typing.Tuple[numpy.ndarray, numpy.ndarray, bool]],
+            ]
+        ]
+    ] = None,
+) -> None:
+    """Recompute decimated line data when the axes are zoomed or resized.
+
+    .. seealso::
+
+        :py:func:`_minmax_decimate`
+
+    :param ax: axes that lines are drawn on
+    :type ax: matplotlib.axes.Axes
+    :param lines: list of tuples of (line, full resolution x values, full
+        resolution y values)
+    :type lines: list
+    :param collections: list of tuples of (line collection, list of (full
+        resolution x values, full resolution y values, whether line can be
+        decimated) for each line in the collection)
+    :type collections: list
+    """
+
+    def update(*args):
+        num_buckets = max(int(ax.get_window_extent().width), 1)
+        xlim = ax.get_xlim()
+        for line, x, y in lines:
+            line.set_data(*_minmax_decimate(x, y, num_buckets, xlim))
+        for collection, data in collections or []:
+            collection.set_segments(
+                [
+                    numpy.column_stack(
+                        _minmax_decimate(x, y, num_buckets, xlim)
+                        if decimatable
+                        else (x, y)
+                    )
+                    for x, y, decimatable in data
+                ]
+            )
+
+    ax.callbacks.connect("xlim_changed", update)
+    ax.figure.canvas.mpl_connect("resize_event", update)
+
+
+def _add_line_collection(
+    ax: matplotlib.axes.Axes,
+    xvalues: typing.List[typing.List[float]],
+    yvalues: typing.List[typing.List[float]],
+    colors: typing.Optional[typing.List[str]],
+    colormap: str,
+    linestyles: typing.Optional[typing.List[str]],
+    linewidths: typing.Optional[typing.List[str]],
+    num_buckets: typing.Optional[int],
+) -> typing.Tuple[
+    matplotlib.collections.LineCollection,
+    typing.List[typing.Tuple[numpy.ndarray, numpy.ndarray, bool]],
+]:
+    """Draw all lines as a single LineCollection.
+
+    X values that are shared between lines (the same object, as is usual
+    for traces recorded with the same time base) are only converted and
+    checked once.
+
+    :param ax: axes to draw on
+    :type ax: matplotlib.axes.Axes
+    :param xvalues: X values
+    :type xvalues: list of lists
+    :param yvalues: Y values
+    :type yvalues: list of lists
+    :param colors: colours for each line, if None, colours are taken from
+        the colormap
+    :type colors: list of strings
+    :param colormap: name of matplotlib colormap to colour lines with
+    :type colormap: str
+    :param linestyles: list of line styles
+    :type linestyles: list of strings
+    :param linewidths: list of line widths
+    :type linewidths: list of floats
+    :param num_buckets: number of buckets for min/max decimation of lines,
+        None to disable decimation
+    :type num_buckets: int or None
+    :returns: tuple of (line collection, list of (full resolution x values,
+        full resolution y values, whether line can be decimated) for each
+        line)
+    :rtype: tuple
+    """
+    from matplotlib import colormaps, rcParams
+    from matplotlib.collections import LineCollection
+
+    x_arrays = {}  # type: typing.Dict[int, typing.Tuple[numpy.ndarray, bool]]
+    data = []
+    segments = []
+    for xv, yv in zip(xvalues, yvalues):
+        try:
+            x, increasing = x_arrays[id(xv)]
+        except KeyError:
+            x = numpy.asarray(xv, dtype=float)
+            increasing = bool(numpy.all(x[1:] >= x[:-1]))
+            x_arrays[id(xv)] = (x, increasing)
+        y = numpy.asarray(yv, dtype=float)
+
+        decimatable = num_buckets is not None and increasing
+        data.append((x, y, decimatable))
+        segments.append(
+            numpy.column_stack(
+                _minmax_decimate(x, y, num_buckets) if decimatable else (x, y)
+            )
+        )
+
+    if not colors:
+        colors = colormaps[colormap](numpy.linspace(0, 1, len(segments)))
+
+    collection = LineCollection(
+        segments,
+        colors=colors,
+        linestyles=linestyles if linestyles else rcParams["lines.linestyle"],
+        linewidths=linewidths if linewidths else rcParams["lines.linewidth"],
+    )
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return collection, data
+
+
 def generate_plot(
     xvalues: typing.List[typing.List[float]],
     yvalues: typing.List[typing.List[float]],
@@ -53,6 +244,9 @@ def generate_plot(
     verbose: bool = False,
     close_plot: bool = False,
     interactive_legend: bool = True,
+    decimate: bool = True,
+    line_collection_threshold: typing.Optional[int] = 1000,
+    colormap: str = "viridis",
 ) -> typing.Optional[matplotlib.axes.Axes]:
     """Utility function to generate plots using the Matplotlib library.
 
@@ -78,6 +272,12 @@ def generate_plot(
         - animate
         - interactive_legend
 
+    .. versionadded:: 1.3.9
+
+        - decimate
+        - line_collection_threshold
+        - colormap
+
     :param xvalues: X values
     :type xvalues: list of lists
     :param yvalues: Y values
@@ -165,6 +365,25 @@ def generate_plot(
     :param interactive_legend: enable clicking on legend to toggle plot lines
         when using the matplotlib UI
     :type interactive_legend: bool
+    :param decimate: draw long lines at reduced resolution: for lines with
+        more than twice as many points as the axes are wide in pixels, only
+        the minimum and maximum values in each pixel column are drawn. This
+        preserves the envelope of the data, including spikes, while limiting
+        the number of drawn points. The lines are recomputed when the plot is
+        zoomed or resized in the matplotlib UI. Only lines without markers
+        and with increasing x values are decimated, and lines are not
+        decimated when animating.
+    :type decimate: bool
+    :param line_collection_threshold: number of lines above which all lines
+        are drawn as a single matplotlib LineCollection instead of one
+        artist per line, which is much faster for plots with thousands of
+        lines. In this mode, markers are not drawn and no legend is shown.
+        Lines are not drawn as a collection when animating. Use None to
+        always draw individual lines.
+    :type line_collection_threshold: int or None
+    :param colormap: name of matplotlib colormap used to colour lines drawn
+        as a LineCollection when colors are not given
+    :type colormap: str
     :returns: matplotlib.axes.Axes object if plot is not closed, else None
     :raises ValueError: if the dimensions of xvalues/yvalues and option
         arguments colors/labels/linestyles/linewidths/markers/markersizes do
@@ -253,36 +472,89 @@ def generate_plot(
 
     legend_box = None
     artists = []
+    decimated_lines = []
+    num_buckets = max(int(ax.get_window_extent().width), 1)
 
-    for i in range(len(xvalues)):
-        linestyle = rcParams["lines.linestyle"] if not linestyles else linestyles[i]
-        label = "" if not labels else labels[i]
-        marker = rcParams["lines.marker"] if not markers else markers[i]
-        linewidth = rcParams["lines.linewidth"] if not linewidths else linewidths[i]
-        markersize = rcParams["lines.markersize"] if not markersizes else markersizes[i]
-
-        if colors:
-            (artist,) = plt.plot(
-                xvalues[i],
-                yvalues[i],
-                marker=marker,
-                color=colors[i],
-                markersize=markersize,
-                linestyle=linestyle,
-                linewidth=linewidth,
-                label=label,
-            )
-        else:
-            (artist,) = plt.plot(
-                xvalues[i],
-                yvalues[i],
-                marker=marker,
-                markersize=markersize,
-                linestyle=linestyle,
-                linewidth=linewidth,
-                label=label,
+    decimated_collections = []
+
+    if (
+        line_collection_threshold is not None
+        and len(xvalues) > line_collection_threshold
+        and not animate
+    ):
+        logger.info(
+            f"Drawing {len(xvalues)} lines as a LineCollection, without markers or legend"
+        )
+        collection, collection_data = _add_line_collection(
+            ax,
+            xvalues,
+            yvalues,
+            colors=colors,
+            colormap=colormap,
+            linestyles=linestyles,
+            linewidths=linewidths,
+            num_buckets=num_buckets if decimate else None,
+        )
+        artists.append(collection)
+        if decimate:
+            decimated_collections.append((collection, collection_data))
+        # a legend with an entry for each line would be unreadable
+        labels = None
+    else:
+        for i in range(len(xvalues)):
+            linestyle = rcParams["lines.linestyle"] if not linestyles else linestyles[i]
+            label = "" if not labels else labels[i]
+            marker = rcParams["lines.marker"] if not markers else markers[i]
+            linewidth = rcParams["lines.linewidth"] if not linewidths else linewidths[i]
+            markersize = (
+                rcParams["lines.markersize"] if not markersizes else markersizes[i]
             )
-        artists.append(artist)
+
+            xdata = xvalues[i]
+            ydata = yvalues[i]
+            full_data = None
+            if (
+                decimate
+                and not animate
+                and marker in [None, "", "None", " "]
+                and len(xdata) > 2 * num_buckets
+            ):
+                x = numpy.asarray(xdata)
+                y = numpy.asarray(ydata)
+                if x.ndim == 1 and numpy.all(x[1:] >= x[:-1]):
+                    full_data = (x, y)
+                    xdata, ydata = _minmax_decimate(x, y, num_buckets)
+                    logger.debug(
+                        f"Decimated line {i} from {len(x)} to {len(xdata)} points"
+                    )
+
+            if colors:
+                (artist,) = plt.plot(
+                    xdata,
+                    ydata,
+                    marker=marker,
+                    color=colors[i],
+                    markersize=markersize,
+                    linestyle=linestyle,
+                    linewidth=linewidth,
+                    label=label,
+                )
+            else:
+                (artist,) = plt.plot(
+                    xdata,
+                    ydata,
+                    marker=marker,
+                    markersize=markersize,
+                    linestyle=linestyle,
+                    linewidth=linewidth,
+                    label=label,
+                )
+            artists.append(artist)
+            if full_data is not None:
+                decimated_lines.append((artist, *full_data))
+
+    if len(decimated_lines) > 0 or len(decimated_collections) > 0:
+        _add_minmax_decimation(ax, decimated_lines, decimated_collections)
 
     if labels:
         legend_position = (
@@ -423,6 +695,276 @@ def generate_plot(
     return None
 
 
+class FigureContext(object):
+    """Reusable figure for repeatedly plotting traces with the same layout.
+
+    The figure, axes, legend and lines are created once using
+    :py:func:`generate_plot`. New data is then swapped into the existing
+    lines, and only the lines are redrawn on top of a cached copy of the rest
+    of the figure (blitting). This is much faster than generating a new
+    figure for each set of data, for example when creating reports for
+    parameter sweeps:
+
+    .. code-block:: python
+
+        with FigureContext(2, labels=["v", "w"], xlim=[0, 1], ylim=[-1, 1]) as fc:
+            for i, (t, v, w) in enumerate(results):
+                fc.update([t, t], [v, w])
+                fc.save(f"result_{i}.png")
+
+    Since only the lines are redrawn, the axes limits are kept fixed unless
+    `rescale` is passed to :py:meth:`update`, so it is best to provide
+    `xlim` and `ylim`. Long lines are decimated to the width of the axes, as
+    in :py:func:`generate_plot`.
+
+    .. versionadded:: 1.3.9
+
+    :param num_traces: number of traces (lines) in the figure
+    :type num_traces: int
+    :param title: title of plot
+    :type title: str
+    :param kwargs_generate_plot: other keyword arguments passed to
+        :py:func:`generate_plot` to set up the figure
+    """
+
+    def __init__(
+        self, num_traces: int, title: str = "", **kwargs_generate_plot: typing.Any
+    ):
+        for arg in [
+            "show_plot_already",
+            "close_plot",
+            "animate",
+            "save_figure_to",
+            "decimate",
+            "line_collection_threshold",
+        ]:
+            if arg in kwargs_generate_plot:
+                logger.warning(f"Ignoring argument not used by FigureContext: {arg}")
+                del kwargs_generate_plot[arg]
+
+        self.ax = generate_plot(
+            [[]] * num_traces,
+            [[]] * num_traces,
+            title,
+            show_plot_already=False,
+            close_plot=False,
+            decimate=False,
+            line_collection_threshold=None,
+            **kwargs_generate_plot,
+        )
+        self.fig = self.ax.figure
+        self.lines = list(self.ax.lines)
+        # the legend is redrawn with the lines so that it stays above them
+        self._animated = self.lines + (
+            [self.ax.get_legend()] if self.ax.get_legend() is not None else []
+        )
+        for artist in self._animated:
+            artist.set_animated(True)
+        self._background = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        """Close the figure."""
+        from matplotlib import pyplot as plt
+
+        plt.close(self.fig)
+
+    def update(
+        self,
+        xvalues: typing.List[typing.List[float]],
+        yvalues: typing.List[typing.List[float]],
+        title: typing.Optional[str] = None,
+        rescale: bool = False,
+    ) -> None:
+        """Replace the data of the traces and redraw them.
+
+        :param xvalues: X values for each trace
+        :type xvalues: list of lists
+        :param yvalues: Y values for each trace
+        :type yvalues: list of lists
+        :param title: new title to set above the plot, this requires a full
+            redraw of the figure
+        :type title: str
+        :param rescale: rescale the axes to the new data, this requires a full
+            redraw of the figure
+        :type rescale: bool
+        :raises ValueError: if the number of traces does not match the figure
+        """
+        if len(xvalues) != len(self.lines) or len(yvalues) != len(self.lines):
+            raise ValueError(
+                f"xvalues ({len(xvalues)}) and yvalues ({len(yvalues)}) must match the number of traces ({len(self.lines)})"
+            )
+
+        num_buckets = max(int(self.ax.get_window_extent().width), 1)
+        for line, xv, yv in zip(self.lines, xvalues, yvalues):
+            x = numpy.asarray(xv)
+            y = numpy.asarray(yv)
+            if len(x) > 2 * num_buckets and numpy.all(x[1:] >= x[:-1]):
+                x, y = _minmax_decimate(x, y, num_buckets)
+            line.set_data(x, y)
+
+        if title is not None:
+            self.ax.set_title(title)
+            self._background = None
+        if rescale:
+            self.ax.relim()
+            self.ax.autoscale()
+            self._background = None
+
+        self._draw()
+
+    def _draw(self) -> None:
+        """Draw the lines, redrawing the rest of the figure only if needed."""
+        canvas = self.fig.canvas
+        if self._background is None:
+            # lines are animated, so this draws everything else
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.fig.bbox)
+        else:
+            canvas.restore_region(self._background)
+        for artist in self._animated:
+            self.ax.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+
+    def save(self, file_name: str) -> None:
+        """Save the current figure to a file.
+
+        PNG files are written directly from the already rendered image when
+        the Agg backend (or an Agg based interactive backend) is used. Other
+        formats are saved using :code:`savefig`.
+
+        :param file_name: name of file to save to
+        :type file_name: str
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        if self._background is None:
+            self._draw()
+
+        canvas = self.fig.canvas
+        if os.path.splitext(file_name)[1].lower() == ".png" and isinstance(
+            canvas, FigureCanvasAgg
+        ):
+            import matplotlib.image
+
+            matplotlib.image.imsave(
+                file_name, numpy.asarray(canvas.buffer_rgba()), dpi=self.fig.dpi
+            )
+        else:
+            # animated artists are not drawn by savefig
+            for artist in self._animated:
+                artist.set_animated(False)
+            try:
+                self.fig.savefig(file_name)
+            finally:
+                for artist in self._animated:
+                    artist.set_animated(True)
+        logger.debug(f"Saved figure to {file_name}")
+
+
+def _lttb_downsample(
+    x: numpy.ndarray, y: numpy.ndarray, num_points: int
+) -> numpy.ndarray:
+    """Select points using the largest triangle three buckets algorithm.
+
+    The first and last points are always kept. The other points are split
+    into `num_points - 2` buckets, and from each bucket the point that forms
+    the largest triangle with the point selected from the previous bucket
+    and the mean of the next bucket is kept.
+
+    See Steinarsson, S. (2013). Downsampling time series for visual
+    representation (MSc thesis, University of Iceland).
+
+    :param x: x values
+    :type x: numpy.ndarray
+    :param y: y values
+    :type y: numpy.ndarray
+    :param num_points: number of points to select
+    :type num_points: int
+    :returns: sorted indices of selected points
+    :rtype: numpy.ndarray
+    """
+    num_samples = len(x)
+    if num_points >= num_samples or num_points < 3:
+        return numpy.arange(num_samples)
+
+    edges = numpy.linspace(1, num_samples - 1, num_points - 1).astype(int)
+    indices = numpy.zeros(num_points, dtype=int)
+    indices[-1] = num_samples - 1
+    for i in range(num_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i < num_points - 3:
+            next_x = x[end : edges[i + 2]].mean()
+            next_y = y[end : edges[i + 2]].mean()
+        else:
+            next_x = x[-1]
+            next_y = y[-1]
+        prev_x = x[indices[i]]
+        prev_y = y[indices[i]]
+        areas = numpy.abs(
+            (prev_x - next_x) * (y[start:end] - prev_y)
+            - (prev_x - x[start:end]) * (next_y - prev_y)
+        )
+        indices[i + 1] = start + numpy.argmax(areas)
+    return indices
+
+
+def _resample(
+    x: numpy.ndarray,
+    y: numpy.ndarray,
+    max_points: int,
+    method: str = "minmax",
+    xlim: typing.Optional[typing.Tuple[float, float]] = None,
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """Resample a series to at most about `max_points` points for display.
+
+    Series with x values that are not increasing are returned unchanged.
+
+    .. seealso::
+
+        :py:func:`_minmax_decimate`, :py:func:`_lttb_downsample`
+
+    :param x: x values
+    :type x: numpy.ndarray
+    :param y: y values
+    :type y: numpy.ndarray
+    :param max_points: maximum number of points to keep
+    :type max_points: int
+    :param method: resampling method: "minmax" or "lttb"
+    :type method: str
+    :param xlim: x range in view, only samples in it (and one on either side)
+        are kept; all samples are used if None
+    :type xlim: (float, float)
+    :returns: tuple of resampled (x, y) values
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    :raises ValueError: if method is not one of "minmax" or "lttb"
+    """
+    if method not in ["minmax", "lttb"]:
+        raise ValueError(f"Unknown resampling method {method}: use minmax or lttb")
+
+    if len(x) <= max_points or not numpy.all(x[1:] >= x[:-1]):
+        return x, y
+
+    if method == "minmax":
+        # each bucket contributes up to two points
+        return _minmax_decimate(x, y, max(max_points // 2 - 1, 1), xlim)
+
+    start = 0
+    stop = len(x)
+    if xlim is not None:
+        start = max(int(numpy.searchsorted(x, min(xlim), side="left")) - 1, 0)
+        stop = min(int(numpy.searchsorted(x, max(xlim), side="right")) + 1, stop)
+    x = x[start:stop]
+    y = y[start:stop]
+    indices = _lttb_downsample(x, y, max_points)
+    return x[indices], y[indices]
+
+
 def generate_interactive_plot(
     xvalues: typing.List[float],
     yvalues: typing.List[float],
@@ -455,7 +997,10 @@ def generate_interactive_plot(
     layout: typing.Optional[dict] = None,
     show_interactive: bool = True,
     save_figure_to: typing.Optional[str] = None,
-) -> None:
+    max_points: typing.Optional[int] = 10000,
+    resampler: str = "minmax",
+    live: bool = False,
+) -> typing.Any:
     """Utility function to generate interactive plots using Plotly.
 
     This function can be used to generate graphs with multiple plot lines.
@@ -479,6 +1024,13 @@ def generate_interactive_plot(
     See the plotly documentation for more information:
     https://plotly.com/python-api-reference/generated/plotly.graph_objects.scatter.html
 
+    .. versionadded:: 1.3.9
+
+        - max_points
+        - resampler
+        - live
+        - the figure is returned, instead of None
+
     :param xvalues: X values
     :type xvalues: list of lists
     :param yvalues: Y values
@@ -547,10 +1099,32 @@ def generate_interactive_plot(
         https://plotly.com/python-api-reference/generated/plotly.graph_objects.Figure.html#plotly.graph_objects.Figure.write_image
         Note: you can also save the file from the interactive web page.
     :type save_figure_to: str
+    :param max_points: maximum number of points to include in the figure
+        for each trace. Longer traces are resampled, so that the size of the
+        generated figure (and saved HTML files) does not depend on the
+        length of the recording. Use None to include all points.
+    :type max_points: int or None
+    :param resampler: method used to resample traces: "minmax" keeps the
+        minimum and maximum of each bucket of samples, preserving the
+        envelope of the data including spikes; "lttb" uses the largest
+        triangle three buckets algorithm, which preserves the visual shape
+        of the data
+    :type resampler: str
+    :param live: return a plotly FigureWidget that resamples the full data
+        for the visible range when the x axis is zoomed or panned, instead
+        of a static figure. This requires a Jupyter environment with
+        ipywidgets/anywidget installed. The widget is not shown here: display
+        it by making it the result of a notebook cell.
+    :type live: bool
+    :returns: the plotly figure (or FigureWidget if live is True)
+    :raises ValueError: if resampler is not one of "minmax" or "lttb"
     """
     import plotly.graph_objects as go
 
-    fig = go.Figure()
+    if resampler not in ["minmax", "lttb"]:
+        raise ValueError(f"Unknown resampler {resampler}: use minmax or lttb")
+
+    fig = go.FigureWidget() if live else go.Figure()
 
     if len(xvalues) != len(yvalues):
         raise ValueError("length of x values does not match length of y values")
@@ -569,11 +1143,22 @@ def generate_interactive_plot(
     if not modes:
         modes = len(xvalues) * ["lines+markers"]
 
+    full_data = []
     for i in range(len(xvalues)):
+        x = numpy.asarray(xvalues[i])
+        y = numpy.asarray(yvalues[i])
+        full_data.append((x, y))
+        if max_points is not None:
+            x, y = _resample(x, y, max_points, resampler)
+            if len(x) < len(full_data[-1][0]):
+                logger.debug(
+                    f"Resampled trace {i} from {len(full_data[-1][0])} to {len(x)} points"
+                )
+
         fig.add_trace(
             go.Scattergl(
-                x=xvalues[i],
-                y=yvalues[i],
+                x=x,
+                y=y,
                 name=labels[i],
                 marker={"size": markersizes[i], "symbol": markers[i]},
                 line={"dash": linestyles[i], "width": linewidths[i]},
@@ -616,7 +1201,17 @@ def generate_interactive_plot(
     if layout:
         fig.update_layout(layout, overwrite=True)
 
-    if show_interactive:
+    if live and max_points is not None:
+
+        def on_relayout(layout, xrange, *args):
+            xlim = None if xrange is None else (xrange[0], xrange[1])
+            with fig.batch_update():
+                for trace, (x, y) in zip(fig.data, full_data):
+                    trace.x, trace.y = _resample(x, y, max_points, resampler, xlim)
+
+        fig.layout.on_change(on_relayout, "xaxis.range")
+
+    if show_interactive and not live:
         fig.show()
 
     if save_figure_to:
@@ -625,3 +1220,5 @@ def generate_interactive_plot(
         )
         fig.write_image(save_figure_to, scale=2, width=1024, height=768)
         logger.info("Saved image to %s of plot: %s" % (save_figure_to, title))
+
+    return fig
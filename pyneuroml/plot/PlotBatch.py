@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Render many figures in parallel without a GUI.
+
+File: pyneuroml/plot/PlotBatch.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import concurrent.futures
+import importlib
+import logging
+import time
+import traceback
+import typing
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+# plotting functions that can be named in jobs, with the keyword arguments
+# used to save figures to files and to stop them from being shown
+BATCH_PLOT_FUNCTIONS = {
+    "generate_plot": (
+        "pyneuroml.plot.Plot",
+        "save_figure_to",
+        {"show_plot_already": False},
+    ),
+    "plot_time_series": (
+        "pyneuroml.plot.PlotTimeSeries",
+        "save_figure_to",
+        {"show_plot_already": False},
+    ),
+    "plot_spikes": (
+        "pyneuroml.plot.PlotSpikes",
+        "save_spike_plot_to",
+        {"show_plots_already": False},
+    ),
+    "plot_2D": (
+        "pyneuroml.plot.PlotMorphology",
+        "save_to_file",
+        {"nogui": True},
+    ),
+}  # type: typing.Dict[str, typing.Tuple[str, str, typing.Dict[str, typing.Any]]]
+
+
+def _init_batch_worker() -> None:
+    """Initialise a worker process for rendering figures.
+
+    This selects the non-interactive Agg backend, and loads matplotlib, its
+    font cache, and the plotting modules once so that the cost is not
+    repeated for each job.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+    from matplotlib import font_manager
+    from matplotlib import pyplot as plt
+
+    plt.switch_backend("Agg")
+    font_manager.findfont(
+        font_manager.FontProperties(family=matplotlib.rcParams["font.family"])
+    )
+
+    for module_name, _, _ in BATCH_PLOT_FUNCTIONS.values():
+        importlib.import_module(module_name)
+
+
+def _render_job(job: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """Render a single plot job.
+
+    Errors are caught and returned so that one failing job does not stop
+    the others.
+
+    :param job: job dictionary, see :py:func:`render_plots`
+    :type job: dict
+    :returns: result dictionary, see :py:func:`render_plots`
+    :rtype: dict
+    """
+    from matplotlib import pyplot as plt
+
+    output = job.get("output", None)
+    start = time.perf_counter()
+    error = None
+    try:
+        function = job["function"]
+        kwargs = dict(job.get("kwargs", {}))
+        if isinstance(function, str):
+            try:
+                module_name, save_arg, headless_args = BATCH_PLOT_FUNCTIONS[function]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown plot function {function}: use one of {list(BATCH_PLOT_FUNCTIONS.keys())} or a function"
+                )
+            function = getattr(importlib.import_module(module_name), function)
+            kwargs.update(headless_args)
+            if output is not None:
+                kwargs[save_arg] = output
+        function(*job.get("args", []), **kwargs)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        plt.close("all")
+
+    return {"output": output, "time": time.perf_counter() - start, "error": error}
+
+
+def render_plots(
+    jobs: typing.List[typing.Dict[str, typing.Any]],
+    max_workers: typing.Optional[int] = None,
+    chunksize: int = 1,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Render a list of plot jobs in parallel using a pool of processes.
+
+    Each worker process uses the non-interactive Agg backend and loads
+    matplotlib and the plotting modules once, so rendering many figures
+    does not repeat these costs and can use all available cores.
+
+    Each job is a dictionary with the keys:
+
+    - :code:`function`: the plotting function, either one of the names
+      :code:`generate_plot`, :code:`plot_time_series`, :code:`plot_spikes`,
+      :code:`plot_2D`, or a module level function (which must be picklable)
+    - :code:`args`: optional list of positional arguments for the function
+    - :code:`kwargs`: optional dictionary of keyword arguments for the
+      function
+    - :code:`output`: file to save the figure to. For named functions, this
+      is passed as the function's argument for saving figures, and
+      arguments to prevent the figure from being shown are also set. For
+      other functions, it is only used to identify the result.
+
+    For example:
+
+    .. code-block:: python
+
+        jobs = [
+            {
+                "function": "generate_plot",
+                "kwargs": {"xvalues": [t], "yvalues": [v], "title": cell},
+                "output": f"{cell}.png",
+            }
+            for cell, (t, v) in traces.items()
+        ]
+        results = render_plots(jobs)
+
+    Open figures are closed after each job.
+
+    .. versionadded:: 1.3.9
+
+    :param jobs: list of job dictionaries
+    :type jobs: list(dict)
+    :param max_workers: number of worker processes, defaults to the number of
+        processors
+    :type max_workers: int
+    :param chunksize: number of jobs sent to a worker at a time, larger
+        values reduce overhead for many small jobs
+    :type chunksize: int
+    :returns: list of result dictionaries, in the same order as the jobs,
+        with keys :code:`output` (the output file of the job),
+        :code:`time` (time taken to render it, in seconds), and
+        :code:`error` (the formatted traceback if the job failed, else None)
+    :rtype: list(dict)
+    """
+    logger.info(f"Rendering {len(jobs)} plots")
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_batch_worker
+    ) as executor:
+        results = list(executor.map(_render_job, jobs, chunksize=chunksize))
+
+    failed = [r for r in results if r["error"] is not None]
+    for result in failed:
+        logger.error(f"Failed to render {result['output']}:\n{result['error']}")
+    logger.info(
+        f"Rendered {len(jobs) - len(failed)} of {len(jobs)} plots in {time.perf_counter() - start:.2f} s"
+    )
+
+    return results
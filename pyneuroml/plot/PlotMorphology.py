@@ -8,11 +8,13 @@ Copyright 2023 NeuroML contributors
 """
 
 import argparse
+import glob
+import json
 import logging
 import os
 import random
-import sys
 import typing
+import weakref
 from typing import Optional
 
 import matplotlib
@@ -26,19 +28,52 @@ from pyneuroml.utils import extract_position_info
 from pyneuroml.utils.cli import build_namespace
 from pyneuroml.utils.plot import (
     DEFAULTS,
-    add_box_to_matplotlib_2D_plot,
-    add_line_to_matplotlib_2D_plot,
+    add_boxes_to_matplotlib_2D_plot,
+    add_density_image_to_matplotlib_2D_plot,
+    add_lines_to_matplotlib_2D_plot,
+    add_points_to_matplotlib_2D_plot,
     add_scalebar_to_matplotlib_plot,
     add_text_to_matplotlib_2D_plot,
     autoscale_matplotlib_plot,
     get_new_matplotlib_morph_plot,
     get_next_hex_color,
+    get_next_hex_colors,
     load_minimal_morphplottable__model,
+    set_matplotlib_morph_plot_axis_labels,
+    setup_matplotlib_morph_plot_axes,
 )
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# sizes of cells on screen (pixels) below which cells are drawn as points,
+# and as skeletons of lines from the soma to each tip, in 2D network plots
+LOD_POINT_PIXELS = 3
+LOD_SKELETON_PIXELS = 30
+
+# number of point cells in a population above which the density of cells is
+# plotted instead of the individual cells
+POINT_CELL_DENSITY_THRESHOLD = 100000
+
+# end points of the segment groups of cells used in schematic plots, for each
+# cell object and list of segment groups
+_SCHEMATIC_GEOMETRY_CACHE = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary[Cell, typing.Dict[typing.Any, typing.Tuple]]
+
+# documents included by models plotted in batches, shared by the models
+# plotted in each worker process
+_BATCH_INCLUDE_CACHE = {}  # type: typing.Dict[typing.Tuple[str, float], typing.Any]
+
+# indices of the 3D coordinates used for the horizontal and vertical axes of
+# each plane
+PLANE_AXES = {
+    "xy": (0, 1),
+    "yx": (1, 0),
+    "xz": (0, 2),
+    "zx": (2, 0),
+    "yz": (1, 2),
+    "zy": (2, 1),
+}
+
 
 def process_args():
     """
@@ -52,7 +87,7 @@ def process_args():
         "nmlFile",
         type=str,
         metavar="<NeuroML 2 file>",
-        help="Name of the NeuroML 2 file",
+        help="Name of the NeuroML 2 file, or a directory or quoted glob pattern of files to plot in 2D in a batch",
     )
 
     parser.add_argument(
@@ -138,6 +173,22 @@ def process_args():
         help="Scale axes so that image is approximately square, for 2D plot",
     )
 
+    parser.add_argument(
+        "-outputDir",
+        type=str,
+        metavar="<directory>",
+        default=DEFAULTS["outputDir"],
+        help="Directory to save images and manifest to, for batches of 2D plots",
+    )
+
+    parser.add_argument(
+        "-workers",
+        type=int,
+        metavar="<number of worker processes>",
+        default=DEFAULTS["workers"],
+        help="Number of processes to plot batches in, defaults to the number of processors",
+    )
+
     return parser.parse_args()
 
 
@@ -170,6 +221,18 @@ def plot_from_console(a: typing.Optional[typing.Any] = None, **kwargs: str):
             upright=a.upright,
             axes_pos=a.show_axes,
         )
+    elif os.path.isdir(a.nml_file) or glob.has_magic(a.nml_file):
+        plot_2D_batch(
+            a.nml_file,
+            a.output_dir,
+            max_workers=a.workers,
+            plane2d=a.plane2d,
+            min_width=a.min_width,
+            verbose=a.v,
+            square=a.square,
+            plot_type=a.plot_type,
+            plot_spec={"point_fraction": a.point_fraction},
+        )
     else:
         plot_2D(
             a.nml_file,
@@ -186,7 +249,7 @@ def plot_from_console(a: typing.Optional[typing.Any] = None, **kwargs: str):
 
 def plot_2D(
     nml_file: typing.Union[str, NeuroMLDocument, Cell],
-    plane2d: str = "xy",
+    plane2d: typing.Union[str, numpy.ndarray, typing.List[typing.Any]] = "xy",
     min_width: float = DEFAULTS["minWidth"],  # noqa
     verbose: bool = False,
     nogui: bool = False,
@@ -199,6 +262,9 @@ def plot_2D(
         typing.Dict[str, typing.Union[str, typing.List[int], float]]
     ] = None,
     highlight_spec: typing.Optional[typing.Dict[typing.Any, typing.Any]] = None,
+    lod: bool = True,
+    density_threshold: typing.Optional[int] = POINT_CELL_DENSITY_THRESHOLD,
+    separate_figures: bool = False,
 ):
     """Plot cells in a 2D plane.
 
@@ -209,15 +275,32 @@ def plot_2D(
 
     This method uses matplotlib.
 
+    Several views can be plotted in one call by passing a list of planes or
+    projection matrices. The model is only loaded and processed once, and
+    the geometry is projected for each view. Views are plotted in subplots
+    of one figure, or in separate figures.
+
     .. versionadded:: 1.1.12
         The hightlight_spec parameter
 
+    .. versionadded:: 1.3.9
+        The lod, density_threshold, and separate_figures parameters, and
+        projection matrices and lists of views for plane2d
+
+    .. versionchanged:: 1.3.9
+        Level of detail rendering is used by default, so cells in networks
+        that are small at the size of the figure are now drawn as skeletons
+        or points instead of with all their segments, including in saved
+        images. Pass lod=False to draw all segments of all cells.
 
     :param nml_file: path to NeuroML cell file, or a NeuroMLDocument object
     :type nml_file: str or :py:class:`neuroml.NeuroMLDocument` or
         :py:class:`neuroml.Cell`
-    :param plane2d: what plane to plot (xy/yx/yz/zy/zx/xz)
-    :type plane2d: str
+    :param plane2d: what plane to plot (xy/yx/yz/zy/zx/xz), or a projection
+        matrix of shape (2, 3) whose rows give the coefficients of x, y, z
+        for the horizontal and vertical axes, or a list of these to plot
+        several views
+    :type plane2d: str or numpy.ndarray or list
     :param min_width: minimum width for segments (useful for visualising very
         thin segments): default 0.8um
     :type min_width: float
@@ -225,7 +308,10 @@ def plot_2D(
     :type verbose: bool
     :param nogui: do not show matplotlib GUI (default: false)
     :type nogui: bool
-    :param save_to_file: optional filename to save generated morphology to
+    :param save_to_file: optional filename to save generated morphology to.
+        If several views are plotted in separate figures, the name of each
+        view (the plane, or "view<n>" for the n-th view if it is a
+        projection matrix) is appended to the file name.
     :type save_to_file: str
     :param square: scale axes so that image is approximately square
     :type square: bool
@@ -288,6 +374,22 @@ def plot_2D(
             }
 
     :type highlight_spec: dict
+    :param lod: use level of detail rendering for detailed and constant cells
+        in networks: cells outside the axes limits are not drawn, cells
+        smaller than LOD_SKELETON_PIXELS pixels are drawn as skeletons of
+        lines from the soma to each tip, and cells smaller than
+        LOD_POINT_PIXELS pixels are drawn as points. The level of detail is
+        recomputed when the plot is zoomed or panned. This makes plots of large
+        networks much faster, but changes how small cells look, also in saved
+        images: set to False to draw all segments of all cells (default: True)
+    :type lod: bool
+    :param density_threshold: number of cells in a population plotted as
+        points above which an image of the density of the cells is plotted
+        instead, None to always plot the individual cells
+    :type density_threshold: int
+    :param separate_figures: if several views are plotted, plot each in a
+        separate figure instead of in subplots of one figure
+    :type separate_figures: bool
     """
 
     if plot_type not in ["detailed", "constant", "schematic", "point"]:
@@ -298,6 +400,18 @@ def plot_2D(
     if highlight_spec is None:
         highlight_spec = {}
 
+    # a single plane or projection matrix, or a list of these
+    if isinstance(plane2d, str) or numpy.ndim(plane2d[0]) == 1:
+        views = [plane2d]
+    else:
+        views = list(plane2d)
+    # check all views before loading the model
+    for view in views:
+        _get_projection(view)
+    view_names = [
+        view if isinstance(view, str) else f"view{i}" for i, view in enumerate(views)
+    ]
+
     if verbose:
         print("Plotting %s" % nml_file)
 
@@ -364,9 +478,6 @@ def plot_2D(
     # not used, clear up
     del cell_id_vs_cell
 
-    fig, ax = get_new_matplotlib_morph_plot(title, plane2d)
-    axis_min_max = [float("inf"), -1 * float("inf")]
-
     # process plot_spec
     point_cells = []  # type: typing.List[int]
     schematic_cells = []  # type: typing.List[int]
@@ -390,6 +501,14 @@ def plot_2D(
         except KeyError:
             pass
 
+    # segments of each detailed cell type (and colour), computed once and
+    # shared by all its instances and all views
+    cell_templates = {}  # type: typing.Dict[typing.Tuple[str, str], typing.Tuple]
+    template_offsets = {}  # type: typing.Dict[typing.Tuple[str, str], typing.List]
+    template_terminals = {}  # type: typing.Dict[typing.Tuple[str, str], numpy.ndarray]
+    # cells of each population that are plotted as schematics or points
+    population_plots = []  # type: typing.List[typing.Tuple]
+
     while pop_id_vs_cell:
         pop_id, cell = pop_id_vs_cell.popitem()
         pos_pop = positions[pop_id]  # type: typing.Dict[typing.Any, typing.List[float]]
@@ -406,24 +525,19 @@ def plot_2D(
             except KeyError:
                 pass
 
+        radius = pop_id_vs_radii[pop_id] if pop_id in pop_id_vs_radii else 10
+        color = pop_id_vs_color[pop_id] if pop_id in pop_id_vs_color else None
+        # positions of cells of this population that are plotted as points
+        # or schematics, plotted together in each view
+        point_positions = []  # type: typing.List[typing.List[float]]
+        schematic_positions = []  # type: typing.List[typing.List[float]]
+        soma_x_y_z = None
+
         while pos_pop:
             cell_index, pos = pos_pop.popitem()
-            radius = pop_id_vs_radii[pop_id] if pop_id in pop_id_vs_radii else 10
-            color = pop_id_vs_color[pop_id] if pop_id in pop_id_vs_color else None
 
             if cell is None:
-                plot_2D_point_cells(
-                    offset=pos,
-                    plane2d=plane2d,
-                    color=color,
-                    soma_radius=radius,
-                    verbose=verbose,
-                    ax=ax,
-                    fig=fig,
-                    autoscale=False,
-                    scalebar=False,
-                    nogui=True,
-                )
+                point_positions.append(pos)
             else:
                 if (
                     plot_type == "point"
@@ -431,75 +545,108 @@ def plot_2D(
                     or cell.id in point_cells
                 ):
                     # assume that soma is 0, plot point at where soma should be
-                    soma_x_y_z = cell.get_actual_proximal(0)
-                    pos1 = [
-                        pos[0] + soma_x_y_z.x,
-                        pos[1] + soma_x_y_z.y,
-                        pos[2] + soma_x_y_z.z,
-                    ]
-                    plot_2D_point_cells(
-                        offset=pos1,
-                        plane2d=plane2d,
-                        color=color,
-                        soma_radius=radius,
-                        verbose=verbose,
-                        ax=ax,
-                        fig=fig,
-                        autoscale=False,
-                        scalebar=False,
-                        nogui=True,
+                    if soma_x_y_z is None:
+                        soma_x_y_z = cell.get_actual_proximal(0)
+                    point_positions.append(
+                        [
+                            pos[0] + soma_x_y_z.x,
+                            pos[1] + soma_x_y_z.y,
+                            pos[2] + soma_x_y_z.z,
+                        ]
                     )
                 elif plot_type == "schematic" or cell.id in schematic_cells:
-                    plot_2D_schematic(
-                        offset=pos,
-                        cell=cell,
-                        segment_groups=None,
-                        labels=False,
-                        plane2d=plane2d,
-                        verbose=verbose,
-                        fig=fig,
-                        ax=ax,
-                        scalebar=False,
-                        nogui=True,
-                        autoscale=False,
-                        square=False,
-                    )
+                    schematic_positions.append(pos)
                 elif (
                     plot_type == "detailed"
                     or cell.id in detailed_cells
                     or plot_type == "constant"
                     or cell.id in constant_cells
                 ):
-                    cell_highlight_spec = {}
-                    try:
-                        cell_highlight_spec = highlight_spec[cell.id]
-                    except KeyError:
-                        pass
-                    plot_2D_cell_morphology(
-                        offset=pos,
-                        cell=cell,
-                        plane2d=plane2d,
-                        color=color,
-                        plot_type=plot_type,
-                        verbose=verbose,
-                        fig=fig,
-                        ax=ax,
-                        min_width=min_width,
-                        axis_min_max=axis_min_max,
-                        scalebar=False,
-                        nogui=True,
-                        autoscale=False,
-                        square=False,
-                        highlight_spec=cell_highlight_spec,
-                    )
+                    template_key = (cell.id, str(color))
+                    if template_key not in cell_templates:
+                        cell_highlight_spec = {}
+                        try:
+                            cell_highlight_spec = highlight_spec[cell.id]
+                        except KeyError:
+                            pass
+                        cell_templates[template_key] = _get_cell_segments(
+                            cell,
+                            color=color,
+                            min_width=min_width,
+                            plot_type=plot_type,
+                            highlight_spec=cell_highlight_spec,
+                            verbose=verbose,
+                        )
+                        template_terminals[template_key] = (
+                            _get_terminal_segment_indices(cell)
+                        )
+                        template_offsets[template_key] = []
+                    template_offsets[template_key].append(pos)
+
+        population_plots.append(
+            (cell, schematic_positions, point_positions, color, radius)
+        )
 
-    add_scalebar_to_matplotlib_plot(axis_min_max, ax)
-    autoscale_matplotlib_plot(verbose, square)
+    cell_templates = {
+        key: (
+            *template,
+            template_terminals[key],
+            numpy.array(template_offsets[key], dtype=float),
+        )
+        for key, template in cell_templates.items()
+    }
+
+    if len(views) == 1:
+        fig, ax = get_new_matplotlib_morph_plot(title, views[0])
+        axes = [ax]
+    elif not separate_figures:
+        figsize = matplotlib.rcParams["figure.figsize"]
+        fig, axes_array = plt.subplots(
+            1, len(views), figsize=(figsize[0] * len(views), figsize[1]), squeeze=False
+        )
+        axes = list(axes_array[0])
+        plt.get_current_fig_manager().set_window_title(title)
+        fig.suptitle(title)
+        for ax, view_name, view in zip(axes, view_names, views):
+            setup_matplotlib_morph_plot_axes(ax, view)
+            ax.set_title(view_name)
+
+    for i, (view_name, view) in enumerate(zip(view_names, views)):
+        if len(views) > 1 and separate_figures:
+            fig, ax = get_new_matplotlib_morph_plot(f"{title} ({view_name})", view)
+        else:
+            ax = axes[i]
 
-    if save_to_file:
+        _plot_2D_view(
+            fig,
+            ax,
+            view,
+            population_plots,
+            cell_templates,
+            min_width=min_width,
+            verbose=verbose,
+            square=square,
+            lod=lod,
+            density_threshold=density_threshold,
+        )
+
+        if len(views) > 1 and separate_figures:
+            if save_to_file:
+                root, ext = os.path.splitext(save_to_file)
+                abs_file = os.path.abspath(f"{root}_{view_name}{ext}")
+                fig.savefig(abs_file, dpi=200, bbox_inches="tight")
+                print(
+                    f"Saved image on plane {view_name} to {abs_file} of plot: {title}"
+                )
+            if close_plot and nogui:
+                plt.close(fig)
+
+    if save_to_file and not (len(views) > 1 and separate_figures):
         abs_file = os.path.abspath(save_to_file)
         plt.savefig(abs_file, dpi=200, bbox_inches="tight")
-        print(f"Saved image on plane {plane2d} to {abs_file} of plot: {title}")
+        print(
+            f"Saved image on plane {', '.join(view_names)} to {abs_file} of plot: {title}"
+        )
 
     if not nogui:
         plt.show()
@@ -508,6 +655,692 @@ def plot_2D(
         plt.close()
 
 
+def _plot_2D_view(
+    fig: matplotlib.figure.Figure,
+    ax: matplotlib.axes.Axes,
+    plane2d: typing.Any,
+    population_plots: typing.List[typing.Tuple],
+    cell_templates: typing.Dict[typing.Tuple[str, str], typing.Tuple],
+    min_width: float,
+    verbose: bool,
+    square: bool,
+    lod: bool,
+    density_threshold: typing.Optional[int],
+) -> None:
+    """Plot one view of the cells of a network, for :py:func:`plot_2D`.
+
+    :param fig: figure to plot in
+    :type fig: matplotlib.figure.Figure
+    :param ax: axes to plot on
+    :type ax: matplotlib.axes.Axes
+    :param plane2d: plane or projection matrix, see :py:func:`_get_projection`
+    :type plane2d: str or numpy.ndarray
+    :param population_plots: list of tuples, one for each population, of the
+        cell, the positions of cells to plot as schematics, the positions of
+        cells to plot as points, the colour, and the radius for point cells
+    :type population_plots: list
+    :param cell_templates: dictionary with (cell id, colour) keys and values
+        of tuples of the segments of the cell (see
+        :py:func:`_get_cell_segments`), the indices of its terminal segments,
+        and the positions of its instances (array of shape (number of
+        instances, 3))
+    :type cell_templates: dict
+    :param lod: toggle level of detail rendering of cells, see
+        :py:func:`plot_2D`
+    :type lod: bool
+
+    .. seealso::
+
+        :py:func:`plot_2D`
+            for descriptions of the other parameters
+    """
+    projection = _get_projection(plane2d)
+    axis_min_max = [float("inf"), -1 * float("inf")]
+
+    for cell, schematic_positions, point_positions, color, radius in population_plots:
+        if len(schematic_positions) > 0:
+            plot_2D_schematic(
+                offset=schematic_positions,
+                cell=cell,
+                segment_groups=None,
+                labels=False,
+                plane2d=plane2d,
+                verbose=verbose,
+                fig=fig,
+                ax=ax,
+                scalebar=False,
+                nogui=True,
+                autoscale=False,
+                square=False,
+            )
+
+        if len(point_positions) > 0:
+            plot_2D_point_cells(
+                offset=point_positions,
+                plane2d=plane2d,
+                color=color,
+                soma_radius=radius,
+                verbose=verbose,
+                ax=ax,
+                fig=fig,
+                axis_min_max=axis_min_max,
+                autoscale=False,
+                scalebar=False,
+                nogui=True,
+                density_threshold=density_threshold,
+            )
+
+    # place all instances of each cell type by offsetting its projected
+    # segments
+    templates = []
+    for template_key, (
+        proximals,
+        distals,
+        widths,
+        colors,
+        terminals,
+        offsets,
+    ) in cell_templates.items():
+        logger.debug(
+            f"Plotting {len(offsets)} instances of {template_key[0]} with {len(widths)} segments each"
+        )
+        xvs, yvs = _project_segments(proximals, distals, projection)
+        templates.append((xvs, yvs, widths, colors, terminals, offsets @ projection.T))
+
+    if lod and len(templates) > 0:
+        _add_2D_cell_templates_with_lod(ax, templates, min_width, axis_min_max)
+    else:
+        for xvs, yvs, widths, colors, terminals, offsets in templates:
+            add_lines_to_matplotlib_2D_plot(
+                ax,
+                (xvs[numpy.newaxis, :, :] + offsets[:, 0, None, None]).reshape(-1, 2),
+                (yvs[numpy.newaxis, :, :] + offsets[:, 1, None, None]).reshape(-1, 2),
+                numpy.tile(widths, len(offsets)),
+                numpy.tile(colors, (len(offsets), 1)),
+                axis_min_max,
+            )
+
+    add_scalebar_to_matplotlib_plot(axis_min_max, ax)
+    plt.sca(ax)
+    autoscale_matplotlib_plot(verbose, square)
+
+
+def _plot_2D_batch_file(
+    nml_file: str, save_to_file: str, **plot_options: typing.Any
+) -> None:
+    """Plot one file for :py:func:`plot_2D_batch`.
+
+    This runs in the worker processes. Files included by the models are
+    read once in each worker and shared between the models that include
+    them.
+
+    :param nml_file: path to NeuroML file
+    :type nml_file: str
+    :param save_to_file: file to save the image to
+    :type save_to_file: str
+    :param plot_options: other options passed to :py:func:`plot_2D`
+    """
+    if nml_file.endswith(".h5"):
+        nml_model = nml_file
+    else:
+        nml_model = read_neuroml2_file(
+            nml_file,
+            include_includes=False,
+            check_validity_pre_include=False,
+            verbose=False,
+            optimized=True,
+        )
+        load_minimal_morphplottable__model(
+            nml_model, nml_file, include_cache=_BATCH_INCLUDE_CACHE
+        )
+
+    plot_2D(
+        nml_model,
+        nogui=True,
+        save_to_file=save_to_file,
+        close_plot=True,
+        **plot_options,
+    )
+
+
+def _get_batch_files(
+    nml_files: typing.Union[str, typing.List[str]],
+) -> typing.List[str]:
+    """Get the list of NeuroML files to plot for :py:func:`plot_2D_batch`.
+
+    :param nml_files: directory, glob pattern, or list of files, see
+        :py:func:`plot_2D_batch`
+    :type nml_files: str or list(str)
+    :returns: sorted list of files
+    :rtype: list(str)
+    """
+    if not isinstance(nml_files, str):
+        return list(nml_files)
+    if os.path.isdir(nml_files):
+        return sorted(glob.glob(os.path.join(nml_files, "**", "*.nml"), recursive=True))
+    return sorted(glob.glob(nml_files, recursive=True))
+
+
+def plot_2D_batch(
+    nml_files: typing.Union[str, typing.List[str]],
+    output_dir: str,
+    image_format: str = "png",
+    manifest_file: typing.Optional[str] = "manifest.json",
+    max_workers: typing.Optional[int] = None,
+    chunksize: int = 1,
+    **plot_options: typing.Any,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Plot many NeuroML files in 2D in parallel.
+
+    Files are plotted with :py:func:`plot_2D` in a pool of worker processes
+    (see :py:func:`pyneuroml.plot.PlotBatch.render_plots`), so matplotlib
+    and pyNeuroML are only loaded once in each worker. Only the parts of the
+    models needed for plotting are loaded, and files that are included by
+    several models, such as cells included in networks, are only read once
+    in each worker.
+
+    Each image is saved in the output directory, at the same path relative
+    to it as the NeuroML file relative to the directory of the files, with
+    the extension replaced by the image format. A JSON manifest listing each
+    file, its image, the time taken to plot it, and any error is also
+    written to the output directory.
+
+    Files that fail to plot do not stop the others.
+
+    .. versionadded:: 1.3.9
+
+    :param nml_files: directory, in which all NeuroML (.nml) files are
+        plotted recursively, or glob pattern (for example
+        :code:`"cells/**/*.cell.nml"`), or list of files
+    :type nml_files: str or list(str)
+    :param output_dir: directory to save the images and manifest to
+    :type output_dir: str
+    :param image_format: format of images, as the file extension
+    :type image_format: str
+    :param manifest_file: name of the manifest file in the output directory,
+        None to not write a manifest
+    :type manifest_file: str
+    :param max_workers: number of worker processes, defaults to the number of
+        processors
+    :type max_workers: int
+    :param chunksize: number of files sent to a worker at a time, larger
+        values reduce overhead for many small files
+    :type chunksize: int
+    :param plot_options: other options passed to :py:func:`plot_2D`, for
+        example :code:`plane2d` or :code:`plot_type`
+    :returns: list of result dictionaries, one for each file, with keys
+        :code:`input` (the NeuroML file), :code:`output` (the image file),
+        :code:`time` (time taken to plot it, in seconds), and :code:`error`
+        (the formatted traceback if plotting failed, else None)
+    :rtype: list(dict)
+    """
+    files = _get_batch_files(nml_files)
+    if len(files) == 0:
+        logger.warning(f"No NeuroML files found in {nml_files}")
+        return []
+
+    base_dir = (
+        nml_files
+        if isinstance(nml_files, str) and os.path.isdir(nml_files)
+        else os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files])
+    )
+    jobs = []
+    for nml_file in files:
+        output = os.path.join(
+            output_dir,
+            os.path.splitext(
+                os.path.relpath(os.path.abspath(nml_file), os.path.abspath(base_dir))
+            )[0]
+            + f".{image_format}",
+        )
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        jobs.append(
+            {
+                "function": _plot_2D_batch_file,
+                "args": [nml_file, output],
+                "kwargs": plot_options,
+                "output": output,
+            }
+        )
+
+    from pyneuroml.plot.PlotBatch import render_plots
+
+    results = render_plots(jobs, max_workers=max_workers, chunksize=chunksize)
+    results = [
+        {"input": nml_file, **result} for nml_file, result in zip(files, results)
+    ]
+
+    if manifest_file is not None:
+        manifest_path = os.path.join(output_dir, manifest_file)
+        with open(manifest_path, "w") as f:
+            json.dump(results, f, indent=4)
+        logger.info(f"Saved manifest of {len(results)} files to {manifest_path}")
+
+    return results
+
+
+def _get_terminal_segment_indices(cell: Cell) -> numpy.ndarray:
+    """Get the indices of the terminal segments of a cell.
+
+    Terminal segments are segments that are not the parent of any other
+    segment: the tips of the dendrites and axons.
+
+    :param cell: cell to get terminal segments of
+    :type cell: neuroml.Cell
+    :returns: indices of terminal segments in the list of segments of the
+        cell's morphology
+    :rtype: numpy.ndarray
+    """
+    parents = set(seg.parent.segments for seg in cell.morphology.segments if seg.parent)
+    return numpy.array(
+        [i for i, seg in enumerate(cell.morphology.segments) if seg.id not in parents],
+        dtype=int,
+    )
+
+
+class _ViewUpdater(matplotlib.artist.Artist):
+    """Artist that updates other artists of an axes when it is drawn.
+
+    It is drawn before the artists that it updates, after the axes have
+    applied their final limits and aspect, so the update runs once for each
+    draw, however many times the limits changed since the previous one.
+    Artists that the update adds are drawn by it, since the axes have
+    already collected the artists to draw.
+
+    :param update: function that is called with the axes when the view has
+        changed, and returns the artists it added
+    :type update: callable
+    """
+
+    def __init__(self, update: typing.Callable) -> None:
+        """Initialise the artist."""
+        super().__init__()
+        self._update = update
+        self.view_changed = False
+        self.set_in_layout(False)
+
+    def draw(self, renderer) -> None:
+        """Update the artists if the view changed, and draw new ones."""
+        if not self.view_changed:
+            return
+        self.view_changed = False
+        for artist in self._update(self.axes):
+            artist.draw(renderer)
+
+
+def _add_2D_cell_templates_with_lod(
+    ax: matplotlib.axes.Axes,
+    templates: typing.List[typing.Tuple],
+    min_width: float,
+    axis_min_max: typing.List[float],
+) -> None:
+    """Draw instances of cells with view culling and level of detail.
+
+    Only instances that overlap the axes limits are drawn. The level of
+    detail for each cell type is chosen from its size in pixels:
+
+    - cells larger than LOD_SKELETON_PIXELS are drawn with all segments
+    - cells larger than LOD_POINT_PIXELS are drawn as skeletons: lines from
+      the soma (the proximal point of the first segment) to each tip
+    - smaller cells are drawn as points at their somata
+
+    The drawn collections are recomputed when the axes are next drawn after
+    their limits change.
+
+    .. seealso::
+
+        :py:func:`plot_2D`
+
+    :param ax: axes to draw on
+    :type ax: matplotlib.axes.Axes
+    :param templates: list of tuples, one for each cell type, of projected x
+        values, y values, widths, and colours of segments (see
+        :py:func:`_get_2D_cell_segments`), indices of terminal segments (see
+        :py:func:`_get_terminal_segment_indices`), and projected positions
+        of instances (array of shape (number of instances, 2))
+    :type templates: list
+    :param min_width: width of skeleton lines
+    :type min_width: float
+    :param axis_min_max: min, max value of axis, updated in place
+    :type axis_min_max: [float, float]
+    """
+    levels = []
+    all_bounds = []
+    for xvs, yvs, widths, colors, terminals, offsets in templates:
+        half_width = numpy.max(widths) / 2 if len(widths) > 0 else 0
+        bounds = numpy.array(
+            [
+                numpy.min(xvs) - half_width,
+                numpy.max(xvs) + half_width,
+                numpy.min(yvs) - half_width,
+                numpy.max(yvs) + half_width,
+            ]
+        )
+        soma_x = xvs[0, 0]
+        soma_y = yvs[0, 0]
+        size = max(bounds[1] - bounds[0], bounds[3] - bounds[2])
+        levels.append(
+            {
+                "offsets": offsets,
+                "bounds": bounds,
+                "size": size,
+                "full": (xvs, yvs, widths, colors),
+                "skeleton": (
+                    numpy.column_stack(
+                        (numpy.full(len(terminals), soma_x), xvs[terminals, 1])
+                    ),
+                    numpy.column_stack(
+                        (numpy.full(len(terminals), soma_y), yvs[terminals, 1])
+                    ),
+                    numpy.full(len(terminals), min_width),
+                    colors[terminals],
+                ),
+                "point": (
+                    numpy.array([[soma_x, soma_x]]),
+                    numpy.array([[soma_y, soma_y]]),
+                    colors[:1],
+                ),
+                "artists": [],
+            }
+        )
+        all_bounds.append(
+            [
+                offsets[:, 0].min() + numpy.min(xvs),
+                offsets[:, 0].max() + numpy.max(xvs),
+                offsets[:, 1].min() + numpy.min(yvs),
+                offsets[:, 1].max() + numpy.max(yvs),
+            ]
+        )
+
+    # all cells are included in the data limits, whatever is drawn, as they
+    # would be if all segments were added to the axes
+    all_bounds_array = numpy.array(all_bounds)
+    xmin, ymin = all_bounds_array[:, [0, 2]].min(axis=0)
+    xmax, ymax = all_bounds_array[:, [1, 3]].max(axis=0)
+    ax.update_datalim([(xmin, ymin), (xmax, ymax)])
+    axis_min_max[0] = min(axis_min_max[0], xmin)
+    axis_min_max[1] = max(axis_min_max[1], xmax)
+
+    def update(view, pixel_size):
+        x0, x1, y0, y1 = view
+        added = []
+        for level in levels:
+            for artist in level["artists"]:
+                # the axes may already be drawing it
+                artist.set_visible(False)
+                artist.remove()
+            level["artists"] = []
+
+            bounds = level["bounds"]
+            offsets = level["offsets"]
+            visible = (
+                (offsets[:, 0] + bounds[1] >= x0)
+                & (offsets[:, 0] + bounds[0] <= x1)
+                & (offsets[:, 1] + bounds[3] >= y0)
+                & (offsets[:, 1] + bounds[2] <= y1)
+            )
+            offsets = offsets[visible]
+            if len(offsets) == 0:
+                continue
+
+            size_pixels = level["size"] / pixel_size
+            if size_pixels < LOD_POINT_PIXELS:
+                xvs, yvs, colors = level["point"]
+                widths = numpy.array([max(level["size"], 2 * pixel_size)])
+            elif size_pixels < LOD_SKELETON_PIXELS:
+                xvs, yvs, widths, colors = level["skeleton"]
+            else:
+                xvs, yvs, widths, colors = level["full"]
+
+            level["artists"] = add_lines_to_matplotlib_2D_plot(
+                ax,
+                (xvs[numpy.newaxis, :, :] + offsets[:, 0, None, None]).reshape(-1, 2),
+                (yvs[numpy.newaxis, :, :] + offsets[:, 1, None, None]).reshape(-1, 2),
+                numpy.tile(widths, len(offsets)),
+                numpy.tile(colors, (len(offsets), 1)),
+                [float("inf"), -1 * float("inf")],
+                autolim=False,
+            )
+            added.extend(level["artists"])
+        return added
+
+    def update_view(ax):
+        x0, x1 = sorted(ax.get_xlim())
+        y0, y1 = sorted(ax.get_ylim())
+        extent = ax.get_window_extent()
+        pixel_size = max(
+            (x1 - x0) / max(extent.width, 1), (y1 - y0) / max(extent.height, 1)
+        )
+        return update((x0, x1, y0, y1), pixel_size)
+
+    # panning and zooming change both limits, so only mark the view as
+    # changed, and update it once when the axes are drawn. The updater is
+    # added before the collections, with the same zorder, so that it is
+    # drawn before them.
+    updater = _ViewUpdater(update_view)
+    updater.set_zorder(2)
+    ax.add_artist(updater)
+
+    def on_limits_changed(*args):
+        updater.view_changed = True
+
+    # initial view: all cells
+    extent = ax.get_window_extent()
+    update(
+        (xmin, xmax, ymin, ymax),
+        max(
+            (xmax - xmin) / max(extent.width, 1), (ymax - ymin) / max(extent.height, 1)
+        ),
+    )
+    ax.callbacks.connect("xlim_changed", on_limits_changed)
+    ax.callbacks.connect("ylim_changed", on_limits_changed)
+
+
+def _get_cell_segments(
+    cell: Cell,
+    color: typing.Optional[str] = None,
+    min_width: float = DEFAULTS["minWidth"],
+    plot_type: str = "detailed",
+    highlight_spec: typing.Optional[typing.Dict[typing.Any, typing.Any]] = None,
+    overlay_data: typing.Optional[typing.Dict[int, float]] = None,
+    acolormap: typing.Optional[matplotlib.colors.Colormap] = None,
+    norm: typing.Optional[matplotlib.colors.Normalize] = None,
+    verbose: bool = False,
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Get the end points, widths, and colours of the segments of a cell.
+
+    The segments are not offset, so the same arrays can be used for all
+    instances of a cell by adding the position of each instance, and for all
+    views of a cell by projecting them (see :py:func:`_project_segments`).
+
+    .. seealso::
+
+        :py:func:`plot_2D_cell_morphology`
+            for descriptions of the parameters
+
+    :returns: tuple of arrays: proximal and distal points, each of shape
+        (number of segments, 3), widths of segments, and RGBA colours of
+        segments
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    if highlight_spec is None:
+        highlight_spec = {}
+
+    # sets, for quick membership tests for each segment
+    try:
+        soma_segs = set(cell.get_all_segments_in_group("soma_group"))
+    except Exception:
+        soma_segs = set()
+    try:
+        dend_segs = set(cell.get_all_segments_in_group("dendrite_group"))
+    except Exception:
+        dend_segs = set()
+    try:
+        axon_segs = set(cell.get_all_segments_in_group("axon_group"))
+    except Exception:
+        axon_segs = set()
+
+    proximals = []  # type: typing.List[typing.Tuple[float, float, float]]
+    distals = []  # type: typing.List[typing.Tuple[float, float, float]]
+    widths = []  # type: typing.List[float]
+    seg_colors = []  # type: typing.List[typing.Any]
+
+    # random default color
+    for seg in cell.morphology.segments:
+        p = cell.get_actual_proximal(seg.id)
+        d = seg.distal
+        width = (p.diameter + d.diameter) / 2
+
+        segment_spec = {
+            "marker_size": None,
+            "marker_color": None,
+        }
+        try:
+            segment_spec.update(highlight_spec[str(seg.id)])
+        # if there's no spec for this segment
+        except KeyError:
+            logger.debug("No segment highlight spec found for segment" + str(seg.id))
+        # Also check if segment ids are provided as ints
+        try:
+            segment_spec.update(highlight_spec[seg.id])
+        # if there's no spec for this segment
+        except KeyError:
+            logger.debug("No segment highlight spec found for segment" + str(seg.id))
+
+        logger.debug("segment_spec for " + str(seg.id) + " is" + str(segment_spec))
+
+        if width < min_width:
+            width = min_width
+
+        if plot_type == "constant":
+            width = min_width
+
+        if segment_spec["marker_size"] is not None:
+            width = float(segment_spec["marker_size"])
+
+        if overlay_data and acolormap and norm:
+            try:
+                seg_color: typing.Union[
+                    str, typing.Tuple[float, float, float, float]
+                ] = acolormap(norm(overlay_data[seg.id]))
+            except KeyError:
+                seg_color = "black"
+        else:
+            if seg.id in soma_segs:
+                seg_color = "g"
+            elif seg.id in axon_segs:
+                seg_color = "r"
+            elif seg.id in dend_segs:
+                seg_color = "b"
+            # default is also blue
+            else:
+                seg_color = "b"
+
+        if segment_spec["marker_color"] is not None:
+            seg_color = segment_spec["marker_color"]
+
+        spherical = (
+            p.x == d.x and p.y == d.y and p.z == d.z and p.diameter == d.diameter
+        )
+
+        if verbose:
+            logger.info(
+                "\nSeg %s, id: %s%s has proximal: %s, distal: %s (width: %s, min_width: %s), color: %s"
+                % (
+                    seg.name,
+                    seg.id,
+                    " (spherical)" if spherical else "",
+                    p,
+                    d,
+                    width,
+                    min_width,
+                    str(seg_color),
+                )
+            )
+
+        proximals.append((p.x, p.y, p.z))
+        distals.append((d.x, d.y, d.z))
+        widths.append(width)
+        seg_colors.append(seg_color if color is None else color)
+
+    return (
+        numpy.array(proximals, dtype=float).reshape(-1, 3),
+        numpy.array(distals, dtype=float).reshape(-1, 3),
+        numpy.array(widths, dtype=float),
+        matplotlib.colors.to_rgba_array(seg_colors).reshape(-1, 4),
+    )
+
+
+def _get_2D_cell_segments(
+    cell: Cell, plane2d: typing.Any = "xy", **kwargs: typing.Any
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Get the segments of a cell projected on to a plane, for 2D plots.
+
+    .. seealso::
+
+        :py:func:`_get_cell_segments`
+            for the other parameters
+
+    :param cell: cell to get segments of
+    :type cell: neuroml.Cell
+    :param plane2d: plane or projection matrix, see :py:func:`_get_projection`
+    :type plane2d: str or numpy.ndarray
+    :returns: tuple of arrays: x values and y values, each of shape (number
+        of segments, 2), widths of segments, and RGBA colours of segments
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    proximals, distals, widths, colors = _get_cell_segments(cell, **kwargs)
+    xvs, yvs = _project_segments(proximals, distals, _get_projection(plane2d))
+    return xvs, yvs, widths, colors
+
+
+def _get_projection(plane2d: typing.Any) -> numpy.ndarray:
+    """Get the projection matrix for a plane.
+
+    :param plane2d: plane (xy/yx/yz/zy/zx/xz), or a projection matrix of
+        shape (2, 3) whose rows give the coefficients of x, y, z for the
+        horizontal and vertical axes
+    :type plane2d: str or numpy.ndarray
+    :returns: projection matrix of shape (2, 3)
+    :rtype: numpy.ndarray
+    :raises ValueError: if the plane or projection matrix is not valid
+    """
+    if isinstance(plane2d, str):
+        try:
+            return numpy.eye(3)[list(PLANE_AXES[plane2d])]
+        except KeyError:
+            raise ValueError(f"Invalid value for plane: {plane2d}")
+
+    projection = numpy.array(plane2d, dtype=float)
+    if projection.shape != (2, 3):
+        raise ValueError(
+            f"Projection matrix must have shape (2, 3), not {projection.shape}"
+        )
+    return projection
+
+
+def _project_segments(
+    proximals: numpy.ndarray, distals: numpy.ndarray, projection: numpy.ndarray
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """Project segments on to a plane.
+
+    :param proximals: proximal points, array of shape (number of segments, 3)
+    :type proximals: numpy.ndarray
+    :param distals: distal points, array of shape (number of segments, 3)
+    :type distals: numpy.ndarray
+    :param projection: projection matrix of shape (2, 3)
+    :type projection: numpy.ndarray
+    :returns: x values and y values, each of shape (number of segments, 2)
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    projected_proximals = proximals @ projection.T
+    projected_distals = distals @ projection.T
+    return (
+        numpy.column_stack((projected_proximals[:, 0], projected_distals[:, 0])),
+        numpy.column_stack((projected_proximals[:, 1], projected_distals[:, 1])),
+    )
+
+
 def plot_2D_cell_morphology(
     offset: typing.List[float] = [0, 0],
     cell: Optional[Cell] = None,
@@ -622,19 +1455,6 @@ def plot_2D_cell_morphology(
         highlight_spec = {}
     logging.debug("highlight_spec is " + str(highlight_spec))
 
-    try:
-        soma_segs = cell.get_all_segments_in_group("soma_group")
-    except Exception:
-        soma_segs = []
-    try:
-        dend_segs = cell.get_all_segments_in_group("dendrite_group")
-    except Exception:
-        dend_segs = []
-    try:
-        axon_segs = cell.get_all_segments_in_group("axon_group")
-    except Exception:
-        axon_segs = []
-
     if fig is None:
         fig, ax = get_new_matplotlib_morph_plot(title)
 
@@ -672,138 +1492,36 @@ def plot_2D_cell_morphology(
                 ax=ax,
             )
 
-    # random default color
-    for seg in cell.morphology.segments:
-        p = cell.get_actual_proximal(seg.id)
-        d = seg.distal
-        width = (p.diameter + d.diameter) / 2
-
-        segment_spec = {
-            "marker_size": None,
-            "marker_color": None,
-        }
-        try:
-            segment_spec.update(highlight_spec[str(seg.id)])
-        # if there's no spec for this segment
-        except KeyError:
-            logger.debug("No segment highlight spec found for segment" + str(seg.id))
-        # Also check if segment ids are provided as ints
-        try:
-            segment_spec.update(highlight_spec[seg.id])
-        # if there's no spec for this segment
-        except KeyError:
-            logger.debug("No segment highlight spec found for segment" + str(seg.id))
-
-        logger.debug("segment_spec for " + str(seg.id) + " is" + str(segment_spec))
-
-        if width < min_width:
-            width = min_width
-
-        if plot_type == "constant":
-            width = min_width
-
-        if segment_spec["marker_size"] is not None:
-            width = float(segment_spec["marker_size"])
-
-        if overlay_data and acolormap and norm:
-            try:
-                seg_color: typing.Union[
-                    str, typing.Tuple[float, float, float, float]
-                ] = acolormap(norm(overlay_data[seg.id]))
-            except KeyError:
-                seg_color = "black"
-        else:
-            if seg.id in soma_segs:
-                seg_color = "g"
-            elif seg.id in axon_segs:
-                seg_color = "r"
-            elif seg.id in dend_segs:
-                seg_color = "b"
-            # default is also blue
-            else:
-                seg_color = "b"
-
-        if segment_spec["marker_color"] is not None:
-            seg_color = segment_spec["marker_color"]
-
-        spherical = (
-            p.x == d.x and p.y == d.y and p.z == d.z and p.diameter == d.diameter
-        )
+    if plane2d not in PLANE_AXES:
+        raise Exception(f"Invalid value for plane: {plane2d}")
 
-        if verbose:
-            logger.info(
-                "\nSeg %s, id: %s%s has proximal: %s, distal: %s (width: %s, min_width: %s), color: %s"
-                % (
-                    seg.name,
-                    seg.id,
-                    " (spherical)" if spherical else "",
-                    p,
-                    d,
-                    width,
-                    min_width,
-                    str(seg_color),
-                )
-            )
+    xvs, yvs, widths, seg_colors = _get_2D_cell_segments(
+        cell,
+        plane2d=plane2d,
+        color=color,
+        min_width=min_width,
+        plot_type=plot_type,
+        highlight_spec=highlight_spec,
+        overlay_data=overlay_data,
+        acolormap=acolormap,
+        norm=norm,
+        verbose=verbose,
+    )
 
-        if plane2d == "xy":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[0] + p.x, offset[0] + d.x],
-                [offset[1] + p.y, offset[1] + d.y],
-                width,
-                seg_color if color is None else color,
-                axis_min_max,
-            )
-        elif plane2d == "yx":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[1] + p.y, offset[1] + d.y],
-                [offset[0] + p.x, offset[0] + d.x],
-                width,
-                seg_color if color is None else color,
-                axis_min_max,
-            )
-        elif plane2d == "xz":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[0] + p.x, offset[0] + d.x],
-                [offset[2] + p.z, offset[2] + d.z],
-                width,
-                seg_color if color is None else color,
-                axis_min_max,
-            )
-        elif plane2d == "zx":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[2] + p.z, offset[2] + d.z],
-                [offset[0] + p.x, offset[0] + d.x],
-                width,
-                seg_color if color is None else color,
-                axis_min_max,
-            )
-        elif plane2d == "yz":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[1] + p.y, offset[1] + d.y],
-                [offset[2] + p.z, offset[2] + d.z],
-                width,
-                seg_color if color is None else color,
-                axis_min_max,
-            )
-        elif plane2d == "zy":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[2] + p.z, offset[2] + d.z],
-                [offset[1] + p.y, offset[1] + d.y],
-                width,
-                seg_color if color is None else color,
-                axis_min_max,
-            )
-        else:
-            raise Exception(f"Invalid value for plane: {plane2d}")
+    offset_array = numpy.zeros(3)
+    offset_array[: len(offset)] = offset
+    xi, yi = PLANE_AXES[plane2d]
+    add_lines_to_matplotlib_2D_plot(
+        ax,
+        xvs + offset_array[xi],
+        yvs + offset_array[yi],
+        widths,
+        seg_colors,
+        axis_min_max,
+    )
 
-        if verbose:
-            print("Extent x: %s -> %s" % (axis_min_max[0], axis_min_max[1]))
+    if verbose:
+        print("Extent x: %s -> %s" % (axis_min_max[0], axis_min_max[1]))
 
     if scalebar:
         add_scalebar_to_matplotlib_plot(axis_min_max, ax)
@@ -823,10 +1541,10 @@ def plot_2D_cell_morphology(
 
 
 def plot_2D_point_cells(
-    offset: typing.List[float] = [0, 0],
+    offset: typing.Any = [0, 0],
     plane2d: str = "xy",
-    color: typing.Optional[str] = None,
-    soma_radius: float = 10.0,
+    color: typing.Optional[typing.Any] = None,
+    soma_radius: typing.Union[float, typing.List[float]] = 10.0,
     title: str = "",
     verbose: bool = False,
     fig: Optional[matplotlib.figure.Figure] = None,
@@ -838,11 +1556,19 @@ def plot_2D_point_cells(
     square: bool = False,
     save_to_file: typing.Optional[str] = None,
     close_plot: bool = False,
+    density_threshold: typing.Optional[int] = POINT_CELL_DENSITY_THRESHOLD,
 ):
     """Plot point cells.
 
+    All cells are drawn using a single collection. If there are more cells
+    than :code:`density_threshold`, an image of the density of cells is drawn
+    instead.
+
     .. versionadded:: 1.0.0
 
+    .. versionadded:: 1.3.9
+        Plotting many cells at once, and the density_threshold parameter
+
     .. seealso::
 
         :py:func:`plot_2D`
@@ -854,14 +1580,15 @@ def plot_2D_point_cells(
         :py:func:`plot_2D_cell_morphology`
             for plotting cells with detailed morphologies
 
-    :param offset: location of cell
-    :type offset: [float, float]
+    :param offset: location of cell, or list of locations of cells
+    :type offset: [float, float] or [float, float, float] or list of these
     :param plane2d: plane to plot on
     :type plane2d: str
-    :param color: color to use for cell
-    :type color: str
-    :param soma_radius: radius of soma
-    :type soma_radius: float
+    :param color: color to use for cells, or list of colors, one for each
+        cell. If None, a random color is used for each cell.
+    :type color: str or list
+    :param soma_radius: radius of soma, or list of radii, one for each cell
+    :type soma_radius: float or list(float)
     :param fig: a matplotlib.figure.Figure object to use
     :type fig: matplotlib.figure.Figure
     :param ax: a matplotlib.axes.Axes object to use
@@ -884,68 +1611,43 @@ def plot_2D_point_cells(
     :type scalebar: bool
     :param close_plot: call pyplot.close() to close plot after plotting
     :type close_plot: bool
+    :param density_threshold: number of cells above which a density image is
+        drawn instead of the individual cells, None to always draw cells
+    :type density_threshold: int
     """
     if fig is None:
         fig, ax = get_new_matplotlib_morph_plot(title)
 
-    cell_color = get_next_hex_color()
+    projection = _get_projection(plane2d)
 
-    if plane2d == "xy":
-        add_line_to_matplotlib_2D_plot(
-            ax,
-            [offset[0], offset[0]],
-            [offset[1], offset[1]],
-            soma_radius,
-            cell_color if color is None else color,
-            axis_min_max,
-        )
-    elif plane2d == "yx":
-        add_line_to_matplotlib_2D_plot(
-            ax,
-            [offset[1], offset[1]],
-            [offset[0], offset[0]],
-            soma_radius,
-            cell_color if color is None else color,
-            axis_min_max,
-        )
-    elif plane2d == "xz":
-        add_line_to_matplotlib_2D_plot(
-            ax,
-            [offset[0], offset[0]],
-            [offset[2], offset[2]],
-            soma_radius,
-            cell_color if color is None else color,
-            axis_min_max,
-        )
-    elif plane2d == "zx":
-        add_line_to_matplotlib_2D_plot(
-            ax,
-            [offset[2], offset[2]],
-            [offset[0], offset[0]],
-            soma_radius,
-            cell_color if color is None else color,
-            axis_min_max,
+    offsets_array = numpy.array(offset, dtype=float)
+    if offsets_array.ndim == 1:
+        offsets_array = offsets_array[numpy.newaxis, :]
+    offsets = numpy.zeros((len(offsets_array), 3))
+    offsets[:, : offsets_array.shape[1]] = offsets_array
+    points = offsets @ projection.T
+    num_cells = len(points)
+
+    if density_threshold is not None and num_cells > density_threshold:
+        logger.info(
+            f"Plotting density of {num_cells} point cells (more than {density_threshold})"
         )
-    elif plane2d == "yz":
-        add_line_to_matplotlib_2D_plot(
+        add_density_image_to_matplotlib_2D_plot(
             ax,
-            [offset[1], offset[1]],
-            [offset[2], offset[2]],
-            soma_radius,
-            cell_color if color is None else color,
+            points[:, 0],
+            points[:, 1],
+            get_next_hex_color() if color is None else color,
             axis_min_max,
         )
-    elif plane2d == "zy":
-        add_line_to_matplotlib_2D_plot(
+    else:
+        add_points_to_matplotlib_2D_plot(
             ax,
-            [offset[2], offset[2]],
-            [offset[1], offset[1]],
+            points[:, 0],
+            points[:, 1],
             soma_radius,
-            cell_color if color is None else color,
+            get_next_hex_colors(num_cells) if color is None else color,
             axis_min_max,
         )
-    else:
-        raise Exception(f"Invalid value for plane: {plane2d}")
 
     if scalebar:
         add_scalebar_to_matplotlib_plot(axis_min_max, ax)
@@ -964,10 +1666,73 @@ def plot_2D_point_cells(
         plt.close()
 
 
+def _get_schematic_geometry(
+    cell: Cell, segment_groups: typing.Optional[typing.List[str]]
+) -> typing.Tuple[typing.List[str], numpy.ndarray, numpy.ndarray]:
+    """Get the end points of unbranched segment groups of a cell for schematics.
+
+    The results are cached for each cell object and list of segment groups.
+
+    :param cell: cell to get segment groups of
+    :type cell: neuroml.Cell
+    :param segment_groups: list of ids of unbranched segment groups, or None
+        for all unbranched segment groups of the cell
+    :type segment_groups: list(str)
+    :returns: tuple of the ids of the segment groups, the proximal points of
+        their first segments, and the distal points of their last segments
+        (arrays of shape (number of segment groups, 3))
+    :rtype: (list(str), numpy.ndarray, numpy.ndarray)
+    :raises ValueError: if a segment group is not an unbranched segment group
+    """
+    cache_key = tuple(segment_groups) if segment_groups is not None else None
+    cell_cache = _SCHEMATIC_GEOMETRY_CACHE.setdefault(cell, {})
+    try:
+        return cell_cache[cache_key]
+    except KeyError:
+        pass
+
+    # if no segment groups are given, do them all
+    if segment_groups is None:
+        segment_groups = []
+        for sg in cell.morphology.segment_groups:
+            if sg.neuro_lex_id == neuro_lex_ids["section"]:
+                segment_groups.append(sg.id)
+
+    ord_segs = cell.get_ordered_segments_in_groups(
+        segment_groups, check_parentage=False
+    )
+
+    sgids = []
+    proximal = []
+    distal = []
+    for sgid, segs in ord_segs.items():
+        sgobj = cell.get_segment_group(sgid)
+        if sgobj.neuro_lex_id != neuro_lex_ids["section"]:
+            raise ValueError(
+                f"{sgobj} does not have neuro_lex_id set to indicate it is an unbranched segment"
+            )
+
+        # get proximal and distal points
+        first_seg = segs[0]  # type: Segment
+        last_seg = segs[-1]  # type: Segment
+        first_point = cell.get_actual_proximal(first_seg.id)
+        sgids.append(sgid)
+        proximal.append([first_point.x, first_point.y, first_point.z])
+        distal.append([last_seg.distal.x, last_seg.distal.y, last_seg.distal.z])
+
+    geometry = (
+        sgids,
+        numpy.array(proximal, dtype=float).reshape(-1, 3),
+        numpy.array(distal, dtype=float).reshape(-1, 3),
+    )
+    cell_cache[cache_key] = geometry
+    return geometry
+
+
 def plot_2D_schematic(
     cell: Cell,
     segment_groups: typing.Optional[typing.List[SegmentGroup]],
-    offset: typing.List[float] = [0, 0],
+    offset: typing.Any = [0, 0],
     labels: bool = False,
     plane2d: str = "xy",
     width: float = 2.0,
@@ -985,10 +1750,19 @@ def plot_2D_schematic(
     """Plot a 2D schematic of the provided segment groups.
 
     This plots each segment group as a straight line between its first and last
-    segment.
+    segment. The end points of the segment groups are cached for each cell,
+    so plotting the same cell again (in other planes, or at other offsets)
+    does not require them to be recomputed. If the morphology of the cell is
+    modified between calls, use a new cell object.
+
+    All lines are drawn as a single collection. If a list of offsets is given,
+    a copy of the cell is plotted at each offset.
 
     .. versionadded:: 1.0.0
 
+    .. versionadded:: 1.3.9
+        Plotting many copies of the cell at once
+
     .. seealso::
 
         :py:func:`plot_2D`
@@ -1000,8 +1774,10 @@ def plot_2D_schematic(
         :py:func:`plot_2D_cell_morphology`
             for plotting cells with detailed morphologies
 
-    :param offset: offset for cell
-    :type offset: [float, float]
+    :param offset: offset for cell, or list of offsets for copies of the
+        cell. Offsets with two values are in the plotted plane, offsets with
+        three values (x, y, z) are projected onto the plane.
+    :type offset: [float, float] or [float, float, float] or list of these
     :param cell: cell to plot
     :type cell: neuroml.Cell
     :param segment_groups: list of unbranched segment groups to plot
@@ -1039,170 +1815,44 @@ def plot_2D_schematic(
     if title == "":
         title = f"2D schematic of segment groups from {cell.id}"
 
-    # if no segment groups are given, do them all
-    if segment_groups is None:
-        segment_groups = []
-        for sg in cell.morphology.segment_groups:
-            if sg.neuro_lex_id == neuro_lex_ids["section"]:
-                segment_groups.append(sg.id)
-
-    ord_segs = cell.get_ordered_segments_in_groups(
-        segment_groups, check_parentage=False
-    )
+    sgids, proximal, distal = _get_schematic_geometry(cell, segment_groups)
 
     if fig is None:
         logger.debug("No figure provided, creating new fig and ax")
         fig, ax = get_new_matplotlib_morph_plot(title, plane2d)
 
-    if plane2d == "xy":
-        ax.set_xlabel("x (μm)")
-        ax.set_ylabel("y (μm)")
-    elif plane2d == "yx":
-        ax.set_xlabel("y (μm)")
-        ax.set_ylabel("x (μm)")
-    elif plane2d == "xz":
-        ax.set_xlabel("x (μm)")
-        ax.set_ylabel("z (μm)")
-    elif plane2d == "zx":
-        ax.set_xlabel("z (μm)")
-        ax.set_ylabel("x (μm)")
-    elif plane2d == "yz":
-        ax.set_xlabel("y (μm)")
-        ax.set_ylabel("z (μm)")
-    elif plane2d == "zy":
-        ax.set_xlabel("z (μm)")
-        ax.set_ylabel("y (μm)")
-    else:
-        logger.error(f"Invalid value for plane: {plane2d}")
-        sys.exit(-1)
+    set_matplotlib_morph_plot_axis_labels(ax, plane2d)
 
     # use a mutable object so it can be passed as an argument to methods, using
     # float (immuatable) variables requires us to return these from all methods
     axis_min_max = [float("inf"), -1 * float("inf")]
     width = 1
 
-    for sgid, segs in ord_segs.items():
-        sgobj = cell.get_segment_group(sgid)
-        if sgobj.neuro_lex_id != neuro_lex_ids["section"]:
-            raise ValueError(
-                f"{sgobj} does not have neuro_lex_id set to indicate it is an unbranched segment"
-            )
-
-        # get proximal and distal points
-        first_seg = segs[0]  # type: Segment
-        last_seg = segs[-1]  # type: Segment
-
-        # unique color for each segment group
-        color = get_next_hex_color()
-
-        if plane2d == "xy":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[0] + first_seg.proximal.x, offset[0] + last_seg.distal.x],
-                [offset[1] + first_seg.proximal.y, offset[1] + last_seg.distal.y],
-                width,
-                color,
-                axis_min_max,
-            )
-            if labels:
-                add_text_to_matplotlib_2D_plot(
-                    ax,
-                    [offset[0] + first_seg.proximal.x, offset[0] + last_seg.distal.x],
-                    [offset[1] + first_seg.proximal.y, offset[1] + last_seg.distal.y],
-                    color=color,
-                    text=sgid,
-                )
-
-        elif plane2d == "yx":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[0] + first_seg.proximal.y, offset[0] + last_seg.distal.y],
-                [offset[1] + first_seg.proximal.x, offset[1] + last_seg.distal.x],
-                width,
-                color,
-                axis_min_max,
-            )
-            if labels:
-                add_text_to_matplotlib_2D_plot(
-                    ax,
-                    [offset[0] + first_seg.proximal.y, offset[0] + last_seg.distal.y],
-                    [offset[1] + first_seg.proximal.x, offset[1] + last_seg.distal.x],
-                    color=color,
-                    text=sgid,
-                )
-        elif plane2d == "xz":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[0] + first_seg.proximal.x, offset[0] + last_seg.distal.x],
-                [offset[1] + first_seg.proximal.z, offset[1] + last_seg.distal.z],
-                width,
-                color,
-                axis_min_max,
-            )
-            if labels:
-                add_text_to_matplotlib_2D_plot(
-                    ax,
-                    [offset[0] + first_seg.proximal.x, offset[0] + last_seg.distal.x],
-                    [offset[1] + first_seg.proximal.z, offset[1] + last_seg.distal.z],
-                    color=color,
-                    text=sgid,
-                )
-        elif plane2d == "zx":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[0] + first_seg.proximal.z, offset[0] + last_seg.distal.z],
-                [offset[1] + first_seg.proximal.x, offset[1] + last_seg.distal.x],
-                width,
-                color,
-                axis_min_max,
-            )
-            if labels:
-                add_text_to_matplotlib_2D_plot(
-                    ax,
-                    [offset[0] + first_seg.proximal.z, offset[0] + last_seg.distal.z],
-                    [offset[1] + first_seg.proximal.x, offset[1] + last_seg.distal.x],
-                    color=color,
-                    text=sgid,
-                )
-        elif plane2d == "yz":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[0] + first_seg.proximal.y, offset[0] + last_seg.distal.y],
-                [offset[1] + first_seg.proximal.z, offset[1] + last_seg.distal.z],
-                width,
-                color,
-                axis_min_max,
-            )
-            if labels:
-                add_text_to_matplotlib_2D_plot(
-                    ax,
-                    [offset[0] + first_seg.proximal.y, offset[0] + last_seg.distal.y],
-                    [offset[1] + first_seg.proximal.z, offset[1] + last_seg.distal.z],
-                    color=color,
-                    text=sgid,
-                )
-        elif plane2d == "zy":
-            add_line_to_matplotlib_2D_plot(
-                ax,
-                [offset[0] + first_seg.proximal.z, offset[0] + last_seg.distal.z],
-                [offset[1] + first_seg.proximal.y, offset[1] + last_seg.distal.y],
-                width,
-                color,
-                axis_min_max,
+    projection = _get_projection(plane2d)
+    offsets = numpy.array(offset, dtype=float)
+    if offsets.ndim == 1:
+        offsets = offsets[numpy.newaxis, :]
+    # 2D offsets are already in the plane, 3D offsets are projected onto it
+    if offsets.shape[1] != 2:
+        offsets = offsets @ projection.T
+
+    # a line from the first to the last point of each segment group, of
+    # each cell
+    xvs, yvs = _project_segments(proximal, distal, projection)
+    xvs = (xvs[numpy.newaxis, :, :] + offsets[:, 0, None, None]).reshape(-1, 2)
+    yvs = (yvs[numpy.newaxis, :, :] + offsets[:, 1, None, None]).reshape(-1, 2)
+    # unique color for each segment group
+    colors = get_next_hex_colors(len(xvs))
+    add_lines_to_matplotlib_2D_plot(ax, xvs, yvs, width, colors, axis_min_max)
+
+    if labels:
+        for xv, yv, color, sgid in zip(xvs, yvs, colors, sgids * len(offsets)):
+            add_text_to_matplotlib_2D_plot(
+                ax, list(xv), list(yv), color=color, text=sgid
             )
-            if labels:
-                add_text_to_matplotlib_2D_plot(
-                    ax,
-                    [offset[0] + first_seg.proximal.z, offset[0] + last_seg.distal.z],
-                    [offset[1] + first_seg.proximal.y, offset[1] + last_seg.distal.y],
-                    color=color,
-                    text=sgid,
-                )
-        else:
-            raise Exception(f"Invalid value for plane: {plane2d}")
 
-        if verbose:
-            print("Extent x: %s -> %s" % (axis_min_max[0], axis_min_max[1]))
+    if verbose:
+        print("Extent x: %s -> %s" % (axis_min_max[0], axis_min_max[1]))
 
     if scalebar:
         add_scalebar_to_matplotlib_plot(axis_min_max, ax)
@@ -1349,9 +1999,8 @@ def plot_segment_groups_curtain_plots(
     for sgid, segs in ord_segs.items():
         logger.debug(f"Processing {sgid}")
         column += 1
-        length = 0
 
-        cumulative_lengths_sg = cumulative_lengths[sgid]
+        cumulative_lengths_sg = numpy.array(cumulative_lengths[sgid], dtype=float)
 
         sgobj = cell.get_segment_group(sgid)
         if sgobj.neuro_lex_id != neuro_lex_ids["section"]:
@@ -1359,26 +2008,23 @@ def plot_segment_groups_curtain_plots(
                 f"{sgobj} does not have neuro_lex_id set to indicate it is an unbranched segment"
             )
 
-        for seg_num in range(0, len(segs)):
-            # seg = segs[seg_num]
-            cumulative_len = cumulative_lengths_sg[seg_num]
-
-            if overlay_data and acolormap and norm:
-                color = acolormap(norm(overlay_data[sgid][seg_num]))
-            else:
-                color = get_next_hex_color(myrandom)
-
-            logger.debug(f"color is {color}")
-
-            add_box_to_matplotlib_2D_plot(
-                ax,
-                [column * width - width * 0.10, -1 * length],
-                height=cumulative_len,
-                width=width * 0.8,
-                color=color,
-            )
+        if overlay_data and acolormap and norm:
+            colors = acolormap(norm(numpy.array(overlay_data[sgid], dtype=float)))
+        else:
+            colors = [get_next_hex_color(myrandom) for seg in segs]
 
-            length += cumulative_len
+        # one box for each segment, all drawn as a single collection
+        bottoms = (
+            -1 * numpy.concatenate(([0.0], numpy.cumsum(cumulative_lengths_sg)))[:-1]
+        )
+        add_boxes_to_matplotlib_2D_plot(
+            ax,
+            numpy.full(len(segs), column * width - width * 0.10),
+            bottoms,
+            heights=cumulative_lengths_sg,
+            widths=width * 0.8,
+            colors=colors,
+        )
 
         if labels:
             add_text_to_matplotlib_2D_plot(
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Export 3D morphologies of cells and networks to files for external viewers.
+
+The meshes are the same instanced template meshes used by the vispy
+interactive plots, so this requires the vispy optional dependencies, but
+does not need a display.
+
+File: pyneuroml/plot/PlotMorphologyExport.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import base64
+import json
+import logging
+import os
+import struct
+import typing
+
+import numpy
+from neuroml import Cell, Morphology, NeuroMLDocument
+from scipy.spatial.transform import Rotation
+
+from pyneuroml import __version__
+from pyneuroml.plot.PlotMorphologyVispy import (
+    _get_mesh_instances,
+    _get_meshdata,
+    _get_plottable_model,
+)
+from pyneuroml.utils import extract_position_info
+from pyneuroml.utils.plot import DEFAULTS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+# glTF constants
+GLTF_FLOAT = 5126
+GLTF_UNSIGNED_INT = 5125
+GLTF_ARRAY_BUFFER = 34962
+GLTF_ELEMENT_ARRAY_BUFFER = 34963
+
+
+def export_3D_morphology(
+    nml_file: typing.Union[str, Cell, Morphology, NeuroMLDocument],
+    file_name: str,
+    plot_type: str = "constant",
+    min_width: float = DEFAULTS["minWidth"],
+    plot_spec: typing.Optional[
+        typing.Dict[str, typing.Union[str, typing.List[int], float]]
+    ] = None,
+    highlight_spec: typing.Optional[typing.Dict[typing.Any, typing.Any]] = None,
+    precision: typing.Tuple[int, int] = (4, 200),
+    upright: bool = False,
+    verbose: bool = False,
+) -> None:
+    """Export the 3D morphology of a cell or network to a file.
+
+    The segments of all cells are grouped into template meshes as for
+    :py:func:`pyneuroml.plot.PlotMorphologyVispy.plot_interactive_3D`, and
+    the format is chosen from the extension of the file name:
+
+    - ".gltf" or ".glb": glTF 2.0 (as JSON with embedded data, or binary),
+      with each template mesh stored once and placed at each of its
+      instances using the :code:`EXT_mesh_gpu_instancing` extension, so that
+      file sizes scale with the number of distinct meshes. Instances of each
+      template mesh are split by colour, with one material for each colour.
+    - ".ply": binary PLY, with the instances of all meshes merged into a
+      single mesh with vertex colours, for tools that do not support
+      instancing
+
+    .. versionadded:: 1.3.9
+
+    :param nml_file: path to NeuroML cell file or
+        :py:class:`neuroml.NeuroMLDocument` or :py:class:`neuroml.Cell`
+        or :py:class:`neuroml.Morphology` object
+    :type nml_file: str or neuroml.NeuroMLDocument or neuroml.Cell or
+        neuroml.Morphology
+    :param file_name: name of file to export to
+    :type file_name: str
+    :raises ValueError: if the format of the file is not supported, or if
+        `plot_type` is not one of "detailed", "constant", "schematic", or
+        "point"
+
+    .. seealso::
+
+        :py:func:`pyneuroml.plot.PlotMorphologyVispy.plot_interactive_3D`
+            for descriptions of the other parameters
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension not in [".gltf", ".glb", ".ply"]:
+        raise ValueError(
+            f"Unsupported format {extension}: use one of .gltf, .glb, .ply"
+        )
+    if plot_type not in ["detailed", "constant", "schematic", "point"]:
+        raise ValueError(
+            "plot_type must be one of 'detailed', 'constant', 'schematic', 'point'"
+        )
+
+    plottable_nml_model, _ = _get_plottable_model(nml_file)
+    (
+        cell_id_vs_cell,
+        pop_id_vs_cell,
+        positions,
+        pop_id_vs_color,
+        pop_id_vs_radii,
+    ) = extract_position_info(plottable_nml_model, verbose)
+    del cell_id_vs_cell
+
+    if upright and len(positions) > 1:
+        raise AttributeError("Argument upright can be True only for single cells")
+
+    meshdata = _get_meshdata(
+        pop_id_vs_cell,
+        positions,
+        pop_id_vs_color,
+        pop_id_vs_radii,
+        plot_type=plot_type,
+        plot_spec=plot_spec,
+        highlight_spec=highlight_spec,
+        precision=precision,
+        verbose=verbose,
+        upright=upright,
+    )
+    meshes = [
+        _get_mesh_instances(key, instances, plot_type, min_width)
+        for key, instances in meshdata.items()
+    ]
+    logger.info(
+        f"Exporting {len(meshes)} meshes with {sum(len(m[1]) for m in meshes)} instances to {file_name}"
+    )
+
+    if extension == ".ply":
+        _write_ply(file_name, meshes)
+    else:
+        _write_gltf(file_name, meshes, binary=(extension == ".glb"))
+
+
+def _write_gltf(
+    file_name: str,
+    meshes: typing.List[
+        typing.Tuple[typing.Any, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    ],
+    binary: bool,
+) -> None:
+    """Write instanced meshes to a glTF 2.0 file.
+
+    :param file_name: name of file
+    :type file_name: str
+    :param meshes: list of tuples of template mesh and the positions,
+        rotation matrices, and colours of its instances, see
+        :py:func:`pyneuroml.plot.PlotMorphologyVispy._get_mesh_instances`
+    :type meshes: list
+    :param binary: write binary glTF (.glb) instead of JSON glTF
+    :type binary: bool
+    """
+    buffer = bytearray()
+    buffer_views = []  # type: typing.List[typing.Dict[str, typing.Any]]
+    accessors = []  # type: typing.List[typing.Dict[str, typing.Any]]
+    materials = []  # type: typing.List[typing.Dict[str, typing.Any]]
+    material_indices = {}  # type: typing.Dict[typing.Tuple[float, ...], int]
+    gltf_meshes = []  # type: typing.List[typing.Dict[str, typing.Any]]
+    nodes = []  # type: typing.List[typing.Dict[str, typing.Any]]
+
+    def add_accessor(
+        data: numpy.ndarray,
+        component_type: int,
+        accessor_type: str,
+        target: typing.Optional[int] = None,
+        bounds: bool = False,
+    ) -> int:
+        """Add an array to the buffer and return the index of its accessor."""
+        # buffer views must be aligned to 4 bytes
+        buffer.extend(b"\x00" * (-len(buffer) % 4))
+        data_bytes = numpy.ascontiguousarray(data).tobytes()
+        buffer_view = {
+            "buffer": 0,
+            "byteOffset": len(buffer),
+            "byteLength": len(data_bytes),
+        }  # type: typing.Dict[str, typing.Any]
+        if target is not None:
+            buffer_view["target"] = target
+        buffer.extend(data_bytes)
+        buffer_views.append(buffer_view)
+
+        accessor = {
+            "bufferView": len(buffer_views) - 1,
+            "componentType": component_type,
+            "count": len(data),
+            "type": accessor_type,
+        }  # type: typing.Dict[str, typing.Any]
+        if bounds:
+            accessor["min"] = data.min(axis=0).tolist()
+            accessor["max"] = data.max(axis=0).tolist()
+        accessors.append(accessor)
+        return len(accessors) - 1
+
+    for seg_mesh, instance_positions, instance_transforms, instance_colors in meshes:
+        vertices = seg_mesh.get_vertices().astype(numpy.float32)
+        attributes = {
+            "POSITION": add_accessor(
+                vertices, GLTF_FLOAT, "VEC3", GLTF_ARRAY_BUFFER, bounds=True
+            ),
+            "NORMAL": add_accessor(
+                seg_mesh.get_vertex_normals().astype(numpy.float32),
+                GLTF_FLOAT,
+                "VEC3",
+                GLTF_ARRAY_BUFFER,
+            ),
+        }
+        indices = add_accessor(
+            seg_mesh.get_faces().astype(numpy.uint32).reshape(-1),
+            GLTF_UNSIGNED_INT,
+            "SCALAR",
+            GLTF_ELEMENT_ARRAY_BUFFER,
+        )
+        # glTF quaternions are (x, y, z, w), as used by scipy
+        rotations = Rotation.from_matrix(instance_transforms).as_quat()
+
+        colors, color_indices = numpy.unique(
+            instance_colors, axis=0, return_inverse=True
+        )
+        for color_index, color in enumerate(colors):
+            color_key = tuple(float(c) for c in color)
+            if color_key not in material_indices:
+                material_indices[color_key] = len(materials)
+                materials.append(
+                    {
+                        "pbrMetallicRoughness": {
+                            "baseColorFactor": list(color_key),
+                            "metallicFactor": 0.0,
+                            "roughnessFactor": 0.8,
+                        },
+                        "doubleSided": True,
+                    }
+                )
+            gltf_meshes.append(
+                {
+                    "primitives": [
+                        {
+                            "attributes": attributes,
+                            "indices": indices,
+                            "material": material_indices[color_key],
+                        }
+                    ]
+                }
+            )
+
+            selected = color_indices.reshape(-1) == color_index
+            nodes.append(
+                {
+                    "mesh": len(gltf_meshes) - 1,
+                    "extensions": {
+                        "EXT_mesh_gpu_instancing": {
+                            "attributes": {
+                                "TRANSLATION": add_accessor(
+                                    instance_positions[selected].astype(numpy.float32),
+                                    GLTF_FLOAT,
+                                    "VEC3",
+                                ),
+                                "ROTATION": add_accessor(
+                                    rotations[selected].astype(numpy.float32),
+                                    GLTF_FLOAT,
+                                    "VEC4",
+                                ),
+                            }
+                        }
+                    },
+                }
+            )
+
+    buffer.extend(b"\x00" * (-len(buffer) % 4))
+    gltf = {
+        "asset": {"version": "2.0", "generator": f"pyNeuroML v{__version__}"},
+        "extensionsUsed": ["EXT_mesh_gpu_instancing"],
+        "extensionsRequired": ["EXT_mesh_gpu_instancing"],
+        "scene": 0,
+        "scenes": [{"nodes": list(range(len(nodes)))}],
+        "nodes": nodes,
+        "meshes": gltf_meshes,
+        "materials": materials,
+        "accessors": accessors,
+        "bufferViews": buffer_views,
+        "buffers": [{"byteLength": len(buffer)}],
+    }  # type: typing.Dict[str, typing.Any]
+
+    if binary:
+        json_chunk = json.dumps(gltf, separators=(",", ":")).encode()
+        json_chunk += b" " * (-len(json_chunk) % 4)
+        with open(file_name, "wb") as f:
+            f.write(
+                struct.pack(
+                    "<4sII", b"glTF", 2, 12 + 8 + len(json_chunk) + 8 + len(buffer)
+                )
+            )
+            f.write(struct.pack("<I4s", len(json_chunk), b"JSON"))
+            f.write(json_chunk)
+            f.write(struct.pack("<I4s", len(buffer), b"BIN\x00"))
+            f.write(buffer)
+    else:
+        gltf["buffers"][0]["uri"] = (
+            "data:application/octet-stream;base64,"
+            + base64.b64encode(bytes(buffer)).decode()
+        )
+        with open(file_name, "w") as f:
+            json.dump(gltf, f)
+
+
+def _write_ply(
+    file_name: str,
+    meshes: typing.List[
+        typing.Tuple[typing.Any, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    ],
+) -> None:
+    """Write instanced meshes to a binary PLY file as one merged mesh.
+
+    :param file_name: name of file
+    :type file_name: str
+    :param meshes: list of tuples of template mesh and the positions,
+        rotation matrices, and colours of its instances, see
+        :py:func:`pyneuroml.plot.PlotMorphologyVispy._get_mesh_instances`
+    :type meshes: list
+    """
+    num_vertices = sum(m[0].n_vertices * len(m[1]) for m in meshes)
+    num_faces = sum(m[0].n_faces * len(m[1]) for m in meshes)
+    vertex_dtype = numpy.dtype(
+        [
+            ("x", "<f4"),
+            ("y", "<f4"),
+            ("z", "<f4"),
+            ("red", "u1"),
+            ("green", "u1"),
+            ("blue", "u1"),
+        ]
+    )
+    face_dtype = numpy.dtype([("n", "u1"), ("vertices", "<i4", (3,))])
+
+    header = "\n".join(
+        [
+            "ply",
+            "format binary_little_endian 1.0",
+            f"comment generated by pyNeuroML v{__version__}",
+            f"element vertex {num_vertices}",
+            "property float x",
+            "property float y",
+            "property float z",
+            "property uchar red",
+            "property uchar green",
+            "property uchar blue",
+            f"element face {num_faces}",
+            "property list uchar int vertex_indices",
+            "end_header",
+            "",
+        ]
+    )
+
+    with open(file_name, "wb") as f:
+        f.write(header.encode("ascii"))
+
+        # vertices of all instances of all meshes, then their faces
+        for seg_mesh, positions, transforms, colors in meshes:
+            template = seg_mesh.get_vertices()
+            vertices = numpy.empty((len(positions), len(template)), dtype=vertex_dtype)
+            placed = (
+                numpy.einsum("nij,vj->nvi", transforms, template)
+                + positions[:, numpy.newaxis, :]
+            )
+            vertices["x"] = placed[..., 0]
+            vertices["y"] = placed[..., 1]
+            vertices["z"] = placed[..., 2]
+            rgb = numpy.round(colors[:, :3] * 255).astype(numpy.uint8)
+            vertices["red"] = rgb[:, 0, numpy.newaxis]
+            vertices["green"] = rgb[:, 1, numpy.newaxis]
+            vertices["blue"] = rgb[:, 2, numpy.newaxis]
+            f.write(vertices.tobytes())
+
+        vertex_offset = 0
+        for seg_mesh, positions, transforms, colors in meshes:
+            template_faces = seg_mesh.get_faces()
+            offsets = vertex_offset + seg_mesh.n_vertices * numpy.arange(len(positions))
+            faces = numpy.empty((len(positions), len(template_faces)), dtype=face_dtype)
+            faces["n"] = 3
+            faces["vertices"] = (
+                template_faces[numpy.newaxis, :, :] + offsets[:, None, None]
+            )
+            f.write(faces.tobytes())
+            vertex_offset += seg_mesh.n_vertices * len(positions)
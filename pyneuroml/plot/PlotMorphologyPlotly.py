@@ -63,6 +63,8 @@ def plot_3D_cell_morphology_plotly(
         - constant: show morphology, but use constant line widths
 
     :type plot_type: str
+    :returns: the figure
+    :rtype: plotly.graph_objects.Figure
     """
     if plot_type not in ["detailed", "constant"]:
         raise ValueError(
@@ -91,6 +93,9 @@ def plot_3D_cell_morphology_plotly(
     for cell in nml_model.cells:
         title = f"3D plot of {cell.id} from {nml_file}"
 
+        # Scatter3d only supports one line width per trace, so the segments
+        # of each width are plotted as a single trace, separated by None
+        width_vs_points = {}  # type: typing.Dict[float, typing.List[typing.List[typing.Optional[float]]]]
         for seg in cell.morphology.segments:
             p = cell.get_actual_proximal(seg.id)
             d = seg.distal
@@ -103,15 +108,28 @@ def plot_3D_cell_morphology_plotly(
                 width = min_width
             if plot_type == "constant":
                 width = min_width
+            # line widths are in pixels, so finer differences are not visible
+            width = round(width, 1)
+
+            try:
+                x, y, z = width_vs_points[width]
+            except KeyError:
+                x, y, z = width_vs_points[width] = [[], [], []]
+            x.extend([p.x, d.x, None])
+            y.extend([p.y, d.y, None])
+            z.extend([p.z, d.z, None])
+
+        for width, (x, y, z) in width_vs_points.items():
             fig.add_trace(
                 go.Scatter3d(
-                    x=[p.x, d.x],
-                    y=[p.y, d.y],
-                    z=[p.z, d.z],
+                    x=x,
+                    y=y,
+                    z=z,
                     name=None,
                     marker={"size": 2, "color": "blue"},
                     line={"width": width, "color": "blue"},
                     mode="lines",
+                    connectgaps=False,
                     showlegend=False,
                     hoverinfo="skip",
                 )
@@ -154,3 +172,5 @@ def plot_3D_cell_morphology_plotly(
             )
             fig.write_image(save_to_file, scale=2, width=1024, height=768)
             logger.info("Saved image to %s of plot: %s" % (save_to_file, title))
+
+    return fig
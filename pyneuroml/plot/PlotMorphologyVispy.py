@@ -9,9 +9,12 @@ File: pyneuroml/plot/PlotMorphologyVispy.py
 Copyright 2023 NeuroML contributors
 """
 
+import functools
+import itertools
 import logging
 import math
 import random
+import time
 import typing
 from typing import Optional
 
@@ -19,7 +22,6 @@ import numpy
 import progressbar
 from neuroml import Cell, Morphology, NeuroMLDocument, SegmentGroup
 from neuroml.neuro_lex_ids import neuro_lex_ids
-from scipy.spatial.transform import Rotation
 
 from pyneuroml.pynml import read_neuroml2_file
 from pyneuroml.utils import extract_position_info, make_cell_upright
@@ -37,10 +39,10 @@ pynml_in_jupyter = False
 
 try:
     from vispy import app, scene, use
+    from vispy.color import ColorArray
     from vispy.geometry.generation import create_sphere
     from vispy.geometry.meshdata import MeshData
-    from vispy.scene.visuals import InstancedMesh
-    from vispy.util.transforms import rotate
+    from vispy.scene.visuals import InstancedMesh, Markers
 
     if app.Application.is_interactive(app):
         pynml_in_jupyter = True
@@ -60,6 +62,14 @@ PYNEUROML_VISPY_THEME = "light"
 
 MAX_MESH_PRECISION = 3
 
+# number of template meshes kept in memory for reuse between plots
+TEMPLATE_MESH_CACHE_SIZE = 4096
+
+# approximate number of segments loaded at a time in progressive plots
+LOAD_CHUNK_SEGMENTS = 20000
+# time in seconds spent loading meshes between frames in progressive plots
+LOAD_FRAME_BUDGET = 0.03
+
 
 def add_text_to_vispy_3D_plot(
     current_canvas: scene.SceneCanvas,
@@ -325,6 +335,7 @@ def plot_interactive_3D(
     highlight_spec: typing.Optional[typing.Dict[typing.Any, typing.Any]] = None,
     precision: typing.Tuple[int, int] = (4, 200),
     upright: bool = False,
+    progressive: bool = True,
 ):
     """Plot interactive plots in 3D using Vispy
 
@@ -340,6 +351,9 @@ def plot_interactive_3D(
     .. versionadded:: 1.1.12
         The hightlight_spec parameter
 
+    .. versionadded:: 1.3.9
+        The progressive parameter
+
 
     :param nml_file: path to NeuroML cell file or
         :py:class:`neuroml.NeuroMLDocument` or :py:class:`neuroml.Cell`
@@ -427,8 +441,9 @@ def plot_interactive_3D(
         meshes to create instances. More precision means fewer segments will be
         grouped into meshes---this may increase detail, but will reduce
         performance. The second argument is used to limit the total number of
-        meshes. The function will keep reducing precision until the number of
-        meshes is fewer than the value provided here.
+        meshes. The dimensions of all segments are analysed before plotting,
+        and the precision is reduced until the number of meshes is fewer than
+        the value provided here.
 
         If you have a good GPU, you can increase both these values to get more
         detailed visualizations
@@ -441,6 +456,11 @@ def plot_interactive_3D(
         "upwards" instead of "downwards" in most cases. Note that the original cell object
         is unchanged, this is for visualization purposes only.
     :type upright: bool
+    :param progressive: show the window before the meshes are created, with
+        the somata of all cells shown as markers, and then create the meshes
+        in chunks of about :py:data:`LOAD_CHUNK_SEGMENTS` segments between
+        frames so that the window remains responsive while they are loaded
+    :type progressive: bool
 
     :throws ValueError: if `plot_type` is not one of "detailed", "constant",
         "schematic", or "point"
@@ -458,50 +478,7 @@ def plot_interactive_3D(
     if verbose:
         logger.info(f"Visualising {nml_file}")
 
-    # if it's a file, load it first
-    if isinstance(nml_file, str):
-        # load without optimization for older HDF5 API
-        # TODO: check if this is required: must for MultiscaleISN
-        if nml_file.endswith(".h5"):
-            nml_model = read_neuroml2_file(nml_file)
-        else:
-            nml_model = read_neuroml2_file(
-                nml_file,
-                include_includes=False,
-                check_validity_pre_include=False,
-                verbose=False,
-                optimized=True,
-            )
-            load_minimal_morphplottable__model(nml_model, nml_file)
-            # note that from this point, the model object is not necessarily valid,
-            # because we've removed lots of bits.
-    else:
-        nml_model = nml_file
-
-    # if it isn't a NeuroMLDocument, create one
-    if isinstance(nml_model, Cell):
-        logger.debug("Got a cell")
-        plottable_nml_model = NeuroMLDocument(id="newdoc")
-        plottable_nml_model.add(nml_model)
-        logger.debug(f"plottable cell model is: {plottable_nml_model.cells[0]}")
-        if title is None:
-            title = f"{plottable_nml_model.cells[0].id}"
-
-    # if it's only a cell, add it to an empty cell in a document
-    elif isinstance(nml_model, Morphology):
-        logger.debug("Received morph, adding to a dummy cell")
-        plottable_nml_model = NeuroMLDocument(id="newdoc")
-        nml_cell = plottable_nml_model.add(
-            Cell, id=nml_model.id, morphology=nml_model, validate=False
-        )
-        plottable_nml_model.add(nml_cell)
-        logger.debug(f"plottable cell model is: {plottable_nml_model.cells[0]}")
-        if title is None:
-            title = f"{plottable_nml_model.cells[0].id}"
-    elif isinstance(nml_model, NeuroMLDocument):
-        plottable_nml_model = nml_model
-        if title is None:
-            title = f"{plottable_nml_model.id}"
+    plottable_nml_model, title = _get_plottable_model(nml_file, title)
 
     (
         cell_id_vs_cell,
@@ -599,6 +576,233 @@ def plot_interactive_3D(
         f"After canvas creation: center, view_min, max are {view_center}, {view_min}, {view_max}"
     )
 
+    if progressive and not nogui:
+        # show the somata until the meshes have been loaded
+        soma_positions, soma_sizes, soma_colors = _get_soma_points(
+            pop_id_vs_cell,
+            positions,
+            pop_id_vs_color,
+            pop_id_vs_radii,
+            default_color=VISPY_THEME[theme]["fg"],
+        )
+        preview = _create_markers(
+            soma_positions, soma_sizes, soma_colors, current_view.scene
+        )
+        meshdata_chunks = _get_meshdata_chunks(
+            pop_id_vs_cell,
+            positions,
+            pop_id_vs_color,
+            pop_id_vs_radii,
+            plot_type=plot_type,
+            plot_spec=plot_spec,
+            highlight_spec=highlight_spec,
+            precision=precision,
+            verbose=verbose,
+            upright=upright,
+            chunk_segments=LOAD_CHUNK_SEGMENTS,
+        )
+        _load_meshes_progressively(
+            meshdata_chunks, plot_type, current_view, min_width, preview
+        )
+    else:
+        meshdata = _get_meshdata(
+            pop_id_vs_cell,
+            positions,
+            pop_id_vs_color,
+            pop_id_vs_radii,
+            plot_type=plot_type,
+            plot_spec=plot_spec,
+            highlight_spec=highlight_spec,
+            precision=precision,
+            verbose=verbose,
+            upright=upright,
+        )
+        if not nogui:
+            create_instanced_meshes(meshdata, plot_type, current_view, min_width)
+
+    if not nogui:
+        if pynml_in_jupyter:
+            display(current_canvas)
+        else:
+            current_canvas.show()
+            app.run()
+
+
+def _get_plottable_model(
+    nml_file: typing.Union[str, Cell, Morphology, NeuroMLDocument],
+    title: typing.Optional[str] = None,
+) -> typing.Tuple[NeuroMLDocument, typing.Optional[str]]:
+    """Load a model and put it in a document for plotting.
+
+    Files are loaded with only the parts needed for plotting, see
+    :py:func:`pyneuroml.utils.plot.load_minimal_morphplottable__model`.
+
+    :param nml_file: path to NeuroML file, or model object, see
+        :py:func:`plot_interactive_3D`
+    :type nml_file: str or neuroml.NeuroMLDocument or neuroml.Cell or
+        neuroml.Morphology
+    :param title: title of plot, if None, the id of the model is used
+    :type title: str
+    :returns: tuple of the document and the title
+    :rtype: (neuroml.NeuroMLDocument, str)
+    """
+    # if it's a file, load it first
+    if isinstance(nml_file, str):
+        # load without optimization for older HDF5 API
+        # TODO: check if this is required: must for MultiscaleISN
+        if nml_file.endswith(".h5"):
+            nml_model = read_neuroml2_file(nml_file)
+        else:
+            nml_model = read_neuroml2_file(
+                nml_file,
+                include_includes=False,
+                check_validity_pre_include=False,
+                verbose=False,
+                optimized=True,
+            )
+            load_minimal_morphplottable__model(nml_model, nml_file)
+            # note that from this point, the model object is not necessarily valid,
+            # because we've removed lots of bits.
+    else:
+        nml_model = nml_file
+
+    # if it isn't a NeuroMLDocument, create one
+    if isinstance(nml_model, Cell):
+        logger.debug("Got a cell")
+        plottable_nml_model = NeuroMLDocument(id="newdoc")
+        plottable_nml_model.add(nml_model)
+        logger.debug(f"plottable cell model is: {plottable_nml_model.cells[0]}")
+        if title is None:
+            title = f"{plottable_nml_model.cells[0].id}"
+
+    # if it's only a cell, add it to an empty cell in a document
+    elif isinstance(nml_model, Morphology):
+        logger.debug("Received morph, adding to a dummy cell")
+        plottable_nml_model = NeuroMLDocument(id="newdoc")
+        nml_cell = plottable_nml_model.add(
+            Cell, id=nml_model.id, morphology=nml_model, validate=False
+        )
+        plottable_nml_model.add(nml_cell)
+        logger.debug(f"plottable cell model is: {plottable_nml_model.cells[0]}")
+        if title is None:
+            title = f"{plottable_nml_model.cells[0].id}"
+    elif isinstance(nml_model, NeuroMLDocument):
+        plottable_nml_model = nml_model
+        if title is None:
+            title = f"{plottable_nml_model.id}"
+
+    return plottable_nml_model, title
+
+
+def _get_meshdata(
+    pop_id_vs_cell: typing.Dict[str, typing.Any],
+    positions: typing.Dict[str, typing.Dict[int, typing.Any]],
+    pop_id_vs_color: typing.Dict[str, str],
+    pop_id_vs_radii: typing.Dict[str, float],
+    plot_type: str = "constant",
+    plot_spec: typing.Optional[
+        typing.Dict[str, typing.Union[str, typing.List[int], float]]
+    ] = None,
+    highlight_spec: typing.Optional[typing.Dict[typing.Any, typing.Any]] = None,
+    precision: typing.Tuple[int, int] = (4, 200),
+    verbose: bool = False,
+    upright: bool = False,
+) -> typing.Dict[typing.Any, typing.Any]:
+    """Get the mesh data of all cells of a model.
+
+    This groups the segments of all cells into meshes without creating any
+    visuals, so it does not need a display. The dictionaries of cells and
+    positions are emptied.
+
+    :param pop_id_vs_cell: dictionary of populations and their cells, from
+        :py:func:`pyneuroml.utils.extract_position_info`
+    :type pop_id_vs_cell: dict
+    :param positions: dictionary of positions of cells of each population
+    :type positions: dict
+    :param pop_id_vs_color: dictionary of colours of populations
+    :type pop_id_vs_color: dict
+    :param pop_id_vs_radii: dictionary of radii of point cells of populations
+    :type pop_id_vs_radii: dict
+    :returns: mesh data, see :py:func:`create_instanced_meshes`
+    :rtype: dict
+
+    .. seealso::
+
+        :py:func:`plot_interactive_3D`
+            for descriptions of the other parameters
+    """
+    meshdata = {}  # type: typing.Dict[typing.Any, typing.Any]
+    for chunk in _get_meshdata_chunks(
+        pop_id_vs_cell,
+        positions,
+        pop_id_vs_color,
+        pop_id_vs_radii,
+        plot_type=plot_type,
+        plot_spec=plot_spec,
+        highlight_spec=highlight_spec,
+        precision=precision,
+        verbose=verbose,
+        upright=upright,
+    ):
+        for key, instances in chunk.items():
+            try:
+                meshdata[key].extend(instances)
+            except KeyError:
+                meshdata[key] = instances
+    return meshdata
+
+
+def _get_meshdata_chunks(
+    pop_id_vs_cell: typing.Dict[str, typing.Any],
+    positions: typing.Dict[str, typing.Dict[int, typing.Any]],
+    pop_id_vs_color: typing.Dict[str, str],
+    pop_id_vs_radii: typing.Dict[str, float],
+    plot_type: str = "constant",
+    plot_spec: typing.Optional[
+        typing.Dict[str, typing.Union[str, typing.List[int], float]]
+    ] = None,
+    highlight_spec: typing.Optional[typing.Dict[typing.Any, typing.Any]] = None,
+    precision: typing.Tuple[int, int] = (4, 200),
+    verbose: bool = False,
+    upright: bool = False,
+    chunk_segments: typing.Optional[int] = None,
+) -> typing.Iterator[typing.Dict[typing.Any, typing.Any]]:
+    """Get the mesh data of all cells of a model in chunks.
+
+    The precision used to group segments into meshes is chosen from the
+    whole model before the first chunk is generated, so that all chunks use
+    the same meshes. Cells are processed population by population: a chunk
+    is generated at the end of each population, and whenever the cells in it
+    have at least `chunk_segments` segments.
+
+    The dictionaries of cells and positions are emptied as the chunks are
+    generated.
+
+    :param pop_id_vs_cell: dictionary of populations and their cells, from
+        :py:func:`pyneuroml.utils.extract_position_info`
+    :type pop_id_vs_cell: dict
+    :param positions: dictionary of positions of cells of each population
+    :type positions: dict
+    :param pop_id_vs_color: dictionary of colours of populations
+    :type pop_id_vs_color: dict
+    :param pop_id_vs_radii: dictionary of radii of point cells of populations
+    :type pop_id_vs_radii: dict
+    :param chunk_segments: approximate number of segments in each chunk, if
+        None, all cells are in a single chunk
+    :type chunk_segments: int
+    :returns: generator of mesh data, see :py:func:`create_instanced_meshes`
+    :rtype: generator(dict)
+
+    .. seealso::
+
+        :py:func:`plot_interactive_3D`
+            for descriptions of the other parameters
+    """
+    if highlight_spec is None:
+        highlight_spec = {}
+
+    total_cells = sum(len(pos_pop) for pos_pop in positions.values())
+
     # process plot_spec
     point_cells = []
     schematic_cells = []
@@ -622,6 +826,55 @@ def plot_interactive_3D(
         except KeyError:
             pass
 
+    # select the cells of each population to plot as points
+    pop_id_vs_point_cells = {}  # type: typing.Dict[str, typing.List[int]]
+    for pop_id in pop_id_vs_cell.keys():
+        pop_id_vs_point_cells[pop_id] = []
+        if len(point_cells) == 0 and plot_spec is not None:
+            cell_indices = list(positions[pop_id].keys())
+            try:
+                pop_id_vs_point_cells[pop_id] = random.sample(
+                    cell_indices,
+                    int(len(cell_indices) * float(plot_spec["point_fraction"])),
+                )
+            except KeyError:
+                pass
+
+    # choose the precision used to group segments into meshes from the
+    # dimensions of all the meshes that will be plotted, so that the model is
+    # only processed once
+    mesh_dimensions = []  # type: typing.List[numpy.ndarray]
+    processed_cells = set()  # type: typing.Set[typing.Tuple[int, str]]
+    for pop_id, cell in pop_id_vs_cell.items():
+        # points are plotted as markers, not meshes
+        if (
+            cell is None
+            or plot_type == "point"
+            or cell.id in point_cells
+            or len(pop_id_vs_point_cells[pop_id]) == len(positions[pop_id])
+        ):
+            continue
+
+        cell_plot_type = (
+            "schematic"
+            if plot_type == "schematic" or cell.id in schematic_cells
+            else "detailed"
+        )
+        if (id(cell), cell_plot_type) not in processed_cells:
+            processed_cells.add((id(cell), cell_plot_type))
+            mesh_dimensions.append(
+                _get_mesh_dimensions(
+                    cell, cell_plot_type, highlight_spec.get(cell.id, {})
+                )
+            )
+
+    mesh_precision = _get_mesh_precision(mesh_dimensions, precision[0], precision[1])
+    if mesh_precision < precision[0]:
+        logger.info(
+            f"More meshes than threshold ({precision[1]}) at precision {precision[0]}, using precision {mesh_precision}"
+        )
+    precision = (mesh_precision, precision[1])
+
     meshdata = {}  # type: typing.Dict[typing.Any, typing.Any]
     logger.info("Processing %s cells" % total_cells)
 
@@ -640,23 +893,14 @@ def plot_interactive_3D(
         pbar = None
 
     pbar_ctr = 0
+    chunk_size = 0
     while pop_id_vs_cell:
         if pbar is not None:
             pbar.update(pbar_ctr)
         pop_id, cell = pop_id_vs_cell.popitem()
         pos_pop = positions[pop_id]
-
-        # reinit point_cells for each loop
-        point_cells_pop = []
-        if len(point_cells) == 0 and plot_spec is not None:
-            cell_indices = list(pos_pop.keys())
-            try:
-                point_cells_pop = random.sample(
-                    cell_indices,
-                    int(len(cell_indices) * float(plot_spec["point_fraction"])),
-                )
-            except KeyError:
-                pass
+        point_cells_pop = pop_id_vs_point_cells[pop_id]
+        num_cell_segments = 1 if cell is None else len(cell.morphology.segments)
 
         while pos_pop:
             cell_index, pos = pos_pop.popitem()
@@ -706,9 +950,6 @@ def plot_interactive_3D(
                         segment_groups=None,
                         color=color,
                         verbose=verbose,
-                        current_canvas=current_canvas,
-                        current_view=current_view,
-                        axes_pos=axes_pos,
                         nogui=True,
                         meshdata=meshdata,
                         mesh_precision=precision[0],
@@ -733,10 +974,6 @@ def plot_interactive_3D(
                         color=color,
                         plot_type=plot_type,
                         verbose=verbose,
-                        current_canvas=current_canvas,
-                        current_view=current_view,
-                        axes_pos=axes_pos,
-                        min_width=min_width,
                         nogui=True,
                         meshdata=meshdata,
                         mesh_precision=precision[0],
@@ -744,43 +981,118 @@ def plot_interactive_3D(
                         upright=upright,
                     )
 
-            # if too many meshes, reduce precision and retry, recursively
-            if (len(meshdata.keys()) > precision[1]) and (precision[0] > 0):
-                precision = (precision[0] - 1, precision[1])
-                if pbar is not None:
-                    pbar.finish(dirty=True)
+            pbar_ctr += 1
+            chunk_size += num_cell_segments
+            if chunk_segments is not None and chunk_size >= chunk_segments:
+                yield meshdata
+                meshdata = {}
+                chunk_size = 0
 
-                logger.info(
-                    f"More meshes than threshold ({len(meshdata.keys())}/{precision[1]}), reducing precision to {precision[0]} and re-calculating."
-                )
-                plot_interactive_3D(
-                    nml_file=plottable_nml_model,
-                    min_width=min_width,
-                    verbose=verbose,
-                    plot_type=plot_type,
-                    axes_pos=axes_pos,
-                    title=title,
-                    theme=theme,
-                    nogui=nogui,
-                    plot_spec=plot_spec,
-                    precision=precision,
-                    highlight_spec=highlight_spec,
-                    upright=upright,
-                )
-                # break the recursion, don't plot in the calling method
-                return
+        if chunk_segments is not None and len(meshdata) > 0:
+            yield meshdata
+            meshdata = {}
+            chunk_size = 0
 
-            pbar_ctr += 1
+    if pbar is not None:
+        pbar.finish()
 
-    if not nogui:
-        if pbar is not None:
-            pbar.finish()
-        create_instanced_meshes(meshdata, plot_type, current_view, min_width)
-        if pynml_in_jupyter:
-            display(current_canvas)
-        else:
-            current_canvas.show()
-            app.run()
+    if len(meshdata) > 0:
+        yield meshdata
+
+
+def _get_mesh_dimensions(
+    cell: Cell,
+    plot_type: str = "detailed",
+    highlight_spec: typing.Optional[typing.Dict[typing.Any, typing.Any]] = None,
+) -> numpy.ndarray:
+    """Get the dimensions of the meshes used to plot a cell.
+
+    These are the dimensions that :py:func:`plot_3D_cell_morphology` and
+    :py:func:`plot_3D_schematic` use to group segments into meshes, before
+    rounding.
+
+    :param cell: cell
+    :type cell: neuroml.Cell
+    :param plot_type: "schematic" for the unbranched segment groups used in
+        schematic plots, otherwise the segments of the cell
+    :type plot_type: str
+    :param highlight_spec: highlight specification of the cell, see
+        :py:func:`plot_3D_cell_morphology`, whose marker sizes replace the
+        radii of segments
+    :type highlight_spec: dict
+    :returns: array of shape (number of meshes, 3) with the proximal and
+        distal radii and the length of each mesh
+    :rtype: numpy.ndarray
+    """
+    dimensions = []
+    if plot_type == "schematic":
+        segment_groups = [
+            sg.id
+            for sg in cell.morphology.segment_groups
+            if sg.neuro_lex_id == neuro_lex_ids["section"]
+        ]
+        ord_segs = cell.get_ordered_segments_in_groups(
+            segment_groups, check_parentage=False
+        )
+        for segs in ord_segs.values():
+            first_prox = cell.get_actual_proximal(segs[0].id)
+            last_dist = segs[-1].distal
+            dimensions.append(
+                (
+                    first_prox.diameter / 2,
+                    last_dist.diameter / 2,
+                    math.dist(
+                        (first_prox.x, first_prox.y, first_prox.z),
+                        (last_dist.x, last_dist.y, last_dist.z),
+                    ),
+                )
+            )
+    else:
+        if highlight_spec is None:
+            highlight_spec = {}
+        for seg in cell.morphology.segments:
+            r1 = cell.get_actual_proximal(seg.id).diameter / 2
+            r2 = seg.distal.diameter / 2
+            segment_spec = highlight_spec.get(
+                seg.id, highlight_spec.get(str(seg.id), {})
+            )
+            if segment_spec.get("marker_size", None) is not None:
+                r1 = float(segment_spec["marker_size"][0]) / 2
+                r2 = float(segment_spec["marker_size"][1]) / 2
+            dimensions.append((r1, r2, cell.get_segment_length(seg.id)))
+
+    return numpy.array(dimensions, dtype=float).reshape(-1, 3)
+
+
+def _get_mesh_precision(
+    mesh_dimensions: typing.List[numpy.ndarray], max_precision: int, max_meshes: int
+) -> int:
+    """Get the precision to group segments into meshes with.
+
+    This is the largest number of decimal places, up to max_precision, at
+    which rounding the dimensions gives at most max_meshes distinct meshes,
+    or 0 if there is none.
+
+    :param mesh_dimensions: list of arrays of mesh dimensions, see
+        :py:func:`_get_mesh_dimensions`
+    :type mesh_dimensions: list(numpy.ndarray)
+    :param max_precision: maximum number of decimal places
+    :type max_precision: int
+    :param max_meshes: maximum number of meshes
+    :type max_meshes: int
+    :returns: number of decimal places
+    :rtype: int
+    """
+    if len(mesh_dimensions) == 0:
+        return max_precision
+
+    dimensions = numpy.concatenate(mesh_dimensions)
+    for mesh_precision in range(max_precision, 0, -1):
+        num_meshes = len(numpy.unique(numpy.round(dimensions, mesh_precision), axis=0))
+        logger.debug(f"{num_meshes} meshes at precision {mesh_precision}")
+        if num_meshes <= max_meshes:
+            return mesh_precision
+    return 0
 
 
 def plot_3D_cell_morphology(
@@ -933,7 +1245,7 @@ def plot_3D_cell_morphology(
     except Exception:
         axon_segs = []
 
-    if current_canvas is None or current_view is None:
+    if (current_canvas is None or current_view is None) and not nogui:
         view_min, view_max = get_cell_bound_box(cell)
         current_canvas, current_view = create_new_vispy_canvas(
             view_min,
@@ -1046,12 +1358,207 @@ def plot_3D_cell_morphology(
     return meshdata
 
 
+def _get_instance_transforms(directions: numpy.ndarray) -> numpy.ndarray:
+    """Get the rotation matrices that orient template meshes along vectors.
+
+    Template meshes are created along the z axis. This computes, for all
+    vectors at once, the rotation about the axis perpendicular to both the z
+    axis and the vector that takes the z axis to the direction of the vector
+    (Rodrigues' rotation formula). Zero vectors, and vectors along the z
+    axis, get the identity matrix, and vectors opposite to the z axis get a
+    rotation of 180 degrees about the x axis.
+
+    :param directions: array of vectors, of shape (number of vectors, 3)
+    :type directions: numpy.ndarray
+    :returns: array of rotation matrices, of shape (number of vectors, 3, 3),
+        to be applied to column vectors
+    :rtype: numpy.ndarray
+    """
+    directions = numpy.asarray(directions, dtype=float).reshape(-1, 3)
+    norms = numpy.linalg.norm(directions, axis=1)
+    transforms = numpy.tile(numpy.eye(3), (len(directions), 1, 1))
+
+    nonzero = norms > 0
+    unit = directions[nonzero] / norms[nonzero, None]
+    # cosine of the angle from the z axis, and the (unnormalised) axis of
+    # rotation z x u = (-u_y, u_x, 0)
+    cos = unit[:, 2]
+    kx = -unit[:, 1]
+    ky = unit[:, 0]
+
+    opposite = cos <= -1 + 1e-12
+    # R = I + [k]x + [k]x^2 / (1 + cos)
+    factor = 1 / numpy.where(opposite, 1.0, 1 + cos)
+    rotations = numpy.empty((len(unit), 3, 3))
+    rotations[:, 0, 0] = 1 - ky * ky * factor
+    rotations[:, 0, 1] = kx * ky * factor
+    rotations[:, 0, 2] = ky
+    rotations[:, 1, 0] = kx * ky * factor
+    rotations[:, 1, 1] = 1 - kx * kx * factor
+    rotations[:, 1, 2] = -kx
+    rotations[:, 2, 0] = -ky
+    rotations[:, 2, 1] = kx
+    rotations[:, 2, 2] = cos
+    rotations[opposite] = numpy.diag([1.0, -1.0, -1.0])
+
+    transforms[nonzero] = rotations
+    return transforms
+
+
+def _get_instance_colors(colors: typing.List[typing.Any]) -> numpy.ndarray:
+    """Convert the colours of mesh instances to an RGBA array.
+
+    Each distinct colour is only converted once, since there are usually
+    far fewer colours than instances.
+
+    :param colors: list of colours, as strings or RGB(A) sequences
+    :type colors: list
+    :returns: array of RGBA values, of shape (number of colours, 4)
+    :rtype: numpy.ndarray
+    """
+    keys = [c if isinstance(c, str) else tuple(c) for c in colors]
+    unique = {}  # type: typing.Dict[typing.Any, int]
+    indices = numpy.fromiter(
+        (unique.setdefault(k, len(unique)) for k in keys), dtype=int, count=len(keys)
+    )
+    rgba = ColorArray(list(unique.keys())).rgba
+    return rgba[indices]
+
+
+@functools.lru_cache(maxsize=TEMPLATE_MESH_CACHE_SIZE)
+def _get_template_mesh(
+    shape: str, r1: float, r2: float, length: float, rows: int, cols: int
+) -> "MeshData":
+    """Get a template mesh for instanced meshes.
+
+    Template meshes are cached for the whole session, so plotting models
+    again, or models with segments of the same dimensions, does not
+    regenerate them. The least recently used meshes are dropped when the
+    cache holds TEMPLATE_MESH_CACHE_SIZE meshes. The returned meshes are
+    shared, and so must not be modified.
+
+    :param shape: "sphere" or "cylinder"
+    :type shape: str
+    :param r1: radius of sphere, or proximal radius of cylinder
+    :type r1: float
+    :param r2: distal radius of cylinder
+    :type r2: float
+    :param length: length of cylinder
+    :type length: float
+    :param rows: number of rows of mesh
+    :type rows: int
+    :param cols: number of columns of mesh
+    :type cols: int
+    :returns: mesh
+    :rtype: MeshData
+    """
+    if shape == "sphere":
+        logger.debug(f"Created spherical mesh template with radius {r1}")
+        return create_sphere(rows, cols, radius=r1)
+
+    logger.debug(f"Created cylinderical mesh template with radii {r1}, {r2}, {length}")
+    return create_cylindrical_mesh(
+        rows=rows, cols=cols, radius=[r1, r2], length=length, closed=True
+    )
+
+
+def _get_mesh_instances(
+    key: typing.Tuple[str, str, str],
+    instances: typing.List[typing.Tuple],
+    plot_type: str,
+    min_width: float,
+) -> typing.Tuple["MeshData", numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Get the template mesh and instance arrays for one entry of mesh data.
+
+    :param key: mesh data key: (r1, r2, length)
+    :type key: tuple(str, str, str)
+    :param instances: mesh data instances: [(prox, dist, color, offset)]
+    :type instances: list
+    :param plot_type: type of plot
+    :type plot_type: str
+    :param min_width: minimum width of tubes
+    :type min_width: float
+    :returns: tuple of the template mesh, and arrays of the positions (shape
+        (number of instances, 3)), rotation matrices (shape (number of
+        instances, 3, 3)), and RGBA colours (shape (number of instances, 4))
+        of its instances
+    :rtype: (MeshData, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    r1 = float(key[0])
+    r2 = float(key[1])
+    length = float(key[2])
+
+    # actual plotting bits
+    if plot_type == "constant":
+        r1 = min_width
+        r2 = min_width
+
+    if r1 < min_width:
+        r1 = min_width
+    if r2 < min_width:
+        r2 = min_width
+
+    seg_mesh = None
+    # 1: for points, we set the prox/dist to None since they only have
+    # positions.
+    # 2: single compartment cells with r1, r2, and length 0
+    # Note: we can't check if r1 == r2 == length because there
+    # may be cylinders with such a set of parameters
+
+    if r1 == r2 and (
+        (instances[0][0] is None and instances[0][1] is None) or (length == 0.0)
+    ):
+        seg_mesh = _get_template_mesh("sphere", r1, r1, 0.0, 9, 9)
+    else:
+        rows = 2 + int(length / 2)
+        seg_mesh = _get_template_mesh("cylinder", r1, r2, length, rows, 9)
+
+    # stack end points: points (spherical meshes) have no end points, and
+    # are placed at their offsets without rotation
+    offsets = numpy.fromiter(
+        itertools.chain.from_iterable(im[3] for im in instances),
+        dtype=float,
+        count=3 * len(instances),
+    ).reshape(-1, 3)
+    end_points = numpy.fromiter(
+        itertools.chain.from_iterable(
+            (prox.x, prox.y, prox.z, dist.x, dist.y, dist.z)
+            if prox is not None and dist is not None
+            else (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            for prox, dist, color, offset in instances
+        ),
+        dtype=float,
+        count=6 * len(instances),
+    ).reshape(-1, 6)
+
+    instance_positions = offsets + end_points[:, :3]
+    instance_transforms = _get_instance_transforms(
+        end_points[:, 3:] - end_points[:, :3]
+    )
+    instance_colors = _get_instance_colors([im[2] for im in instances])
+
+    logger.debug(
+        "Instanced: positions: %s, transforms: %s",
+        instance_positions,
+        instance_transforms,
+    )
+
+    return seg_mesh, instance_positions, instance_transforms, instance_colors
+
+
 def create_instanced_meshes(meshdata, plot_type, current_view, min_width):
     """Internal function to plot instanced meshes from mesh data.
 
     It is more efficient to collect all the segments that require the same
     cylindrical mesh and to create instanced meshes for them.
 
+    The positions, orientations, and colours of all instances of each mesh
+    are computed together from arrays of their end points.
+
+    Points, which have no end points, are removed from the mesh data and
+    plotted together as a single markers visual, see
+    :py:func:`_get_point_data`.
+
     See: https://vispy.org/api/vispy.scene.visuals.html#vispy.scene.visuals.InstancedMesh
 
     :param meshdata: meshdata to plot: dictionary with:
@@ -1064,6 +1571,13 @@ def create_instanced_meshes(meshdata, plot_type, current_view, min_width):
     :param min_width: minimum width of tubes
     :type min_width: float
     """
+    point_positions, point_sizes, point_colors = _get_point_data(
+        meshdata, plot_type, min_width
+    )
+    if len(point_positions) > 0:
+        logger.debug(f"Visualising {len(point_positions)} points")
+        _create_markers(point_positions, point_sizes, point_colors, current_view.scene)
+
     total_mesh_instances = 0
     for d, i in meshdata.items():
         total_mesh_instances += len(i)
@@ -1078,95 +1592,15 @@ def create_instanced_meshes(meshdata, plot_type, current_view, min_width):
     )
     progress_ctr = 0
     for d, i in meshdata.items():
-        r1 = float(d[0])
-        r2 = float(d[1])
-        length = float(d[2])
-
-        # actual plotting bits
-        if plot_type == "constant":
-            r1 = min_width
-            r2 = min_width
-
-        if r1 < min_width:
-            r1 = min_width
-        if r2 < min_width:
-            r2 = min_width
-
-        seg_mesh = None
-        # 1: for points, we set the prox/dist to None since they only have
-        # positions.
-        # 2: single compartment cells with r1, r2, and length 0
-        # Note: we can't check if r1 == r2 == length because there
-        # may be cylinders with such a set of parameters
-
-        if r1 == r2 and ((i[0][0] is None and i[0][1] is None) or (length == 0.0)):
-            seg_mesh = create_sphere(9, 9, radius=r1)
-            logger.debug(f"Created spherical mesh template with radius {r1}")
-        else:
-            rows = 2 + int(length / 2)
-            seg_mesh = create_cylindrical_mesh(
-                rows=rows, cols=9, radius=[r1, r2], length=length, closed=True
-            )
-            logger.debug(
-                f"Created cylinderical mesh template with radii {r1}, {r2}, {length}"
-            )
-
-        instance_positions = []
-        instance_transforms = []
-        instance_colors = []
-
-        # if in a notebook, only update once per mesh, but not per mesh
-        # instance
-        if pynml_in_jupyter:
-            pbar.update(progress_ctr)
-
-        for num, im in enumerate(i):
-            # if not in a notebook, update for each mesh instance
-            if not pynml_in_jupyter:
-                pbar.update(progress_ctr)
-
-            progress_ctr += 1
-            prox = im[0]
-            dist = im[1]
-            color = im[2]
-            offset = im[3]
-
-            # points, spherical meshes
-            if prox is not None and dist is not None:
-                orig_vec = [0, 0, length]
-                dir_vector = [dist.x - prox.x, dist.y - prox.y, dist.z - prox.z]
-                k = numpy.cross(orig_vec, dir_vector)
-                mag_k = numpy.linalg.norm(k)
-
-                if mag_k != 0.0:
-                    k = k / mag_k
-                    theta = math.acos(
-                        numpy.dot(orig_vec, dir_vector)
-                        / (numpy.linalg.norm(orig_vec) * numpy.linalg.norm(dir_vector))
-                    )
-                    logger.debug(f"k is {k}, theta is {theta}")
-                    rot_matrix = rotate(math.degrees(theta), k).T
-                    rot_obj = Rotation.from_matrix(rot_matrix[:3, :3])
-                else:
-                    logger.debug("k is [0..], using zeros for rotation matrix")
-                    rot_matrix = numpy.zeros((3, 3))
-                    rot_obj = Rotation.from_matrix(rot_matrix)
+        pbar.update(progress_ctr)
+        progress_ctr += len(i)
 
-                instance_positions.append(
-                    [offset[0] + prox.x, offset[1] + prox.y, offset[2] + prox.z]
-                )
-            else:
-                instance_positions.append(offset)
-                rot_matrix = numpy.zeros((3, 3))
-                rot_obj = Rotation.from_matrix(rot_matrix)
-
-            instance_transforms.append(rot_obj.as_matrix())
-            instance_colors.append(color)
-
-        assert len(instance_positions) == len(instance_transforms)
-        logger.debug(
-            f"Instanced: positions: {instance_positions}, transforms: {instance_transforms}"
-        )
+        (
+            seg_mesh,
+            instance_positions,
+            instance_transforms,
+            instance_colors,
+        ) = _get_mesh_instances(d, i, plot_type, min_width)
 
         mesh = InstancedMesh(
             meshdata=seg_mesh,
@@ -1180,6 +1614,276 @@ def create_instanced_meshes(meshdata, plot_type, current_view, min_width):
     pbar.finish()
 
 
+def _get_point_data(
+    meshdata: typing.Dict[typing.Any, typing.Any], plot_type: str, min_width: float
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Remove the points from mesh data and get their positions, sizes, and
+    colours.
+
+    Points are the instances of mesh data without proximal and distal
+    points, used for point cells and for cells plotted as points. Their
+    radii are the first value of the key, with the same minimum width as
+    meshes.
+
+    :param meshdata: mesh data, see :py:func:`create_instanced_meshes`,
+        modified in place
+    :type meshdata: dict
+    :param plot_type: type of plot
+    :type plot_type: str
+    :param min_width: minimum width of points
+    :type min_width: float
+    :returns: tuple of arrays of positions (N, 3), diameters (N,), and RGBA
+        colours (N, 4)
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    all_positions = []
+    all_sizes = []
+    all_colors = []
+    for key, instances in list(meshdata.items()):
+        points = [im for im in instances if im[0] is None and im[1] is None]
+        if len(points) == 0:
+            continue
+        if len(points) == len(instances):
+            del meshdata[key]
+        else:
+            meshdata[key] = [
+                im for im in instances if im[0] is not None or im[1] is not None
+            ]
+
+        radius = float(key[0])
+        if plot_type == "constant" or radius < min_width:
+            radius = min_width
+
+        all_positions.append(
+            numpy.fromiter(
+                itertools.chain.from_iterable(im[3] for im in points),
+                dtype=numpy.float32,
+                count=3 * len(points),
+            ).reshape(-1, 3)
+        )
+        all_sizes.append(numpy.full(len(points), 2 * radius, dtype=numpy.float32))
+        all_colors.append(_get_instance_colors([im[2] for im in points]))
+
+    if len(all_positions) == 0:
+        return (
+            numpy.zeros((0, 3), dtype=numpy.float32),
+            numpy.zeros(0, dtype=numpy.float32),
+            numpy.zeros((0, 4), dtype=numpy.float32),
+        )
+    return (
+        numpy.concatenate(all_positions),
+        numpy.concatenate(all_sizes),
+        numpy.concatenate(all_colors),
+    )
+
+
+def _create_markers(
+    positions: numpy.ndarray, sizes: numpy.ndarray, colors: numpy.ndarray, parent
+):
+    """Create a markers visual to plot points as spheres.
+
+    The markers are shaded as spheres and their sizes are in scene units, so
+    they look like sphere meshes of the same diameters at any distance, but
+    all points are drawn together as a single visual.
+
+    :param positions: array of positions of points (N, 3)
+    :type positions: numpy.ndarray
+    :param sizes: array of diameters of points (N,)
+    :type sizes: numpy.ndarray
+    :param colors: array of RGBA colours of points (N, 4)
+    :type colors: numpy.ndarray
+    :param parent: parent of visual
+    :type parent: vispy scene node
+    :returns: markers visual
+    :rtype: vispy.scene.visuals.Markers
+    """
+    markers = Markers(scaling="scene", spherical=True, parent=parent)
+    markers.set_data(positions, size=sizes, edge_width=0, face_color=colors)
+    return markers
+
+
+def _get_soma_points(
+    pop_id_vs_cell: typing.Dict[str, typing.Any],
+    positions: typing.Dict[str, typing.Dict[int, typing.Any]],
+    pop_id_vs_color: typing.Dict[str, str],
+    pop_id_vs_radii: typing.Dict[str, float],
+    default_color: str = "black",
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Get the positions, sizes, and colours of the somata of all cells.
+
+    As for point plots, segment 0 is assumed to be the soma of cells with
+    morphologies. Point cells are represented by their positions and radii.
+
+    :param pop_id_vs_cell: dictionary of populations and their cells, from
+        :py:func:`pyneuroml.utils.extract_position_info`
+    :type pop_id_vs_cell: dict
+    :param positions: dictionary of positions of cells of each population
+    :type positions: dict
+    :param pop_id_vs_color: dictionary of colours of populations
+    :type pop_id_vs_color: dict
+    :param pop_id_vs_radii: dictionary of radii of point cells of populations
+    :type pop_id_vs_radii: dict
+    :param default_color: colour of populations without colours
+    :type default_color: str
+    :returns: tuple of arrays of positions (N, 3), diameters (N,), and RGBA
+        colours (N, 4)
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    all_positions = []
+    all_sizes = []
+    all_colors = []
+    for pop_id, cell in pop_id_vs_cell.items():
+        pop_positions = numpy.array(
+            list(positions[pop_id].values()), dtype=numpy.float32
+        ).reshape(-1, 3)
+        if cell is None:
+            size = 2 * (pop_id_vs_radii[pop_id] if pop_id in pop_id_vs_radii else 10)
+        else:
+            soma_x_y_z = cell.get_actual_proximal(0)
+            pop_positions += [soma_x_y_z.x, soma_x_y_z.y, soma_x_y_z.z]
+            size = soma_x_y_z.diameter
+        color = ColorArray(pop_id_vs_color.get(pop_id, default_color)).rgba[0]
+
+        all_positions.append(pop_positions)
+        all_sizes.append(numpy.full(len(pop_positions), size, dtype=numpy.float32))
+        all_colors.append(numpy.tile(color, (len(pop_positions), 1)))
+
+    if len(all_positions) == 0:
+        return (
+            numpy.zeros((0, 3), dtype=numpy.float32),
+            numpy.zeros(0, dtype=numpy.float32),
+            numpy.zeros((0, 4), dtype=numpy.float32),
+        )
+    return (
+        numpy.concatenate(all_positions),
+        numpy.concatenate(all_sizes),
+        numpy.concatenate(all_colors),
+    )
+
+
+def _load_meshes_progressively(
+    meshdata_chunks: typing.Iterator[typing.Dict[typing.Any, typing.Any]],
+    plot_type: str,
+    current_view,
+    min_width: float,
+    preview=None,
+    frame_budget: float = LOAD_FRAME_BUDGET,
+):
+    """Create instanced meshes from chunks of mesh data between frames.
+
+    A timer loads chunks of mesh data and creates their instanced meshes
+    until the frame budget is used up, and then lets the canvas draw. Once
+    all chunks are loaded, the meshes of each template mesh are merged into
+    one instanced mesh, so that the scene is drawn with as few visuals as
+    when it is not loaded progressively, and the points are merged into one
+    markers visual. The preview visual, if any, is then removed.
+
+    :param meshdata_chunks: generator of mesh data, see
+        :py:func:`_get_meshdata_chunks`
+    :type meshdata_chunks: generator(dict)
+    :param plot_type: type of plot
+    :type plot_type: str
+    :param current_view: vispy viewbox to use
+    :type current_view: ViewBox
+    :param min_width: minimum width of tubes
+    :type min_width: float
+    :param preview: visual to remove once all meshes are loaded
+    :type preview: vispy visual
+    :param frame_budget: time in seconds to spend loading between frames
+    :type frame_budget: float
+    :returns: running timer that loads the meshes
+    :rtype: vispy.app.Timer
+    """
+    # key: (template mesh, [instanced meshes])
+    key_vs_meshes = {}  # type: typing.Dict[typing.Any, typing.Tuple[typing.Any, typing.List[typing.Any]]]
+    meshes_to_merge = None  # type: typing.Optional[typing.Iterator[typing.Any]]
+    # [(positions, sizes, colors)], [markers visuals]
+    point_data = []  # type: typing.List[typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]]
+    point_markers = []  # type: typing.List[typing.Any]
+    num_chunks = 0
+
+    def load_next(event):
+        nonlocal meshes_to_merge, num_chunks
+        start = time.perf_counter()
+        # at least one step is taken for each frame
+        while True:
+            if meshes_to_merge is None:
+                try:
+                    chunk = next(meshdata_chunks)
+                except StopIteration:
+                    logger.debug(f"Loaded {num_chunks} chunks, merging meshes")
+                    meshes_to_merge = iter(list(key_vs_meshes.values()))
+                    continue
+
+                num_chunks += 1
+                points = _get_point_data(chunk, plot_type, min_width)
+                if len(points[0]) > 0:
+                    point_data.append(points)
+                    point_markers.append(_create_markers(*points, current_view.scene))
+                for key, instances in chunk.items():
+                    (
+                        seg_mesh,
+                        instance_positions,
+                        instance_transforms,
+                        instance_colors,
+                    ) = _get_mesh_instances(key, instances, plot_type, min_width)
+                    mesh = InstancedMesh(
+                        meshdata=seg_mesh,
+                        instance_positions=instance_positions,
+                        instance_transforms=instance_transforms,
+                        instance_colors=instance_colors,
+                        parent=current_view.scene,
+                    )
+                    try:
+                        key_vs_meshes[key][1].append(mesh)
+                    except KeyError:
+                        key_vs_meshes[key] = (seg_mesh, [mesh])
+            else:
+                try:
+                    seg_mesh, meshes = next(meshes_to_merge)
+                except StopIteration:
+                    timer.stop()
+                    if len(point_markers) > 1:
+                        _create_markers(
+                            *(numpy.concatenate(arrays) for arrays in zip(*point_data)),
+                            current_view.scene,
+                        )
+                        for markers in point_markers:
+                            markers.parent = None
+                    if preview is not None:
+                        preview.parent = None
+                    logger.info("Finished loading meshes")
+                    break
+
+                if len(meshes) > 1:
+                    InstancedMesh(
+                        meshdata=seg_mesh,
+                        instance_positions=numpy.concatenate(
+                            [mesh.instance_positions for mesh in meshes]
+                        ),
+                        instance_transforms=numpy.concatenate(
+                            [mesh.instance_transforms for mesh in meshes]
+                        ),
+                        instance_colors=numpy.concatenate(
+                            [mesh.instance_colors.rgba for mesh in meshes]
+                        ),
+                        parent=current_view.scene,
+                    )
+                    for mesh in meshes:
+                        mesh.parent = None
+
+            if time.perf_counter() - start >= frame_budget:
+                break
+
+        current_view.canvas.update()
+
+    timer = app.Timer(interval=0.0, connect=load_next, start=True)
+    # stop loading if the canvas is closed, this also keeps a reference to
+    # the timer for as long as the canvas exists
+    current_view.canvas.events.close.connect(lambda event: timer.stop())
+    return timer
+
+
 def plot_3D_schematic(
     cell: Cell,
     segment_groups: typing.Optional[typing.List[SegmentGroup]],
@@ -1304,7 +2008,7 @@ def plot_3D_schematic(
         segment_groups, check_parentage=False
     )
 
-    if current_canvas is None or current_view is None:
+    if (current_canvas is None or current_view is None) and not nogui:
         view_min, view_max = get_cell_bound_box(cell)
         current_canvas, current_view = create_new_vispy_canvas(
             view_min,
@@ -1342,8 +2046,8 @@ def plot_3D_schematic(
         )
 
         key = (
-            f"{round(first_prox.diameter/2, mesh_precision):.{mesh_precision}f}",
-            f"{round(last_dist.diameter/2, mesh_precision):.{mesh_precision}f}",
+            f"{round(first_prox.diameter / 2, mesh_precision):.{mesh_precision}f}",
+            f"{round(last_dist.diameter / 2, mesh_precision):.{mesh_precision}f}",
             f"{round(length, mesh_precision):.{mesh_precision}f}",
         )
 
@@ -1407,7 +2111,7 @@ def create_cylindrical_mesh(
 
     # compute theta values
     th = numpy.linspace(2 * numpy.pi, 0, cols).reshape(1, cols)
-    logger.debug(f"Thetas are: {th}")
+    logger.debug("Thetas are: %s", th)
 
     # radius as a function of z
     r = numpy.linspace(radius[0], radius[1], num=rows + 1, endpoint=True).reshape(
@@ -1425,14 +2129,14 @@ def create_cylindrical_mesh(
     # add extra points for center of two circular planes that form the caps
     if closed is True:
         verts = numpy.append(verts, [[0.0, 0.0, 0.0], [0.0, 0.0, 1.0]], axis=0)
-    logger.debug(f"Verts are: {verts}")
+    logger.debug("Verts are: %s", verts)
 
     # compute faces
     faces = numpy.empty((rows * cols * 2, 3), dtype=numpy.uint32)
     rowtemplate1 = (
         (numpy.arange(cols).reshape(cols, 1) + numpy.array([[0, 1, 0]])) % cols
     ) + numpy.array([[0, 0, cols]])
-    logger.debug(f"Template1 is: {rowtemplate1}")
+    logger.debug("Template1 is: %s", rowtemplate1)
 
     rowtemplate2 = (
         (numpy.arange(cols).reshape(cols, 1) + numpy.array([[0, 1, 1]])) % cols
@@ -1451,12 +2155,12 @@ def create_cylindrical_mesh(
         cap2 = (numpy.arange(cols).reshape(cols, 1) + numpy.array([[0, 0, 1]])) % cols
         cap2[..., 0] = len(verts) - 1
 
-        logger.debug(f"cap1 is {cap1}")
-        logger.debug(f"cap2 is {cap2}")
+        logger.debug("cap1 is %s", cap1)
+        logger.debug("cap2 is %s", cap2)
 
         faces = numpy.append(faces, cap1, axis=0)
         faces = numpy.append(faces, cap2, axis=0)
 
-    logger.debug(f"Faces are: {faces}")
+    logger.debug("Faces are: %s", faces)
 
     return MeshData(vertices=verts, faces=faces)
@@ -17,6 +17,8 @@ from typing import Dict, List, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.colors import to_rgb
+from matplotlib.patches import Patch
 
 import pyneuroml.lems as pynmll
 from pyneuroml.plot import generate_plot
@@ -43,6 +45,7 @@ SPIKE_PLOTTER_DEFAULTS = {
     "rate_bins": 500,
     "show_plots_already": True,
     "offset": True,
+    "density_threshold": 1000000,
 }
 
 POP_NAME_SPIKEFILE_WITH_GIDS = "Spiketimes for GIDs"
@@ -80,6 +83,7 @@ def _process_spike_plotter_args() -> argparse.Namespace:
         - {FORMAT_ID_TIME_NEST_DAT}: id of cell, space(s) / tab(s), time of spike, allowing NEST dat file comments/metadata
         - {FORMAT_T_ID}: time of spike, space(s) / tab(s), id of cell
         - sonata: SONATA format HDF5 file containing spike times
+        - spikestore: HDF5 spike store (see pyneuroml.analysis.spikestore)
 
         """),
     )
@@ -129,6 +133,17 @@ def _process_spike_plotter_args() -> argparse.Namespace:
         help="Number of bins for rate histogram",
     )
 
+    parser.add_argument(
+        "-densityThreshold",
+        type=int,
+        metavar="<density threshold>",
+        default=SPIKE_PLOTTER_DEFAULTS["density_threshold"],
+        help=(
+            "Number of spikes above which a density raster is drawn\n"
+            "instead of individual spike markers"
+        ),
+    )
+
     return parser.parse_args()
 
 
@@ -207,8 +222,171 @@ def read_sonata_spikes_hdf5_file(file_name: str) -> dict:
     return ids_times_pops
 
 
+def _bin_spikes_2d(
+    times: np.ndarray,
+    ids: np.ndarray,
+    time_range: Tuple[float, float],
+    id_range: Tuple[int, int],
+    shape: Tuple[int, int],
+) -> np.ndarray:
+    """Bin spikes into a (cell, time) count image.
+
+    Since the bins are uniform, the bin of each spike is computed directly
+    and the counts are accumulated using :code:`np.bincount`, which is
+    linear in the number of spikes.
+
+    :param times: spike times
+    :type times: numpy.ndarray
+    :param ids: cell ids corresponding to each spike time
+    :type ids: numpy.ndarray
+    :param time_range: (start, end) of time axis
+    :type time_range: tuple(float, float)
+    :param id_range: (min, max) cell id, both inclusive
+    :type id_range: tuple(int, int)
+    :param shape: number of (cell, time) bins
+    :type shape: tuple(int, int)
+    :returns: array of spike counts with shape `shape`
+    :rtype: numpy.ndarray
+    """
+    n_rows, n_cols = shape
+    t_start, t_end = time_range
+    if t_end <= t_start:
+        t_end = t_start + 1.0
+    id_min, id_max = id_range
+
+    cols = np.floor((times - t_start) * (n_cols / (t_end - t_start))).astype(np.intp)
+    rows = np.floor((ids - id_min) * (n_rows / (id_max - id_min + 1))).astype(np.intp)
+    valid = (cols >= 0) & (cols < n_cols) & (rows >= 0) & (rows < n_rows)
+
+    counts = np.bincount(rows[valid] * n_cols + cols[valid], minlength=n_rows * n_cols)
+    return counts.reshape(n_rows, n_cols)
+
+
+def _plot_spike_density_raster(
+    xs: List[np.ndarray],
+    ys: List[np.ndarray],
+    title: str,
+    labels: List[str],
+    colors: Optional[List[str]],
+    xlim: List[float],
+    id_range: Tuple[int, int],
+    max_image_size: Optional[Tuple[int, int]] = None,
+    save_spike_plot_to: Optional[str] = None,
+) -> None:
+    """Plot spikes as a density image instead of individual markers.
+
+    The number of bins is set to the pixel size of the axes, so the image
+    has the same resolution as the figure. Counts are log scaled so that
+    single spikes remain visible next to dense regions.
+
+    :param xs: list of spike time arrays, one per population
+    :type xs: list of numpy.ndarray
+    :param ys: list of (offset) cell id arrays, one per population
+    :type ys: list of numpy.ndarray
+    :param title: title of plot
+    :type title: str
+    :param labels: labels for each population
+    :type labels: list of str
+    :param colors: colours for each population, or None to draw all spikes
+        in grey scale
+    :type colors: list of str or None
+    :param xlim: limits of the time axis
+    :type xlim: [float, float]
+    :param id_range: (min, max) cell ids to show, both inclusive
+    :type id_range: tuple(int, int)
+    :param max_image_size: size of the figure in pixels (width, height)
+    :type max_image_size: tuple(int, int)
+    :param save_spike_plot_to: path to save the plot to
+    :type save_spike_plot_to: str
+    :returns: None
+    """
+    if max_image_size is not None:
+        fig = plt.figure(figsize=(max_image_size[0] / 100, max_image_size[1] / 100))
+    else:
+        fig = plt.figure()
+    ax = fig.add_subplot(111)
+
+    fig_manager = plt.get_current_fig_manager()
+    if fig_manager:
+        fig_manager.set_window_title(title)
+
+    bbox = ax.get_window_extent()
+    num_cells = int(id_range[1] - id_range[0] + 1)
+    shape = (max(min(int(bbox.height), num_cells), 1), max(int(bbox.width), 1))
+    logger.debug(f"Density raster bins (cells, times): {shape}")
+
+    extent = (xlim[0], xlim[1], id_range[0] - 0.5, id_range[1] + 0.5)
+    time_range = (xlim[0], xlim[1])
+
+    if colors is None:
+        counts = np.zeros(shape)
+        for x, y in zip(xs, ys):
+            counts += _bin_spikes_2d(x, y, time_range, id_range, shape)
+        max_count = counts.max()
+        intensity = np.log1p(counts) / np.log1p(max_count) if max_count > 0 else counts
+        ax.imshow(
+            intensity,
+            cmap="Greys",
+            vmin=0,
+            vmax=1,
+            origin="lower",
+            aspect="auto",
+            interpolation="nearest",
+            extent=extent,
+        )
+    else:
+        intensities = []
+        for x, y in zip(xs, ys):
+            counts = _bin_spikes_2d(x, y, time_range, id_range, shape)
+            max_count = counts.max()
+            intensities.append(
+                np.log1p(counts) / np.log1p(max_count) if max_count > 0 else counts
+            )
+        intensities_arr = np.stack(intensities)
+        rgb_colors = np.array([to_rgb(c) for c in colors])
+
+        # colour of each pixel: mix of population colours weighted by their
+        # intensities there
+        total = intensities_arr.sum(axis=0)
+        image = np.zeros(shape + (4,))
+        image[..., :3] = np.einsum("pij,pc->ijc", intensities_arr, rgb_colors)
+        nonzero = total > 0
+        image[nonzero, :3] /= total[nonzero, np.newaxis]
+        image[..., 3] = np.clip(total, 0, 1)
+
+        ax.imshow(
+            image,
+            origin="lower",
+            aspect="auto",
+            interpolation="nearest",
+            extent=extent,
+        )
+        ax.legend(
+            handles=[Patch(color=c, label=label) for c, label in zip(colors, labels)],
+            loc="upper center",
+            # below the axis label
+            bbox_to_anchor=(0.5, -0.1),
+            fancybox=True,
+            shadow=True,
+            ncol=3,
+        )
+
+    ax.set_xlim(xlim)
+    ax.set_ylim(id_range[0] - 1, id_range[1] + 1)
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("Cell index")
+
+    if save_spike_plot_to:
+        logger.info(
+            "Saving image to %s of plot: %s"
+            % (os.path.abspath(save_spike_plot_to), title)
+        )
+        plt.savefig(save_spike_plot_to, bbox_inches="tight")
+        logger.info("Saved image to %s of plot: %s" % (save_spike_plot_to, title))
+
+
 def plot_spikes(
-    spike_data: List[Dict[str, Union[List[float], List[int]]]],
+    spike_data: List[Dict[str, Union[str, List[float], List[int], np.ndarray]]],
     title: str = "",
     offset: bool = True,
     show_plots_already: bool = True,
@@ -217,9 +395,23 @@ def plot_spikes(
     rate_window: int = 50,
     rate_bins: int = 500,
     max_image_size: Optional[Tuple[int, int]] = None,
+    density_threshold: Optional[int] = SPIKE_PLOTTER_DEFAULTS["density_threshold"],
+    colors: Optional[List[str]] = None,
 ) -> None:
     """Plot spike times from data.
 
+    For large numbers of spikes, drawing each spike as an individual marker
+    becomes very slow. So, when the total number of spikes is greater than
+    `density_threshold`, the spikes are instead binned into a time × cell
+    image at the resolution of the figure, which is drawn using
+    :code:`imshow`. The time taken to render this does not depend on the
+    number of spikes.
+
+    .. versionadded:: 1.3.9
+
+        - density_threshold
+        - colors
+
     :param spike_data: List of dictionaries containing spike time data. Each dictionary should have the following keys:
                         - "name" (str): Name of the population or file.
                         - "times" (List[float]): List of spike times in seconds.
@@ -240,9 +432,26 @@ def plot_spikes(
     :type rate_window: int
     :param rate_bins: Number of bins for rate histogram. Defaults to 500.
     :type rate_bins: int
+    :param max_image_size: size of the figure in pixels (width, height)
+    :type max_image_size: tuple(int, int)
+    :param density_threshold: total number of spikes above which a density
+        raster is drawn instead of individual spike markers. Use `None` to
+        always draw individual markers, and `0` to always draw a density
+        raster. Defaults to 1000000.
+    :type density_threshold: int or None
+    :param colors: optional list of colours, one for each entry in
+        `spike_data`. In density raster mode, if colours are not provided, a
+        single grey scale image of all spikes is drawn.
+    :type colors: list of str
     :return: None
     :rtype: None
+    :raises ValueError: if the number of colours does not match the number
+        of entries in `spike_data`
     """
+    if colors is not None and len(colors) != len(spike_data):
+        raise ValueError(
+            f"spike_data ({len(spike_data)}) and colors ({len(colors)}) must have the same length"
+        )
 
     xs = []
     ys = []
@@ -253,10 +462,10 @@ def plot_spikes(
     max_time = 0.0
     max_id = 0
     min_id = float("inf")
-    unique_ids = []  # type: List[int]
-    for data in spike_data:
-        unique_ids.extend(data["ids"])
-    unique_ids = list(set(unique_ids))
+    num_spikes = 0
+    unique_ids = np.unique(
+        np.concatenate([np.asarray(data["ids"], dtype=int) for data in spike_data])
+    )
 
     times = OrderedDict()
     ids_in_file = OrderedDict()
@@ -265,18 +474,17 @@ def plot_spikes(
 
     for data in spike_data:
         name = data["name"]  # type: str
-        x = data["times"]
-        y = [int(id_ + current_offset) for id_ in data["ids"]]
+        x = np.asarray(data["times"], dtype=float)
+        y = np.asarray(data["ids"], dtype=int) + current_offset
 
         times[name] = x
-
-        # create a copy otherwise the sort action below sorts y also!
-        ids_in_file[name] = y.copy()
-        max_id_here = max(y)
-
-        max_time = max(max_time, max(x))
-        max_id = max(max_id, max_id_here)
-        min_id = min(min_id, min(y))
+        ids_in_file[name] = y
+        # populations may have no spikes, for example in a time window
+        if len(x) > 0:
+            max_time = max(max_time, x.max())
+            max_id = max(max_id, y.max())
+            min_id = min(min_id, y.min())
+        num_spikes += len(x)
 
         # only show population name: since we cannot ascertain the number of
         # cells in the population simply from the data
@@ -290,79 +498,88 @@ def plot_spikes(
         if offset is True:
             current_offset = max_id + 1
             logger.debug(f"offset is now {current_offset}")
-        ids_in_file[name].sort()
 
+    if num_spikes == 0:
+        min_id = 0
     xlim = [0, max_time * 1.05]
     ylim = [min_id - 1, max_id + 1]
 
-    markersizes = [
-        "3" if len(unique_ids) <= 50 else "2" if len(unique_ids) <= 200 else "1"
-        for _ in xs
-    ]
-    if max_image_size is not None:
-        plt.figure(figsize=(max_image_size[0] / 100, max_image_size[1] / 100))
-
-    # do not show plot here, generate all plots and show at end
-    generate_plot(
-        xs,
-        ys,
-        title=title,
-        labels=labels,
-        linestyles=linestyles,
-        markers=markers,
-        xaxis="Time (s)",
-        yaxis="Cell index",
-        xlim=xlim,
-        ylim=ylim,
-        markersizes=markersizes,
-        grid=False,
-        show_plot_already=False,
-        save_figure_to=save_spike_plot_to,
-        legend_position="bottom center",
-    )
+    if density_threshold is not None and num_spikes > density_threshold:
+        logger.info(
+            f"Plotting density raster of {num_spikes} spikes (threshold: {density_threshold})"
+        )
+        _plot_spike_density_raster(
+            xs,
+            ys,
+            title=title,
+            labels=labels,
+            colors=colors,
+            xlim=xlim,
+            id_range=(min_id, max_id),
+            max_image_size=max_image_size,
+            save_spike_plot_to=save_spike_plot_to,
+        )
+    else:
+        markersizes = [
+            "3" if len(unique_ids) <= 50 else "2" if len(unique_ids) <= 200 else "1"
+            for _ in xs
+        ]
+        if max_image_size is not None:
+            plt.figure(figsize=(max_image_size[0] / 100, max_image_size[1] / 100))
+
+        # do not show plot here, generate all plots and show at end
+        generate_plot(
+            xs,
+            ys,
+            title=title,
+            labels=labels,
+            colors=colors,
+            linestyles=linestyles,
+            markers=markers,
+            xaxis="Time (s)",
+            yaxis="Cell index",
+            xlim=xlim,
+            ylim=ylim,
+            markersizes=markersizes,
+            grid=False,
+            show_plot_already=False,
+            save_figure_to=save_spike_plot_to,
+            legend_position="bottom center",
+        )
 
     if rates:
-        plt.figure()
-        bins = rate_bins
-        for name in times:
-            tt = times[name]
-            ids_here = len(ids_in_file[name])
-
-            plt.hist(
-                tt,
-                bins=bins,
-                histtype="step",
-                weights=[bins * max(tt) / (float(ids_here))] * len(tt),
-                label=name + "_h",
-            )
-            hist, bin_edges = np.histogram(
-                tt, bins=bins, weights=[bins * max(tt) / (float(ids_here))] * len(tt)
-            )
-
-        plt.figure()
+        # imported here to avoid a circular import: pyneuroml.analysis uses
+        # pyneuroml.plot
+        from pyneuroml.analysis.spikes import population_rate, smooth_rate
 
+        bin_size = max_time / rate_bins if max_time > 0 else 1.0
+        pop_rates = OrderedDict()
         for name in times:
-            tt = times[name]
-            ids_here = len(ids_in_file[name])
-
-            hist, bin_edges = np.histogram(
-                tt, bins=bins, weights=[bins * max(tt) / (float(ids_here))] * len(tt)
+            num_cells = len(np.unique(ids_in_file[name]))
+            pop_rates[name] = population_rate(
+                times[name],
+                num_cells=num_cells,
+                t_start=0.0,
+                t_stop=max_time,
+                num_bins=rate_bins,
             )
 
-            # width = bin_edges[1] - bin_edges[0]
-            # mids = [i + width / 2 for i in bin_edges[:-1]]
-
-            boxes = [int(rate_window)]
-            for b in boxes:
-                box = np.ones(b)
-
-                hist_c = np.convolve(hist / len(box), box)
-
-                ys = hist_c
-                xs = [i / (float(len(ys))) for i in range(len(ys))]
-                plt.plot(xs, ys, label=name + "_%i_c" % b)
+        plt.figure()
+        for name, (centres, rate) in pop_rates.items():
+            plt.step(centres, rate, where="mid", label=name + "_h")
+        plt.xlabel("Time (s)")
+        plt.ylabel("Rate per cell")
+        plt.legend()
 
+        plt.figure()
+        for name, (centres, rate) in pop_rates.items():
+            # rate_window is the number of bins in the smoothing window
+            smoothed = smooth_rate(rate, bin_size, "box", rate_window * bin_size)
+            plt.plot(centres, smoothed, label=name + "_%i_c" % rate_window)
+        plt.xlabel("Time (s)")
+        plt.ylabel("Rate per cell")
         plt.legend()
+
     if show_plots_already:
         plt.show()
     else:
@@ -378,6 +595,7 @@ def plot_spikes_from_data_files(
     rate_window: int = 50,
     rate_bins: int = 500,
     title: str = "",
+    density_threshold: Optional[int] = SPIKE_PLOTTER_DEFAULTS["density_threshold"],
 ) -> None:
     """
     Plot spike times from data files.
@@ -395,6 +613,8 @@ def plot_spikes_from_data_files(
           with NEST-style comments allowed.
         - :code:`t_id`: Each line contains a spike time (float) followed by a cell ID (int).
         - :code:`sonata`: SONATA-style HDF5 file.
+        - :code:`spikestore`: HDF5 spike store, see
+          :py:class:`pyneuroml.analysis.spikestore.SpikeStore`
 
     :type format_: str
     :param show_plots_already: Whether to show the plots immediately after they are generated. Defaults to True.
@@ -407,6 +627,10 @@ def plot_spikes_from_data_files(
     :type rate_window: int
     :param rate_bins: Number of bins for rate histogram. Defaults to 500.
     :type rate_bins: int
+    :param density_threshold: total number of spikes above which a density
+        raster is drawn instead of individual spike markers, see
+        :py:func:`plot_spikes`
+    :type density_threshold: int or None
     :return: None
     :rtype: None
     """
@@ -425,6 +649,10 @@ def plot_spikes_from_data_files(
                     {"name": f"{pop} ({file_name})", "times": times, "ids": ids}
                 )
 
+    elif format_ == "spikestore":
+        for file_name in spiketime_files:
+            spike_data.extend(load_spike_data_from_spike_store(file_name))
+
     else:
         for file_name in spiketime_files:
             logger.info("Loading spike times from: %s" % file_name)
@@ -445,9 +673,7 @@ def plot_spikes_from_data_files(
             else:
                 logger.error("Unknown format: %s" % format_)
                 raise ValueError("Unknown format: %s" % format_)
-            spike_data.append(
-                {"name": name, "times": times.tolist(), "ids": ids.tolist()}
-            )
+            spike_data.append({"name": name, "times": times, "ids": ids})
 
     plot_spikes(
         title=title,
@@ -458,9 +684,49 @@ def plot_spikes_from_data_files(
         rate_window=rate_window,
         rate_bins=rate_bins,
         offset=True,
+        density_threshold=density_threshold,
     )
 
 
+def load_spike_data_from_spike_store(
+    store_file_name: str,
+    populations: Optional[List[str]] = None,
+    t_start: Optional[float] = None,
+    t_stop: Optional[float] = None,
+) -> List[Dict]:
+    """Load spike data for plotting from a spike store.
+
+    Only the spikes in the given time window are read from the store.
+
+    .. versionadded:: 1.3.9
+
+    :param store_file_name: name of HDF5 spike store file
+    :type store_file_name: str
+    :param populations: populations to load, defaults to all
+    :type populations: list(str)
+    :param t_start: start of time window (inclusive), defaults to the start
+    :type t_start: float
+    :param t_stop: end of time window (exclusive), defaults to the end
+    :type t_stop: float
+    :returns: list of spike data dictionaries, as used by
+        :py:func:`plot_spikes`
+    :rtype: list(dict)
+    """
+    # imported here to avoid a circular import: pyneuroml.analysis imports
+    # pyneuroml.plot
+    from pyneuroml.analysis.spikestore import SpikeStore
+
+    logger.info(f"Loading spike times from spike store: {store_file_name}")
+    spike_data = []
+    with SpikeStore(store_file_name) as store:
+        if populations is None:
+            populations = store.get_populations()
+        for pop in populations:
+            ids, times = store.get_spikes_in_window(pop, t_start, t_stop)
+            spike_data.append({"name": pop, "times": times, "ids": ids})
+    return spike_data
+
+
 def plot_spikes_from_lems_file(
     lems_file_name: str,
     base_dir: str = ".",
@@ -469,6 +735,7 @@ def plot_spikes_from_lems_file(
     rates: bool = False,
     rate_window: int = 50,
     rate_bins: int = 500,
+    density_threshold: Optional[int] = SPIKE_PLOTTER_DEFAULTS["density_threshold"],
 ) -> None:
     """
     Plot spike times from a LEMS simulation file.
@@ -490,6 +757,10 @@ def plot_spikes_from_lems_file(
     :type rate_window: int
     :param rate_bins: Number of bins for rate histogram. Defaults to 500.
     :type rate_bins: int
+    :param density_threshold: total number of spikes above which a density
+        raster is drawn instead of individual spike markers, see
+        :py:func:`plot_spikes`
+    :type density_threshold: int or None
     :return: None
     :rtype: None
     """
@@ -517,6 +788,7 @@ def plot_spikes_from_lems_file(
         rates=rates,
         rate_window=rate_window,
         rate_bins=rate_bins,
+        density_threshold=density_threshold,
     )
 
 
@@ -542,6 +814,7 @@ def main(args: Optional[argparse.Namespace] = None) -> None:
             rates=a.rates,
             rate_window=a.rate_window,
             rate_bins=a.rate_bins,
+            density_threshold=a.density_threshold,
         )
     else:
         title = ""
@@ -557,6 +830,7 @@ def main(args: Optional[argparse.Namespace] = None) -> None:
             rate_window=a.rate_window,
             rate_bins=a.rate_bins,
             title=title,
+            density_threshold=a.density_threshold,
         )
 
 
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of morphology thumbnails.
+
+File: pyneuroml/plot/PlotThumbnails.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import typing
+
+from PIL import Image
+
+import pyneuroml
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+# standard thumbnail sizes: largest dimension in pixels
+THUMBNAIL_SIZES = {"small": 64, "medium": 128, "large": 256}
+
+# default maximum total size of the thumbnails in a cache, in bytes
+THUMBNAIL_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _get_default_cache_dir() -> str:
+    """Get the default directory for the thumbnail cache.
+
+    This is :code:`pyneuroml/thumbnails` in :code:`$XDG_CACHE_HOME`, or
+    in :code:`~/.cache` if it is not set.
+
+    :returns: path of directory
+    :rtype: str
+    """
+    cache_home = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(cache_home, "pyneuroml", "thumbnails")
+
+
+def _hash_file_and_includes(
+    file_name: str, file_hash: "hashlib._Hash", visited: typing.Set[str]
+) -> None:
+    """Add the contents of a NeuroML file and its includes to a hash.
+
+    Included files are found from the :code:`href` attributes of
+    :code:`include` elements, relative to the including file, and hashed
+    recursively. Included files that do not exist are skipped, as for
+    standard NeuroML files that are not present locally.
+
+    :param file_name: path of file
+    :type file_name: str
+    :param file_hash: hash object to update
+    :type file_hash: hashlib hash object
+    :param visited: absolute paths of files already hashed, updated in place
+    :type visited: set(str)
+    """
+    file_name = os.path.abspath(file_name)
+    if file_name in visited:
+        return
+    visited.add(file_name)
+
+    with open(file_name, "rb") as f:
+        contents = f.read()
+    file_hash.update(contents)
+
+    base_dir = os.path.dirname(file_name)
+    for include in re.findall(rb"<include\s+href\s*=\s*[\"']([^\"']+)[\"']", contents):
+        include_file = os.path.join(base_dir, include.decode())
+        if os.path.isfile(include_file):
+            _hash_file_and_includes(include_file, file_hash, visited)
+        else:
+            logger.debug(f"Included file {include_file} not found, not hashed")
+
+
+class ThumbnailCache(object):
+    """Persistent cache of 2D morphology thumbnails.
+
+    Thumbnails are rendered with :py:func:`pyneuroml.plot.PlotMorphology.plot_2D`
+    and stored as PNG files at each of the standard sizes in
+    :py:data:`THUMBNAIL_SIZES`. They are keyed by the contents of the NeuroML
+    file and all the files it includes, the plotting options, and the
+    pyNeuroML version, so they are regenerated when any of these change.
+
+    The cache is a directory of files, so it can be shared by several
+    processes: files are written atomically. When the total size of the
+    thumbnails exceeds the limit, the least recently used ones are removed.
+
+    .. code-block:: python
+
+        cache = ThumbnailCache()
+        png = cache.get_thumbnail("cell.nml", size="small", plot_type="constant")
+
+    .. versionadded:: 1.3.9
+
+    :param cache_dir: directory to store thumbnails in, defaults to
+        :code:`pyneuroml/thumbnails` in the user's cache directory
+    :type cache_dir: str
+    :param max_bytes: maximum total size of thumbnails in bytes
+    :type max_bytes: int
+    """
+
+    def __init__(
+        self,
+        cache_dir: typing.Optional[str] = None,
+        max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES,
+    ):
+        """Initialise the cache, creating its directory if required."""
+        self.cache_dir = (
+            cache_dir if cache_dir is not None else _get_default_cache_dir()
+        )
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, nml_file: str, **plot_options: typing.Any) -> str:
+        """Get the cache key for a NeuroML file and plotting options.
+
+        :param nml_file: path to NeuroML file
+        :type nml_file: str
+        :param plot_options: options passed to
+            :py:func:`pyneuroml.plot.PlotMorphology.plot_2D`
+        :returns: hexadecimal key
+        :rtype: str
+        """
+        file_hash = hashlib.sha256()
+        _hash_file_and_includes(nml_file, file_hash, set())
+        file_hash.update(
+            json.dumps(
+                {"options": plot_options, "version": pyneuroml.__version__},
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+        return file_hash.hexdigest()
+
+    def _get_file_name(self, key: str, size: str) -> str:
+        """Get the file name of a thumbnail.
+
+        :param key: cache key
+        :type key: str
+        :param size: name of size
+        :type size: str
+        :returns: path of thumbnail file
+        :rtype: str
+        """
+        return os.path.join(self.cache_dir, f"{key}_{size}.png")
+
+    def get_thumbnail(
+        self, nml_file: str, size: str = "medium", **plot_options: typing.Any
+    ) -> str:
+        """Get a thumbnail of a NeuroML file, rendering it if not cached.
+
+        :param nml_file: path to NeuroML file
+        :type nml_file: str
+        :param size: one of the sizes in :py:data:`THUMBNAIL_SIZES`
+        :type size: str
+        :param plot_options: other options passed to
+            :py:func:`pyneuroml.plot.PlotMorphology.plot_2D`, for example
+            :code:`plane2d` or :code:`plot_type`
+        :returns: path of thumbnail PNG file
+        :rtype: str
+        :raises ValueError: if the size is not a standard size
+        """
+        if size not in THUMBNAIL_SIZES:
+            raise ValueError(
+                f"Unknown thumbnail size {size}: use one of {list(THUMBNAIL_SIZES.keys())}"
+            )
+
+        key = self.get_key(nml_file, **plot_options)
+        file_name = self._get_file_name(key, size)
+        try:
+            # mark as recently used
+            os.utime(file_name)
+            logger.debug(f"Using cached thumbnail {file_name} for {nml_file}")
+            return file_name
+        except FileNotFoundError:
+            pass
+
+        self._render(nml_file, key, **plot_options)
+        self.evict(keep_key=key)
+        return file_name
+
+    def _render(self, nml_file: str, key: str, **plot_options: typing.Any) -> None:
+        """Render the thumbnails of a NeuroML file at all standard sizes.
+
+        :param nml_file: path to NeuroML file
+        :type nml_file: str
+        :param key: cache key
+        :type key: str
+        :param plot_options: other options passed to
+            :py:func:`pyneuroml.plot.PlotMorphology.plot_2D`
+        """
+        # imported here so that the cache can be used without loading the
+        # plotting modules when thumbnails are cached
+        from pyneuroml.plot.PlotMorphology import plot_2D
+
+        logger.info(f"Rendering thumbnails for {nml_file}")
+        fd, image_file = tempfile.mkstemp(suffix=".png", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            plot_2D(
+                nml_file,
+                nogui=True,
+                save_to_file=image_file,
+                close_plot=True,
+                **plot_options,
+            )
+            with Image.open(image_file) as image:
+                image.load()
+                for size, pixels in THUMBNAIL_SIZES.items():
+                    thumbnail = image.copy()
+                    thumbnail.thumbnail((pixels, pixels))
+                    fd, thumbnail_file = tempfile.mkstemp(
+                        suffix=".png", dir=self.cache_dir
+                    )
+                    with os.fdopen(fd, "wb") as f:
+                        thumbnail.save(f, format="PNG")
+                    # atomic, so other processes never see partial files
+                    os.replace(thumbnail_file, self._get_file_name(key, size))
+        finally:
+            os.remove(image_file)
+
+    def _get_thumbnail_files(self) -> typing.List[os.DirEntry]:
+        """Get the thumbnail files in the cache.
+
+        :returns: list of directory entries
+        :rtype: list(os.DirEntry)
+        """
+        with os.scandir(self.cache_dir) as entries:
+            return [
+                entry
+                for entry in entries
+                if entry.is_file()
+                and entry.name.endswith(".png")
+                and not entry.name.startswith("tmp")
+            ]
+
+    def get_size(self) -> int:
+        """Get the total size of the thumbnails in the cache.
+
+        :returns: size in bytes
+        :rtype: int
+        """
+        return sum(entry.stat().st_size for entry in self._get_thumbnail_files())
+
+    def evict(self, keep_key: typing.Optional[str] = None) -> None:
+        """Remove the least recently used thumbnails until the cache fits.
+
+        Thumbnails that other processes have already removed are skipped.
+
+        :param keep_key: key of thumbnails that are never removed, for
+            example ones that have just been rendered. These still count
+            towards the size of the cache, so it may not fit afterwards.
+        :type keep_key: str
+        """
+        entries = []
+        total = 0
+        for entry in self._get_thumbnail_files():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            total += stat.st_size
+            if keep_key is not None and entry.name.startswith(f"{keep_key}_"):
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        if total <= self.max_bytes:
+            return
+
+        for _, file_size, path in sorted(entries):
+            try:
+                os.remove(path)
+                logger.debug(f"Evicted thumbnail {path}")
+            except FileNotFoundError:
+                pass
+            total -= file_size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """Remove all thumbnails from the cache."""
+        for entry in self._get_thumbnail_files():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def get_morphology_thumbnail(
+    nml_file: str,
+    size: str = "medium",
+    cache_dir: typing.Optional[str] = None,
+    **plot_options: typing.Any,
+) -> str:
+    """Get a cached 2D thumbnail of a NeuroML file.
+
+    Convenience wrapper around :py:class:`ThumbnailCache`.
+
+    .. versionadded:: 1.3.9
+
+    :param nml_file: path to NeuroML file
+    :type nml_file: str
+    :param size: one of the sizes in :py:data:`THUMBNAIL_SIZES`
+    :type size: str
+    :param cache_dir: directory of the cache, see :py:class:`ThumbnailCache`
+    :type cache_dir: str
+    :param plot_options: other options passed to
+        :py:func:`pyneuroml.plot.PlotMorphology.plot_2D`
+    :returns: path of thumbnail PNG file
+    :rtype: str
+    """
+    return ThumbnailCache(cache_dir).get_thumbnail(nml_file, size, **plot_options)
@@ -106,8 +106,8 @@ def plot_time_series(
                 if key == "t":
                     continue
 
-                max_trace = max(trace)
-                min_trace = min(trace)
+                max_trace = numpy.max(trace)
+                min_trace = numpy.min(trace)
                 if max_trace > maxy:
                     maxy = max_trace
                 if min_trace < miny:
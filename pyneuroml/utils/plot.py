@@ -15,6 +15,8 @@ import typing
 import matplotlib
 import numpy
 from matplotlib import pyplot as plt
+from matplotlib.collections import EllipseCollection, LineCollection, PolyCollection
+from matplotlib.image import AxesImage
 from matplotlib.lines import Line2D
 from matplotlib.patches import Rectangle
 from matplotlib_scalebar.scalebar import ScaleBar
@@ -38,6 +40,8 @@ DEFAULTS = {
     "pointFraction": 0,
     "upright": False,
     "showAxes": None,
+    "outputDir": ".",
+    "workers": None,
 }  # type: dict[str, typing.Any]
 
 
@@ -106,6 +110,26 @@ def get_next_hex_color(my_random: typing.Optional[random.Random] = None) -> str:
         return "#%06x" % random.randint(0, 0xFFFFFF)
 
 
+def get_next_hex_colors(num: int) -> numpy.ndarray:
+    """Get many new randomly generated colours.
+
+    This is the vectorised equivalent of :py:func:`get_next_hex_color`, and
+    uses numpy's random generator.
+
+    .. versionadded:: 1.3.9
+
+    :param num: number of colours
+    :type num: int
+    :returns: RGBA colours, array of shape (num, 4)
+    :rtype: numpy.ndarray
+    """
+    hex_colors = numpy.random.randint(0, 0xFFFFFF + 1, num)
+    colors = numpy.ones((num, 4))
+    for i, shift in enumerate([16, 8, 0]):
+        colors[:, i] = ((hex_colors >> shift) & 0xFF) / 255
+    return colors
+
+
 def add_box_to_matplotlib_2D_plot(ax, xy, height, width, color):
     """Add a box to a matplotlib plot, at xy of `height`, `width` and `color`.
 
@@ -127,14 +151,73 @@ def add_box_to_matplotlib_2D_plot(ax, xy, height, width, color):
     )
 
 
+def add_boxes_to_matplotlib_2D_plot(
+    ax: matplotlib.axes.Axes,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    heights: typing.Union[float, numpy.ndarray],
+    widths: typing.Union[float, numpy.ndarray],
+    colors: typing.Any,
+) -> PolyCollection:
+    """Add many boxes to a matplotlib plot as a single collection
+
+    This is the vectorised equivalent of
+    :py:func:`add_box_to_matplotlib_2D_plot`, and draws the same output
+    using one artist.
+
+    .. versionadded:: 1.3.9
+
+    :param ax: matplotlib.axes.Axes object
+    :type ax: matplotlib.axes.Axes
+    :param xs: x values of bottom left corners of boxes
+    :type xs: numpy.ndarray
+    :param ys: y values of bottom left corners of boxes
+    :type ys: numpy.ndarray
+    :param heights: heights of boxes
+    :type heights: float or numpy.ndarray
+    :param widths: widths of boxes
+    :type widths: float or numpy.ndarray
+    :param colors: color, or list of colors, one for each box, for edge and
+        fill
+    :type colors: str or list
+    :returns: the added collection
+    :rtype: matplotlib.collections.PolyCollection
+    """
+    xs = numpy.asarray(xs, dtype=float)
+    ys = numpy.asarray(ys, dtype=float)
+    heights = numpy.broadcast_to(numpy.asarray(heights, dtype=float), xs.shape)
+    widths = numpy.broadcast_to(numpy.asarray(widths, dtype=float), xs.shape)
+
+    # corners in the same order as those of a Rectangle
+    verts = numpy.empty((len(xs), 4, 2))
+    verts[:, [0, 3], 0] = xs[:, numpy.newaxis]
+    verts[:, [1, 2], 0] = (xs + widths)[:, numpy.newaxis]
+    verts[:, [0, 1], 1] = ys[:, numpy.newaxis]
+    verts[:, [2, 3], 1] = (ys + heights)[:, numpy.newaxis]
+
+    colors = matplotlib.colors.to_rgba_array(colors)
+    collection = PolyCollection(
+        verts,
+        closed=True,
+        facecolors=colors,
+        edgecolors=colors,
+        linewidths=matplotlib.rcParams["patch.linewidth"],
+        joinstyle="miter",
+    )
+    ax.add_collection(collection)
+
+    return collection
+
+
 def get_new_matplotlib_morph_plot(
-    title: str = "", plane2d: str = "xy"
+    title: str = "", plane2d: typing.Any = "xy"
 ) -> typing.Tuple[matplotlib.figure.Figure, matplotlib.axes.Axes]:
     """Get a new 2D matplotlib plot for morphology related plots.
 
     :param title: title of plot
     :type title: str
-    :param plane2d: plane to use
+    :param plane2d: plane to use, or projection matrix (see
+        :py:func:`setup_matplotlib_morph_plot_axes`)
     :type plane: str
     :returns: new [matplotlib.figure.Figure, matplotlib.axes.Axes]
     :rtype: [matplotlib.figure.Figure, matplotlib.axes.Axes]
@@ -143,6 +226,29 @@ def get_new_matplotlib_morph_plot(
     plt.get_current_fig_manager().set_window_title(title)
     plt.title(title)
 
+    setup_matplotlib_morph_plot_axes(ax, plane2d)
+
+    return fig, ax
+
+
+def setup_matplotlib_morph_plot_axes(
+    ax: matplotlib.axes.Axes, plane2d: typing.Any = "xy"
+) -> None:
+    """Set up matplotlib axes for morphology related plots.
+
+    This sets equal aspect ratios, hides the top and right spines, and labels
+    the axes for the plane.
+
+    .. versionadded:: 1.3.9
+
+    :param ax: matplotlib.axes.Axes object
+    :type ax: matplotlib.axes.Axes
+    :param plane2d: plane to use, or projection matrix (see
+        :py:func:`set_matplotlib_morph_plot_axis_labels`)
+    :type plane2d: str or numpy.ndarray
+    :returns: None
+    :raises ValueError: if the plane is not valid
+    """
     ax.set_aspect("equal")
 
     ax.spines["right"].set_visible(False)
@@ -150,7 +256,48 @@ def get_new_matplotlib_morph_plot(
     ax.yaxis.set_ticks_position("left")
     ax.xaxis.set_ticks_position("bottom")
 
-    if plane2d == "xy":
+    set_matplotlib_morph_plot_axis_labels(ax, plane2d)
+
+
+def set_matplotlib_morph_plot_axis_labels(
+    ax: matplotlib.axes.Axes, plane2d: typing.Any = "xy"
+) -> None:
+    """Label the axes of a morphology related plot for a plane.
+
+    .. versionadded:: 1.3.9
+
+    :param ax: matplotlib.axes.Axes object
+    :type ax: matplotlib.axes.Axes
+    :param plane2d: plane to use (xy/yx/yz/zy/zx/xz), or a projection matrix
+        of shape (2, 3) whose rows give the coefficients of x, y, z for the
+        horizontal and vertical axes
+    :type plane2d: str or numpy.ndarray
+    :returns: None
+    :raises ValueError: if the plane is not valid
+    """
+    if not isinstance(plane2d, str):
+        projection = numpy.array(plane2d, dtype=float)
+        if projection.shape != (2, 3):
+            raise ValueError(
+                f"Projection matrix must have shape (2, 3), not {projection.shape}"
+            )
+        # e.g. "0.71x+0.71y", "-z"
+        labels = [
+            "".join(
+                (
+                    f"{coefficient:+.2g}"
+                    if abs(coefficient) != 1
+                    else f"{coefficient:+}"[0]
+                )
+                + axis
+                for coefficient, axis in zip(row, "xyz")
+                if coefficient != 0
+            ).lstrip("+")
+            for row in projection
+        ]
+        ax.set_xlabel(f"{labels[0]} (μm)")
+        ax.set_ylabel(f"{labels[1]} (μm)")
+    elif plane2d == "xy":
         ax.set_xlabel("x (μm)")
         ax.set_ylabel("y (μm)")
     elif plane2d == "yx":
@@ -171,8 +318,6 @@ def get_new_matplotlib_morph_plot(
     else:
         raise ValueError(f"Invalid value for plane: {plane2d}")
 
-    return fig, ax
-
 
 class LineDataUnits(Line2D):
     """New Line class for making lines with specific widthS
@@ -200,6 +345,31 @@ class LineDataUnits(Line2D):
     _linewidth = property(_get_lw, _set_lw)
 
 
+class LineCollectionDataUnits(LineCollection):
+    """Line collection with line widths specified in data units
+
+    This is the collection equivalent of :py:class:`LineDataUnits`: the
+    widths are converted to points using the y axis data transform each time
+    the collection is drawn, so that they scale with zooming.
+
+    .. versionadded:: 1.3.9
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._lw_data = numpy.atleast_1d(kwargs.pop("linewidths", 1))
+        super().__init__(*args, **kwargs)
+
+    def draw(self, renderer):
+        if self.axes is not None:
+            ppd = 72.0 / self.axes.figure.dpi
+            trans = self.axes.transData.transform
+            scale = ((trans((1, 1)) - trans((0, 0))) * ppd)[1]
+            # set directly rather than using set_linewidth, which would mark
+            # the figure stale and trigger another draw
+            self._linewidths = self._lw_data * scale
+        super().draw(renderer)
+
+
 def autoscale_matplotlib_plot(verbose: bool = False, square: bool = True) -> None:
     """Autoscale the current matplotlib plot
 
@@ -311,6 +481,210 @@ def add_line_to_matplotlib_2D_plot(ax, xv, yv, width, color, axis_min_max):
     axis_min_max[1] = max(axis_min_max[1], xv[1])
 
 
+def add_lines_to_matplotlib_2D_plot(
+    ax: matplotlib.axes.Axes,
+    xvs: numpy.ndarray,
+    yvs: numpy.ndarray,
+    widths: typing.Union[float, numpy.ndarray],
+    colors: typing.Any,
+    axis_min_max: typing.List[float],
+    autolim: bool = True,
+) -> typing.List[LineCollectionDataUnits]:
+    """Add many lines to a matplotlib plot as line collections
+
+    This is the vectorised equivalent of
+    :py:func:`add_line_to_matplotlib_2D_plot`, and draws the same output
+    using a small number of artists.
+
+    .. versionadded:: 1.3.9
+
+    :param ax: matplotlib.axes.Axes object
+    :type ax: matplotlib.axes.Axes
+    :param xvs: x values, array of shape (number of lines, 2)
+    :type xvs: numpy.ndarray
+    :param yvs: y values, array of shape (number of lines, 2)
+    :type yvs: numpy.ndarray
+    :param widths: widths of lines in data units
+    :type widths: float or numpy.ndarray
+    :param colors: color, or list of colors, one for each line
+    :type colors: str or list
+    :param axis_min_max: min, max value of axis, updated in place
+    :type axis_min_max: [float, float]
+    :param autolim: whether the data limits of the axes should be updated to
+        include the lines
+    :type autolim: bool
+    :returns: list of added collections
+    :rtype: list(LineCollectionDataUnits)
+    """
+    xvs = numpy.array(xvs, dtype=float).reshape(-1, 2)
+    yvs = numpy.array(yvs, dtype=float).reshape(-1, 2)
+    if len(xvs) == 0:
+        return []
+    widths = numpy.broadcast_to(numpy.asarray(widths, dtype=float), (len(xvs),))
+    colors = matplotlib.colors.to_rgba_array(colors)
+    if len(colors) == 1:
+        colors = numpy.broadcast_to(colors, (len(xvs), 4))
+
+    # looking at the cylinder from the top, OR a sphere, so draw a circle
+    points = (numpy.abs(xvs[:, 0] - xvs[:, 1]) < 0.01) & (
+        numpy.abs(yvs[:, 0] - yvs[:, 1]) < 0.01
+    )
+    xvs[points, 1] += widths[points] / 1000.0
+    yvs[points, 1] += widths[points] / 1000.0
+
+    collections = []
+    if numpy.any(points):
+        collections.append(
+            LineCollectionDataUnits(
+                numpy.stack((xvs[points], yvs[points]), axis=-1),
+                linewidths=widths[points],
+                capstyle="round",
+                colors=colors[points],
+            )
+        )
+    collections.append(
+        LineCollectionDataUnits(
+            numpy.stack((xvs, yvs), axis=-1),
+            linewidths=widths,
+            capstyle="butt",
+            colors=colors,
+        )
+    )
+    for collection in collections:
+        ax.add_collection(collection, autolim=autolim)
+
+    axis_min_max[0] = min(axis_min_max[0], numpy.min(xvs))
+    axis_min_max[1] = max(axis_min_max[1], numpy.max(xvs))
+
+    return collections
+
+
+def add_points_to_matplotlib_2D_plot(
+    ax: matplotlib.axes.Axes,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    sizes: typing.Union[float, numpy.ndarray],
+    colors: typing.Any,
+    axis_min_max: typing.List[float],
+) -> EllipseCollection:
+    """Add many points (circles) to a matplotlib plot as a single collection
+
+    The points look the same as those drawn by
+    :py:func:`add_line_to_matplotlib_2D_plot` for lines of zero length: circles
+    with diameters in data units of the y axis.
+
+    .. versionadded:: 1.3.9
+
+    :param ax: matplotlib.axes.Axes object
+    :type ax: matplotlib.axes.Axes
+    :param xs: x values of the centres of the points
+    :type xs: numpy.ndarray
+    :param ys: y values of the centres of the points
+    :type ys: numpy.ndarray
+    :param sizes: diameters of points in data units
+    :type sizes: float or numpy.ndarray
+    :param colors: color, or list of colors, one for each point
+    :type colors: str or list
+    :param axis_min_max: min, max value of axis, updated in place
+    :type axis_min_max: [float, float]
+    :returns: the added collection
+    :rtype: matplotlib.collections.EllipseCollection
+    """
+    xs = numpy.asarray(xs, dtype=float)
+    ys = numpy.asarray(ys, dtype=float)
+    sizes = numpy.broadcast_to(numpy.asarray(sizes, dtype=float), xs.shape)
+    collection = EllipseCollection(
+        sizes,
+        sizes,
+        numpy.zeros_like(xs),
+        units="y",
+        offsets=numpy.column_stack((xs, ys)),
+        offset_transform=ax.transData,
+        facecolors=colors,
+        edgecolors="none",
+    )
+    # the data limits of the collection only include the centres
+    ax.add_collection(collection, autolim=False)
+
+    if len(xs) > 0:
+        ax.update_datalim(
+            [
+                (numpy.min(xs - sizes / 2), numpy.min(ys - sizes / 2)),
+                (numpy.max(xs + sizes / 2), numpy.max(ys + sizes / 2)),
+            ]
+        )
+        axis_min_max[0] = min(axis_min_max[0], numpy.min(xs))
+        axis_min_max[1] = max(axis_min_max[1], numpy.max(xs))
+
+    return collection
+
+
+def add_density_image_to_matplotlib_2D_plot(
+    ax: matplotlib.axes.Axes,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    color: typing.Any,
+    axis_min_max: typing.List[float],
+    bins: typing.Optional[typing.Tuple[int, int]] = None,
+) -> AxesImage:
+    """Add an image of the density of many points to a matplotlib plot
+
+    The points are binned into a 2D histogram, which is drawn in the given
+    colour with opacity increasing with (the logarithm of) the number of
+    points in each bin. This is useful when there are too many points to draw
+    individually.
+
+    .. versionadded:: 1.3.9
+
+    :param ax: matplotlib.axes.Axes object
+    :type ax: matplotlib.axes.Axes
+    :param xs: x values of points
+    :type xs: numpy.ndarray
+    :param ys: y values of points
+    :type ys: numpy.ndarray
+    :param color: color of image
+    :type color: str
+    :param axis_min_max: min, max value of axis, updated in place
+    :type axis_min_max: [float, float]
+    :param bins: number of bins along x and y, defaults to the size of the
+        axes in pixels
+    :type bins: (int, int)
+    :returns: the added image
+    :rtype: matplotlib.image.AxesImage
+    """
+    xs = numpy.asarray(xs, dtype=float)
+    ys = numpy.asarray(ys, dtype=float)
+    if bins is None:
+        extent = ax.get_window_extent()
+        bins = (max(int(extent.width), 1), max(int(extent.height), 1))
+
+    xmin, xmax = numpy.min(xs), numpy.max(xs)
+    ymin, ymax = numpy.min(ys), numpy.max(ys)
+    # avoid empty ranges for points on a line
+    if xmax == xmin:
+        xmin, xmax = xmin - 0.5, xmax + 0.5
+    if ymax == ymin:
+        ymin, ymax = ymin - 0.5, ymax + 0.5
+    counts, _, _ = numpy.histogram2d(
+        xs, ys, bins=bins, range=[[xmin, xmax], [ymin, ymax]]
+    )
+
+    rgba = numpy.empty(counts.T.shape + (4,))
+    rgba[...] = matplotlib.colors.to_rgba(color)
+    rgba[..., 3] = numpy.log1p(counts.T) / numpy.log1p(numpy.max(counts))
+
+    image = AxesImage(ax, origin="lower", interpolation="nearest")
+    image.set_data(rgba)
+    image.set_extent((xmin, xmax, ymin, ymax))
+    ax.add_image(image)
+    ax.update_datalim([(xmin, ymin), (xmax, ymax)])
+
+    axis_min_max[0] = min(axis_min_max[0], xmin)
+    axis_min_max[1] = max(axis_min_max[1], xmax)
+
+    return image
+
+
 def get_cell_bound_box(cell: Cell):
     """Get a boundary box for a cell
 
@@ -333,16 +707,57 @@ def get_cell_bound_box(cell: Cell):
     return view_min, view_max
 
 
+def _read_included_file(
+    incl_loc: str,
+    include_cache: typing.Optional[typing.Dict[typing.Tuple[str, float], typing.Any]],
+) -> NeuroMLDocument:
+    """Read an included file, reusing documents that have already been read.
+
+    :param incl_loc: absolute path of included file
+    :type incl_loc: str
+    :param include_cache: dictionary of documents that have already been
+        read, keyed by path and modification time, updated in place. If None,
+        the file is always read.
+    :type include_cache: dict
+    :returns: document
+    :rtype: neuroml.NeuroMLDocument
+    """
+    if include_cache is None:
+        return read_neuroml2_file(incl_loc)
+
+    key = (incl_loc, os.path.getmtime(incl_loc))
+    try:
+        return include_cache[key]
+    except KeyError:
+        inc = read_neuroml2_file(incl_loc)
+        include_cache[key] = inc
+        return inc
+
+
 def load_minimal_morphplottable__model(
-    nml_model: NeuroMLDocument, nml_file_path: str = ""
+    nml_model: NeuroMLDocument,
+    nml_file_path: str = "",
+    include_cache: typing.Optional[
+        typing.Dict[typing.Tuple[str, float], typing.Any]
+    ] = None,
 ):
     """Take a model that has been loaded without recursively including all
     bits, and load only information that is needed to plot it.
 
+    .. versionadded:: 1.3.9
+        The include_cache parameter
+
     :param nml_model: partially loaded model
     :type nml_model: neuroml.NeuroMLDocument
     :param nml_file_path: path of file corresponding to the model
     :type nml_file_path: str
+    :param include_cache: optional dictionary of included documents that
+        have already been read, updated in place. When loading many models
+        that include the same files, passing the same dictionary means that
+        each included file is only read once. Cells and morphologies from
+        cached documents are shared between the models, so they should not be
+        modified.
+    :type include_cache: dict
 
     """
     logger.debug("Loading model bits necessary for plotting.")
@@ -381,7 +796,7 @@ def load_minimal_morphplottable__model(
         for inc in nml_model.includes:
             incl_loc = os.path.abspath(os.path.join(base_path, inc.href))
             if os.path.isfile(incl_loc):
-                inc = read_neuroml2_file(incl_loc)
+                inc = _read_included_file(incl_loc, include_cache)
                 for acell in inc.cells:
                     if acell.id in required_cell_types:
                         acell.biophysical_properties = None
@@ -391,7 +806,7 @@ def load_minimal_morphplottable__model(
         for inc in nml_model.includes:
             incl_loc = os.path.abspath(os.path.join(base_path, inc.href))
             if os.path.isfile(incl_loc):
-                inc = read_neuroml2_file(incl_loc)
+                inc = _read_included_file(incl_loc, include_cache)
                 for acell in inc.cells:
                     acell.biophysical_properties = None
                     nml_model.add(acell)
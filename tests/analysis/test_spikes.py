@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test spike analysis module
+
+File: tests/analysis/test_spikes.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import unittest
+import warnings
+
+import neuroml
+import numpy
+
+from pyneuroml.analysis.spikes import (
+    interspike_intervals,
+    population_rate,
+    population_rates,
+    smooth_rate,
+    spike_table_from_events,
+    spike_train_statistics,
+)
+
+
+class TestSpikeAnalysis(unittest.TestCase):
+    """Test spike analysis module"""
+
+    def test_population_rate(self):
+        """Test population_rate"""
+        # 10 cells, each spiking at 20 Hz for 1 s
+        times = numpy.concatenate([numpy.arange(0.025, 1.0, 0.05)] * 10)
+        centres, rate = population_rate(
+            times, num_cells=10, t_start=0.0, t_stop=1.0, bin_size=0.1
+        )
+        self.assertEqual(len(centres), 10)
+        self.assertAlmostEqual(centres[0], 0.05)
+        numpy.testing.assert_allclose(rate, 20.0)
+
+        # smoothing should preserve the mean rate away from the edges
+        centres, rate = population_rate(
+            times,
+            num_cells=10,
+            t_start=0.0,
+            t_stop=1.0,
+            num_bins=100,
+            kernel="gaussian",
+            kernel_width=0.02,
+        )
+        self.assertEqual(len(rate), 100)
+        self.assertAlmostEqual(numpy.mean(rate[20:80]), 20.0, places=5)
+
+        with self.assertRaises(ValueError):
+            population_rate(times, num_cells=0)
+
+    def test_smooth_rate(self):
+        """Test smooth_rate with the different kernels"""
+        rate = numpy.zeros(100)
+        rate[50] = 1.0
+        for kernel in ["gaussian", "exponential", "box"]:
+            smoothed = smooth_rate(rate, 1.0, kernel, 3.0)
+            self.assertEqual(len(smoothed), len(rate))
+            self.assertAlmostEqual(smoothed.sum(), 1.0)
+
+        # exponential kernel is causal
+        smoothed = smooth_rate(rate, 1.0, "exponential", 3.0)
+        self.assertAlmostEqual(smoothed[:50].sum(), 0.0)
+        self.assertEqual(numpy.argmax(smoothed), 50)
+
+        # gaussian kernel is centred
+        smoothed = smooth_rate(rate, 1.0, "gaussian", 3.0)
+        self.assertEqual(numpy.argmax(smoothed), 50)
+
+        with self.assertRaises(ValueError):
+            smooth_rate(rate, 1.0, "triangle", 3.0)
+
+    def test_population_rates(self):
+        """Test population_rates grouping"""
+        events = {
+            "pop0[0]": [0.1, 0.2],
+            "pop0[1]": [0.3],
+            "pop1/0/cell": [0.4, 0.5, 0.6],
+        }
+        rates = population_rates(events, num_bins=1)
+        self.assertEqual(list(rates.keys()), ["pop0", "pop1"])
+        # 3 spikes, 2 cells, 0.5s
+        self.assertAlmostEqual(rates["pop0"][1][0], 3.0)
+
+        network = neuroml.Network(id="net")
+        network.populations.append(
+            neuroml.Population(id="pop0", component="cell", size=6)
+        )
+        rates = population_rates(events, network=network, num_bins=1)
+        # 3 spikes, 6 cells, 0.5s
+        self.assertAlmostEqual(rates["pop0"][1][0], 1.0)
+        # not in network: 1 cell with events
+        self.assertAlmostEqual(rates["pop1"][1][0], 6.0)
+
+    def test_spike_table_from_events(self):
+        """Test spike_table_from_events"""
+        keys, ids, times = spike_table_from_events(
+            {"pop0[0]": [0.1, 0.2], "pop0[1]": [], "pop0[2]": [0.3]}
+        )
+        self.assertEqual(keys, ["pop0[0]", "pop0[1]", "pop0[2]"])
+        numpy.testing.assert_array_equal(ids, [0, 0, 2])
+        numpy.testing.assert_allclose(times, [0.1, 0.2, 0.3])
+
+    def test_interspike_intervals(self):
+        """Test interspike_intervals"""
+        cells, isis = interspike_intervals([5, 2, 5, 5, 2], [0.3, 0.2, 0.1, 0.6, 0.5])
+        numpy.testing.assert_array_equal(cells, [2, 5, 5])
+        numpy.testing.assert_allclose(isis, [0.3, 0.2, 0.3])
+
+    def test_spike_train_statistics(self):
+        """Test spike_train_statistics against per-cell calculations"""
+        rng = numpy.random.default_rng(1)
+        num_cells = 20
+        shared = rng.uniform(0, 2, 100)
+        ids = []
+        times = []
+        for i in range(num_cells):
+            t = numpy.concatenate(
+                [rng.uniform(0, 2, rng.integers(5, 50)), shared[: rng.integers(0, 100)]]
+            )
+            ids.append(numpy.full(len(t), i))
+            times.append(t)
+        ids = numpy.concatenate(ids)
+        times = numpy.concatenate(times)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            table = spike_train_statistics(
+                ids,
+                times,
+                num_cells=num_cells + 1,
+                t_start=0.0,
+                t_stop=2.0,
+                fano_window=0.1,
+                synchrony_bin=0.01,
+            )
+        self.assertEqual(len(table), num_cells + 1)
+        # last cell is silent
+        self.assertEqual(table["num_spikes"][-1], 0)
+        self.assertTrue(numpy.isnan(table["isi_cv"][-1]))
+        self.assertTrue(numpy.isnan(table["synchrony"][-1]))
+        table = table[:-1]
+
+        binned = numpy.zeros((num_cells, 200))
+        windows = numpy.zeros((num_cells, 20))
+        numpy.add.at(binned, (ids, numpy.floor(times / 0.01).astype(int)), 1)
+        numpy.add.at(windows, (ids, numpy.floor(times / 0.1).astype(int)), 1)
+        correlations = numpy.corrcoef(binned)
+        numpy.fill_diagonal(correlations, numpy.nan)
+
+        for i in range(num_cells):
+            isis = numpy.diff(numpy.sort(times[ids == i]))
+            self.assertEqual(table["num_spikes"][i], len(isis) + 1)
+            self.assertAlmostEqual(table["rate"][i], (len(isis) + 1) / 2.0)
+            self.assertAlmostEqual(table["isi_mean"][i], isis.mean())
+            self.assertAlmostEqual(table["isi_cv"][i], isis.std() / isis.mean())
+            self.assertAlmostEqual(table["burst_index"][i], numpy.mean(isis < 0.01))
+            self.assertAlmostEqual(
+                table["fano_factor"][i], windows[i].var() / windows[i].mean()
+            )
+            self.assertAlmostEqual(
+                table["synchrony"][i], numpy.nanmean(correlations[i])
+            )
+
+        # sampled reference cells
+        table = spike_train_statistics(
+            ids, times, synchrony_bin=0.01, synchrony_sample=5, seed=1
+        )
+        self.assertEqual(len(table), num_cells)
+        self.assertFalse(numpy.any(numpy.isnan(table["synchrony"])))
+
+
+if __name__ == "__main__":
+    unittest.main()
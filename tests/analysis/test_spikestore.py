@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test spike store module
+
+File: tests/analysis/test_spikestore.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from pyneuroml.analysis.spikestore import (
+    SpikeStore,
+    create_spike_store_from_lems_file,
+    create_spike_store_from_sonata_file,
+    population_rates_from_spike_store,
+)
+
+
+class TestSpikeStore(unittest.TestCase):
+    """Test spike store module"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store_file = os.path.join(self.tmpdir.name, "spikes.h5")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_spike_store(self):
+        """Test writing to and querying a spike store"""
+        rng = numpy.random.default_rng(1)
+        ids = rng.integers(0, 50, 5000)
+        times = rng.uniform(0, 1, 5000)
+
+        with SpikeStore(self.store_file, mode="w") as store:
+            store.add_population("pop 0", ids, times, num_cells=60)
+            store.add_population("pop1", [], [])
+
+        with SpikeStore(self.store_file) as store:
+            self.assertEqual(store.get_populations(), ["pop 0", "pop1"])
+            self.assertEqual(store.get_num_cells("pop 0"), 60)
+            self.assertEqual(store.get_num_cells("pop1"), 0)
+            self.assertEqual(store.get_num_spikes("pop 0"), 5000)
+            numpy.testing.assert_array_equal(
+                store.get_cells("pop 0"), numpy.unique(ids)
+            )
+
+            for cell in [0, 17, 49, 55]:
+                numpy.testing.assert_array_equal(
+                    store.get_spike_times("pop 0", cell),
+                    numpy.sort(times[ids == cell]),
+                )
+
+            w_ids, w_times = store.get_spikes_in_window("pop 0", 0.2, 0.3)
+            in_window = (times >= 0.2) & (times < 0.3)
+            order = numpy.argsort(times[in_window])
+            numpy.testing.assert_array_equal(w_times, times[in_window][order])
+            numpy.testing.assert_array_equal(w_ids, ids[in_window][order])
+
+            w_ids, w_times = store.get_spikes_in_window("pop1")
+            self.assertEqual(len(w_times), 0)
+            self.assertTrue(numpy.isnan(store.get_time_range("pop1")[0]))
+
+            rates = population_rates_from_spike_store(
+                store, ["pop 0"], t_start=0.0, t_stop=1.0, num_bins=1
+            )
+            self.assertAlmostEqual(rates["pop 0"][1][0], 5000 / 60)
+
+            with self.assertRaises(ValueError):
+                store.get_num_cells("pop2")
+
+    def test_create_spike_store_from_lems_file(self):
+        """Test creating a spike store from LEMS event output files"""
+        lems_file = os.path.join(self.tmpdir.name, "LEMS_test.xml")
+        with open(lems_file, "w") as f:
+            f.write("""<Lems>
+    <Simulation id="sim" length="1s" step="0.01ms" target="net">
+        <EventOutputFile id="spikes" fileName="test.spikes" format="ID_TIME">
+            <EventSelection id="0" select="pop0[0]" eventPort="spike"/>
+            <EventSelection id="1" select="pop0[1]" eventPort="spike"/>
+            <EventSelection id="2" select="pop1/0/cell" eventPort="spike"/>
+            <EventSelection id="3" select="pop0[2]" eventPort="spike"/>
+        </EventOutputFile>
+        <EventOutputFile id="more_spikes" fileName="more.spikes" format="ID_TIME">
+            <EventSelection id="4" select="pop0[0]" eventPort="spike"/>
+            <EventSelection id="5" select="pop0[3]" eventPort="spike"/>
+        </EventOutputFile>
+    </Simulation>
+</Lems>
+""")
+        with open(os.path.join(self.tmpdir.name, "test.spikes"), "w") as f:
+            f.write("0 0.1\n2 0.15\n1 0.2\n0 0.3\n2 0.35\n")
+        with open(os.path.join(self.tmpdir.name, "more.spikes"), "w") as f:
+            f.write("5 0.4\n")
+
+        with create_spike_store_from_lems_file(
+            lems_file, self.store_file, base_dir=self.tmpdir.name
+        ) as store:
+            self.assertEqual(sorted(store.get_populations()), ["pop0", "pop1"])
+            # pop0[0] is recorded in both files, but only counted once
+            self.assertEqual(store.get_num_cells("pop0"), 4)
+            self.assertEqual(store.get_num_cells("pop1"), 1)
+            numpy.testing.assert_allclose(store.get_spike_times("pop0", 0), [0.1, 0.3])
+            numpy.testing.assert_allclose(store.get_spike_times("pop0", 1), [0.2])
+            self.assertEqual(len(store.get_spike_times("pop0", 2)), 0)
+            numpy.testing.assert_allclose(store.get_spike_times("pop0", 3), [0.4])
+            numpy.testing.assert_allclose(
+                store.get_spike_times("pop1", 0), [0.15, 0.35]
+            )
+
+    def test_create_spike_store_from_sonata_file(self):
+        """Test creating a spike store from a SONATA spike file"""
+        import tables
+
+        sonata_file = os.path.join(self.tmpdir.name, "sonata_spikes.h5")
+        with tables.open_file(sonata_file, mode="w") as h5file:
+            spikes = h5file.create_group("/", "spikes")
+            pop = h5file.create_group(spikes, "pop0")
+            h5file.create_array(pop, "node_ids", numpy.array([1, 0, 1]))
+            h5file.create_array(pop, "timestamps", numpy.array([0.5, 0.2, 0.1]))
+
+        with create_spike_store_from_sonata_file(sonata_file, self.store_file) as store:
+            self.assertEqual(store.get_populations(), ["pop0"])
+            self.assertEqual(store.get_num_cells("pop0"), 2)
+            numpy.testing.assert_allclose(store.get_spike_times("pop0", 1), [0.1, 0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
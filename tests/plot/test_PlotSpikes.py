@@ -68,6 +68,105 @@ class TestPlotSpikes(BaseTestCase):
         self.assertIsFile("spike-plot-test-multi.png")
         os.unlink("spike-plot-test-multi.png")
 
+    def test_plot_spikes_density_raster(self):
+        """Test the density raster mode of the plot_spikes function."""
+        pyplts.plot_spikes(
+            title="spikes from data - density",
+            spike_data=self.spike_data,
+            show_plots_already=False,
+            save_spike_plot_to="spike-plot-test-density.png",
+            density_threshold=100,
+        )
+        self.assertIsFile("spike-plot-test-density.png")
+        os.unlink("spike-plot-test-density.png")
+
+        pyplts.plot_spikes(
+            title="spikes from data - density, coloured",
+            spike_data=self.spike_data,
+            show_plots_already=False,
+            save_spike_plot_to="spike-plot-test-density-colours.png",
+            density_threshold=0,
+            colors=["red", "blue"],
+        )
+        self.assertIsFile("spike-plot-test-density-colours.png")
+        os.unlink("spike-plot-test-density-colours.png")
+
+    def test_plot_spikes_with_rates(self):
+        """Test the plot_spikes function with rates."""
+        pyplts.plot_spikes(
+            title="spikes from data with rates",
+            spike_data=self.spike_data,
+            show_plots_already=False,
+            save_spike_plot_to="spike-plot-test-rates.png",
+            rates=True,
+        )
+        self.assertIsFile("spike-plot-test-rates.png")
+        os.unlink("spike-plot-test-rates.png")
+
+    def test_plot_spikes_from_spike_store(self):
+        """Test plotting spikes from a spike store."""
+        from pyneuroml.analysis.spikestore import SpikeStore
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store_file = os.path.join(tmpdir, "spikes.h5")
+            with SpikeStore(store_file, mode="w") as store:
+                for data in self.spike_data:
+                    store.add_population(data["name"], data["ids"], data["times"])
+
+            spike_data = pyplts.load_spike_data_from_spike_store(
+                store_file, ["Population2"], t_start=100, t_stop=200
+            )
+            self.assertEqual(len(spike_data), 1)
+            times = np.array(self.spike_data[1]["times"])
+            self.assertEqual(
+                len(spike_data[0]["times"]),
+                np.count_nonzero((times >= 100) & (times < 200)),
+            )
+
+            pyplts.plot_spikes_from_data_files(
+                [store_file],
+                format_="spikestore",
+                show_plots_already=False,
+                save_spike_plot_to="spike-plot-test-spikestore.png",
+            )
+        self.assertIsFile("spike-plot-test-spikestore.png")
+        os.unlink("spike-plot-test-spikestore.png")
+
+    def test_plot_spikes_from_spike_store_silent_population(self):
+        """Test plotting a window in which a population has no spikes."""
+        from pyneuroml.analysis.spikestore import SpikeStore
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store_file = os.path.join(tmpdir, "spikes.h5")
+            with SpikeStore(store_file, mode="w") as store:
+                store.add_population("a", [0, 1, 0], [0.1, 0.2, 0.3])
+                store.add_population("b", [0, 1], [0.6, 0.7])
+
+            spike_data = pyplts.load_spike_data_from_spike_store(
+                store_file, t_start=0.0, t_stop=0.5
+            )
+            self.assertEqual(sorted(len(data["times"]) for data in spike_data), [0, 3])
+            pyplts.plot_spikes(
+                title="silent population",
+                spike_data=spike_data,
+                show_plots_already=False,
+                save_spike_plot_to="spike-plot-test-silent.png",
+            )
+        self.assertIsFile("spike-plot-test-silent.png")
+        os.unlink("spike-plot-test-silent.png")
+
+    def test_bin_spikes_2d(self):
+        """Test binning of spikes for the density raster."""
+        times = np.array([0.0, 0.5, 0.99, 0.5, 2.0])
+        ids = np.array([0, 1, 1, 3, 1])
+        counts = pyplts._bin_spikes_2d(times, ids, (0.0, 1.0), (0, 3), (4, 2))
+        self.assertEqual(counts.shape, (4, 2))
+        # the spike at t = 2.0 is outside the time range
+        self.assertEqual(counts.sum(), 4)
+        self.assertEqual(counts[0, 0], 1)
+        self.assertEqual(counts[1, 1], 2)
+        self.assertEqual(counts[3, 1], 1)
+
     def test_plot_spikes_from_files(self, max_spikes_per_population=100):
         """Test the plot_spikes function with spike time files."""
 
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test export of 3D morphologies
+
+File: tests/plot/test_morphology_export.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import base64
+import json
+import logging
+import os
+import struct
+import tempfile
+
+import numpy
+
+from pyneuroml.plot.PlotMorphologyExport import export_3D_morphology
+from pyneuroml.pynml import read_neuroml2_file
+
+from .. import BaseTestCase
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+class TestMorphologyExport(BaseTestCase):
+    """Test PlotMorphologyExport module"""
+
+    def setUp(self):
+        """Set up test cell"""
+        self.nml_file = "tests/plot/test.cell.nml"
+        self.num_segments = len(
+            read_neuroml2_file(self.nml_file).cells[0].morphology.segments
+        )
+
+    def _check_gltf(self, gltf, buffer):
+        """Check the instances in a glTF file."""
+        self.assertIn("EXT_mesh_gpu_instancing", gltf["extensionsRequired"])
+        self.assertEqual(gltf["buffers"][0]["byteLength"], len(buffer))
+
+        num_instances = 0
+        for node in gltf["nodes"]:
+            attributes = node["extensions"]["EXT_mesh_gpu_instancing"]["attributes"]
+            translations = gltf["accessors"][attributes["TRANSLATION"]]
+            rotations = gltf["accessors"][attributes["ROTATION"]]
+            self.assertEqual(translations["count"], rotations["count"])
+            num_instances += translations["count"]
+
+            # rotations are unit quaternions
+            view = gltf["bufferViews"][rotations["bufferView"]]
+            quaternions = numpy.frombuffer(
+                buffer,
+                dtype="<f4",
+                count=4 * rotations["count"],
+                offset=view["byteOffset"],
+            ).reshape(-1, 4)
+            numpy.testing.assert_allclose(
+                numpy.linalg.norm(quaternions, axis=1), 1, rtol=1e-5
+            )
+
+        # one instance for each segment
+        self.assertEqual(num_instances, self.num_segments)
+
+    def test_export_glb(self):
+        """Test export to binary glTF"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_name = os.path.join(tmpdir, "cell.glb")
+            export_3D_morphology(self.nml_file, file_name, plot_type="detailed")
+
+            with open(file_name, "rb") as f:
+                data = f.read()
+            magic, version, length = struct.unpack("<4sII", data[:12])
+            self.assertEqual(magic, b"glTF")
+            self.assertEqual(version, 2)
+            self.assertEqual(length, len(data))
+            json_length, json_type = struct.unpack("<I4s", data[12:20])
+            self.assertEqual(json_type, b"JSON")
+            gltf = json.loads(data[20 : 20 + json_length])
+            bin_length, bin_type = struct.unpack(
+                "<I4s", data[20 + json_length : 28 + json_length]
+            )
+            self.assertEqual(bin_type, b"BIN\x00")
+            self._check_gltf(gltf, data[28 + json_length :])
+
+    def test_export_gltf(self):
+        """Test export to glTF"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_name = os.path.join(tmpdir, "cell.gltf")
+            export_3D_morphology(self.nml_file, file_name, plot_type="constant")
+
+            with open(file_name) as f:
+                gltf = json.load(f)
+            buffer = base64.b64decode(gltf["buffers"][0]["uri"].split(",")[1])
+            self._check_gltf(gltf, buffer)
+
+        with self.assertRaises(ValueError):
+            export_3D_morphology(self.nml_file, "cell.obj")
+
+    def test_export_ply(self):
+        """Test export to PLY"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_name = os.path.join(tmpdir, "cell.ply")
+            export_3D_morphology(self.nml_file, file_name, plot_type="detailed")
+
+            with open(file_name, "rb") as f:
+                data = f.read()
+            header, body = data.split(b"end_header\n", 1)
+            header_lines = header.decode().splitlines()
+            self.assertEqual(header_lines[1], "format binary_little_endian 1.0")
+            num_vertices = int(header_lines[3].split()[-1])
+            num_faces = int(header_lines[10].split()[-1])
+
+            # 15 bytes per vertex, 13 bytes per triangle
+            self.assertEqual(len(body), 15 * num_vertices + 13 * num_faces)
+            faces = numpy.frombuffer(
+                body[15 * num_vertices :],
+                dtype=numpy.dtype([("n", "u1"), ("vertices", "<i4", (3,))]),
+            )
+            self.assertTrue(numpy.all(faces["n"] == 3))
+            self.assertEqual(faces["vertices"].max(), num_vertices - 1)
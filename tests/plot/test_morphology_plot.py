@@ -7,16 +7,25 @@ File: tests/plot/test_morphology_plot.py
 Copyright 2023 NeuroML contributors
 """
 
+import json
 import logging
+import os
 import pathlib as pl
+import shutil
+import tempfile
+from unittest import mock
 
 import neuroml
 import numpy
 import pytest
+from matplotlib import pyplot as plt
 
 from pyneuroml.plot.PlotMorphology import (
+    _SCHEMATIC_GEOMETRY_CACHE,
     plot_2D,
+    plot_2D_batch,
     plot_2D_cell_morphology,
+    plot_2D_point_cells,
     plot_2D_schematic,
     plot_segment_groups_curtain_plots,
 )
@@ -24,6 +33,15 @@ from pyneuroml.plot.PlotMorphologyPlotly import (
     plot_3D_cell_morphology_plotly,
 )
 from pyneuroml.plot.PlotMorphologyVispy import (
+    _get_instance_transforms,
+    _get_mesh_dimensions,
+    _get_mesh_precision,
+    _get_meshdata,
+    _get_meshdata_chunks,
+    _get_plottable_model,
+    _get_point_data,
+    _get_soma_points,
+    _get_template_mesh,
     create_cylindrical_mesh,
     make_cell_upright,
     plot_3D_cell_morphology,
@@ -31,6 +49,8 @@ from pyneuroml.plot.PlotMorphologyVispy import (
     plot_interactive_3D,
 )
 from pyneuroml.pynml import read_neuroml2_file
+from pyneuroml.utils import extract_position_info
+from pyneuroml.utils.plot import add_lines_to_matplotlib_2D_plot
 
 from .. import BaseTestCase
 
@@ -59,6 +79,25 @@ class TestMorphologyPlot(BaseTestCase):
                 self.assertIsFile(filename)
                 pl.Path(filename).unlink()
 
+    def test_2d_point_plotter_many_cells(self):
+        """Test plot_2D_point_cells function with many cells."""
+        offsets = numpy.random.default_rng(0).uniform(0, 1000, (500, 3))
+        plot_2D_point_cells(offset=offsets, plane2d="xz", soma_radius=5)
+        ax = plt.gca()
+        # all cells in one collection
+        self.assertEqual(len(ax.collections), 1)
+        numpy.testing.assert_allclose(
+            ax.collections[0].get_offsets(), offsets[:, [0, 2]]
+        )
+        plt.close()
+
+        # density image above the threshold
+        plot_2D_point_cells(offset=offsets, color="r", density_threshold=100)
+        ax = plt.gca()
+        self.assertEqual(len(ax.collections), 0)
+        self.assertEqual(len(ax.images), 1)
+        plt.close()
+
     @pytest.mark.localonly
     def test_3d_point_plotter(self):
         """Test plot_2D_point_cells function."""
@@ -185,6 +224,173 @@ class TestMorphologyPlot(BaseTestCase):
             self.assertIsFile(filename)
             # pl.Path(filename).unlink()
 
+    def test_2d_plotter_network_shared_morphology(self):
+        """Test plot_2D with many instances of one cell type."""
+        cell = read_neuroml2_file("tests/plot/test.cell.nml").cells[0]
+        num_segments = len(cell.morphology.segments)
+        doc = neuroml.NeuroMLDocument(id="shared")
+        doc.add(cell)
+        net = doc.add(neuroml.Network, id="net", validate=False)
+        pop = net.add(
+            neuroml.Population,
+            id="pop",
+            component=cell.id,
+            type="populationList",
+            validate=False,
+        )
+        positions = numpy.array([[0.0, 0.0, 0.0], [100.0, 50.0, 0.0], [-40, 30, 10]])
+        for i, (x, y, z) in enumerate(positions):
+            pop.instances.append(
+                neuroml.Instance(id=i, location=neuroml.Location(x=x, y=y, z=z))
+            )
+
+        plot_2D(doc, nogui=True, plane2d="xy")
+        ax = plt.gca()
+        # all instances are drawn by a single line collection
+        lines = numpy.array(ax.collections[-1].get_segments())
+        self.assertEqual(len(lines), 3 * num_segments)
+        # instances are offset copies of the cell
+        template = lines[:num_segments]
+        for i in range(3):
+            shift = lines[i * num_segments : (i + 1) * num_segments] - template
+            numpy.testing.assert_allclose(shift - shift[0, 0], 0, atol=1e-3)
+            self.assertTrue(
+                numpy.any(
+                    numpy.all(
+                        numpy.isclose(
+                            positions[:, :2] - positions[-1, :2], shift[0, 0]
+                        ),
+                        axis=1,
+                    )
+                )
+            )
+        plt.close()
+
+    def test_2d_plotter_network_views(self):
+        """Test plot_2D function with several views in one call."""
+        nml_file = "tests/plot/L23-example/TestNetwork.net.nml"
+        c = numpy.sqrt(0.5)
+        views = ["xy", "yz", [[c, c, 0], [0, 0, 1]]]
+
+        # subplots
+        filename = "tests/plot/test_morphology_plot_2d_views.png"
+        plot_2D(nml_file, plane2d=views, nogui=True, save_to_file=filename)
+        axes = plt.gcf().axes
+        self.assertEqual(len(axes), 3)
+        self.assertEqual(axes[1].get_xlabel(), "y (μm)")
+        self.assertEqual(axes[2].get_xlabel(), "0.71x+0.71y (μm)")
+        self.assertEqual(axes[2].get_ylabel(), "z (μm)")
+        self.assertIsFile(filename)
+        pl.Path(filename).unlink()
+        plt.close()
+
+        # separate figures, one file each
+        plot_2D(
+            nml_file,
+            plane2d=views,
+            nogui=True,
+            save_to_file=filename,
+            separate_figures=True,
+            close_plot=True,
+        )
+        for view_name in ["xy", "yz", "view2"]:
+            view_file = f"tests/plot/test_morphology_plot_2d_views_{view_name}.png"
+            self.assertIsFile(view_file)
+            pl.Path(view_file).unlink()
+
+        with self.assertRaises(ValueError):
+            plot_2D(nml_file, plane2d=["xy", "ab"], nogui=True)
+
+    def test_2d_plotter_batch(self):
+        """Test plot_2D_batch with a directory of files."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_dir = os.path.join(tmpdir, "cells")
+            output_dir = os.path.join(tmpdir, "images")
+            for name in ["a/one.cell.nml", "b/two.cell.nml"]:
+                os.makedirs(os.path.join(input_dir, os.path.dirname(name)))
+                shutil.copy("tests/plot/test.cell.nml", os.path.join(input_dir, name))
+            with open(os.path.join(input_dir, "bad.nml"), "w") as f:
+                f.write("not neuroml")
+
+            results = plot_2D_batch(
+                input_dir, output_dir, max_workers=2, plot_type="constant"
+            )
+
+            self.assertEqual(
+                [r["input"] for r in results],
+                [
+                    os.path.join(input_dir, "a/one.cell.nml"),
+                    os.path.join(input_dir, "b/two.cell.nml"),
+                    os.path.join(input_dir, "bad.nml"),
+                ],
+            )
+            self.assertIsNone(results[0]["error"])
+            self.assertIsFile(os.path.join(output_dir, "a/one.cell.png"))
+            self.assertIsFile(os.path.join(output_dir, "b/two.cell.png"))
+            self.assertIsNotNone(results[2]["error"])
+
+            with open(os.path.join(output_dir, "manifest.json")) as f:
+                manifest = json.load(f)
+            self.assertEqual(manifest, results)
+            self.assertGreater(manifest[0]["time"], 0)
+
+    def test_2d_plotter_network_lod(self):
+        """Test level of detail and culling in plot_2D."""
+        cell = read_neuroml2_file("tests/plot/test.cell.nml").cells[0]
+        num_segments = len(cell.morphology.segments)
+        doc = neuroml.NeuroMLDocument(id="lod")
+        doc.add(cell)
+        net = doc.add(neuroml.Network, id="net", validate=False)
+        pop = net.add(
+            neuroml.Population,
+            id="pop",
+            component=cell.id,
+            type="populationList",
+            validate=False,
+        )
+        # cells are tiny compared to the network
+        for i, x in enumerate([0.0, 1e6, 2e6]):
+            pop.instances.append(
+                neuroml.Instance(id=i, location=neuroml.Location(x=x, y=x, z=0))
+            )
+
+        plot_2D(doc, nogui=True, plane2d="xy")
+        ax = plt.gca()
+        # one point per cell, drawn with round caps
+        for collection in ax.collections:
+            points = numpy.array(collection.get_segments())
+            self.assertEqual(len(points), 3)
+            numpy.testing.assert_allclose(points[:, 0], points[:, 1], atol=100)
+        xmin, xmax = ax.get_xlim()
+        self.assertLess(xmin, 0)
+        self.assertGreater(xmax, 2e6)
+
+        # zoom in on the first cell: others are culled, all segments drawn
+        with mock.patch(
+            "pyneuroml.plot.PlotMorphology.add_lines_to_matplotlib_2D_plot",
+            wraps=add_lines_to_matplotlib_2D_plot,
+        ) as add_lines:
+            ax.set_xlim(-500, 500)
+            ax.set_ylim(-500, 500)
+            # the view is only updated when drawn, once for both limits
+            add_lines.assert_not_called()
+            plt.gcf().canvas.draw()
+            self.assertEqual(add_lines.call_count, 1)
+            plt.gcf().canvas.draw()
+            self.assertEqual(add_lines.call_count, 1)
+        lines = numpy.concatenate(
+            [c.get_segments() for c in ax.collections if c.get_visible()]
+        )
+        self.assertGreaterEqual(len(lines), num_segments)
+        self.assertLess(numpy.max(numpy.abs(lines)), 1e5)
+
+        # without lod, all segments of all cells are drawn
+        plt.close()
+        plot_2D(doc, nogui=True, plane2d="xy", lod=False)
+        lines = numpy.concatenate([c.get_segments() for c in plt.gca().collections])
+        self.assertGreaterEqual(len(lines), 3 * num_segments)
+        plt.close()
+
     def test_2d_constant_plotter_network(self):
         """Test plot_2D_schematic function with a network of a few cells."""
         nml_file = "tests/plot/L23-example/TestNetwork.net.nml"
@@ -321,6 +527,25 @@ class TestMorphologyPlot(BaseTestCase):
             self.assertIsFile(filename)
             pl.Path(filename).unlink()
 
+    def test_3d_plotter_plotly_traces(self):
+        """Test that plotly plots use one trace per line width."""
+        nml_file = "tests/plot/test.cell.nml"
+        cell = read_neuroml2_file(nml_file).cells[0]
+        num_segments = len(cell.morphology.segments)
+
+        fig = plot_3D_cell_morphology_plotly(nml_file, nogui=True)
+        self.assertLess(len(fig.data), num_segments)
+        self.assertEqual(
+            len(set(trace.line.width for trace in fig.data)), len(fig.data)
+        )
+        # two points and a separator for each segment
+        self.assertEqual(sum(len(trace.x) for trace in fig.data), 3 * num_segments)
+        for trace in fig.data:
+            self.assertEqual(trace.x[2::3], (None,) * (len(trace.x) // 3))
+
+        fig = plot_3D_cell_morphology_plotly(nml_file, nogui=True, plot_type="constant")
+        self.assertEqual(len(fig.data), 1)
+
     def test_2d_schematic_plotter(self):
         """Test plot_2D_schematic function."""
         nml_file = "tests/plot/Cell_497232312.cell.nml"
@@ -370,6 +595,40 @@ class TestMorphologyPlot(BaseTestCase):
             self.assertIsFile(filename)
             pl.Path(filename).unlink()
 
+    def test_2d_schematic_plotter_offsets(self):
+        """Test plot_2D_schematic function with many copies of a cell."""
+        cell = read_neuroml2_file("tests/plot/test.cell.nml").cells[0]
+        segment_groups = ["soma_0", "dend_0", "axon_0"]
+        plot_2D_schematic(cell, segment_groups=segment_groups, nogui=True)
+        template = numpy.array(plt.gca().collections[-1].get_segments())
+        self.assertEqual(len(template), 3)
+        plt.close()
+
+        # geometry is cached for the cell
+        self.assertIn(cell, _SCHEMATIC_GEOMETRY_CACHE)
+        self.assertIn(tuple(segment_groups), _SCHEMATIC_GEOMETRY_CACHE[cell])
+
+        # 3D offsets are projected onto the plane
+        offsets = numpy.array([[0.0, 0.0, 0.0], [100.0, 200.0, 300.0]])
+        plot_2D_schematic(
+            cell, segment_groups=segment_groups, offset=offsets, nogui=True
+        )
+        lines = numpy.array(plt.gca().collections[-1].get_segments())
+        self.assertEqual(len(lines), 6)
+        numpy.testing.assert_allclose(lines[3:] - lines[:3], 0 * lines[:3] + [100, 200])
+        plt.close()
+
+        plot_2D_schematic(
+            cell,
+            segment_groups=segment_groups,
+            offset=offsets,
+            plane2d="zy",
+            nogui=True,
+        )
+        lines = numpy.array(plt.gca().collections[-1].get_segments())
+        numpy.testing.assert_allclose(lines[3:] - lines[:3], 0 * lines[:3] + [300, 200])
+        plt.close()
+
     def test_plot_segment_groups_curtain_plots(self):
         """Test plot_segment_groups_curtain_plots function."""
         nml_file = "tests/plot/Cell_497232312.cell.nml"
@@ -448,6 +707,137 @@ class TestMorphologyPlot(BaseTestCase):
 
         self.assertEqual(mesh.n_vertices + 2, mesh2.n_vertices)
 
+    def test_instance_transforms(self):
+        """Test that instance transforms orient meshes along segments"""
+        directions = numpy.array(
+            [[1.0, 2.0, 3.0], [0.0, 0.0, 5.0], [0.0, 0.0, -2.0], [0.0, 0.0, 0.0]]
+        )
+        transforms = _get_instance_transforms(directions)
+        self.assertEqual(transforms.shape, (4, 3, 3))
+        # rotations: orthonormal with determinant 1
+        for transform in transforms:
+            numpy.testing.assert_allclose(
+                transform @ transform.T, numpy.eye(3), atol=1e-12
+            )
+            self.assertAlmostEqual(numpy.linalg.det(transform), 1.0)
+        # the z axis of the template is mapped to the direction of each segment
+        numpy.testing.assert_allclose(
+            transforms[:3] @ [0, 0, 1],
+            directions[:3] / numpy.linalg.norm(directions[:3], axis=1)[:, None],
+            atol=1e-12,
+        )
+        numpy.testing.assert_allclose(transforms[3], numpy.eye(3))
+
+    def test_mesh_precision(self):
+        """Test that the mesh precision meets the mesh budget"""
+        cell = read_neuroml2_file("tests/plot/L23-example/HL23PYR.cell.nml").cells[0]
+        dimensions = _get_mesh_dimensions(cell)
+        self.assertEqual(dimensions.shape, (len(cell.morphology.segments), 3))
+
+        for max_meshes in [10000, 200, 20]:
+            mesh_precision = _get_mesh_precision([dimensions], 4, max_meshes)
+            # the meshes that are created at this precision
+            meshdata = plot_3D_cell_morphology(
+                cell=cell,
+                current_canvas=object(),
+                current_view=object(),
+                nogui=True,
+                mesh_precision=mesh_precision,
+            )
+            if mesh_precision > 0:
+                self.assertLessEqual(len(meshdata), max_meshes)
+            if mesh_precision < 4:
+                meshdata = plot_3D_cell_morphology(
+                    cell=cell,
+                    current_canvas=object(),
+                    current_view=object(),
+                    nogui=True,
+                    mesh_precision=mesh_precision + 1,
+                )
+                self.assertGreater(len(meshdata), max_meshes)
+
+    def test_template_mesh_cache(self):
+        """Test that template meshes are reused"""
+        mesh = _get_template_mesh("cylinder", 1.0, 0.5, 10.0, 7, 9)
+        self.assertIs(mesh, _get_template_mesh("cylinder", 1.0, 0.5, 10.0, 7, 9))
+        self.assertIsNot(mesh, _get_template_mesh("cylinder", 1.0, 0.5, 10.0, 7, 10))
+        self.assertEqual(
+            mesh.n_vertices,
+            create_cylindrical_mesh(7, 9, [1.0, 0.5], 10.0, closed=True).n_vertices,
+        )
+
+    def test_meshdata_chunks(self):
+        """Test that chunks of mesh data cover all segments"""
+        nml_file = "tests/plot/L23-example/TestNetwork.net.nml"
+
+        doc, _ = _get_plottable_model(nml_file)
+        _, pop_id_vs_cell, positions, pop_id_vs_color, pop_id_vs_radii = (
+            extract_position_info(doc, False)
+        )
+        soma_positions, soma_sizes, soma_colors = _get_soma_points(
+            pop_id_vs_cell, positions, pop_id_vs_color, pop_id_vs_radii
+        )
+        num_cells = sum(len(pos_pop) for pos_pop in positions.values())
+        self.assertEqual(soma_positions.shape, (num_cells, 3))
+        self.assertEqual(soma_sizes.shape, (num_cells,))
+        self.assertEqual(soma_colors.shape, (num_cells, 4))
+
+        chunks = list(
+            _get_meshdata_chunks(
+                pop_id_vs_cell,
+                positions,
+                pop_id_vs_color,
+                pop_id_vs_radii,
+                chunk_segments=1,
+            )
+        )
+        # one cell per chunk
+        self.assertEqual(len(chunks), num_cells)
+
+        doc, _ = _get_plottable_model(nml_file)
+        _, pop_id_vs_cell, positions, pop_id_vs_color, pop_id_vs_radii = (
+            extract_position_info(doc, False)
+        )
+        meshdata = _get_meshdata(
+            pop_id_vs_cell, positions, pop_id_vs_color, pop_id_vs_radii
+        )
+        self.assertEqual(
+            sum(len(instances) for chunk in chunks for instances in chunk.values()),
+            sum(len(instances) for instances in meshdata.values()),
+        )
+        # the same meshes are used in all chunks
+        self.assertEqual(
+            set(key for chunk in chunks for key in chunk.keys()), set(meshdata.keys())
+        )
+
+    def test_point_data(self):
+        """Test that points are separated from meshes"""
+        segment = (
+            neuroml.Point3DWithDiam(x=0, y=0, z=0, diameter=2),
+            neuroml.Point3DWithDiam(x=0, y=0, z=1, diameter=2),
+            "red",
+            [0, 0, 0],
+        )
+        meshdata = {
+            ("5.0", "5.0", "5.0"): [
+                (None, None, "red", [1, 2, 3]),
+                (None, None, "blue", [4, 5, 6]),
+            ],
+            ("1.0", "1.0", "1.0"): [segment, (None, None, "#00ff00", [7, 8, 9])],
+        }
+        positions, sizes, colors = _get_point_data(meshdata, "detailed", 0.8)
+        self.assertEqual(list(meshdata.keys()), [("1.0", "1.0", "1.0")])
+        self.assertEqual(meshdata[("1.0", "1.0", "1.0")], [segment])
+        numpy.testing.assert_allclose(positions, [[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+        numpy.testing.assert_allclose(sizes, [10, 10, 2])
+        numpy.testing.assert_allclose(colors[:, :3], [[1, 0, 0], [0, 0, 1], [0, 1, 0]])
+
+        # minimum width
+        meshdata = {("0.1", "0.1", "0.1"): [(None, None, "red", [1, 2, 3])]}
+        positions, sizes, colors = _get_point_data(meshdata, "detailed", 0.8)
+        numpy.testing.assert_allclose(sizes, [1.6])
+        self.assertEqual(len(meshdata), 0)
+
     def test_PCA_transformation(self):
         """Test principle component axis rotation after PCA cell transformation"""
 
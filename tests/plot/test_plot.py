@@ -13,7 +13,10 @@ import unittest
 import logging
 import pathlib as pl
 
-from pyneuroml.plot import generate_plot, generate_interactive_plot
+import numpy
+
+from pyneuroml.plot import FigureContext, generate_plot, generate_interactive_plot
+from pyneuroml.plot.Plot import _lttb_downsample, _minmax_decimate, _resample
 from .. import BaseTestCase
 
 logger = logging.getLogger(__name__)
@@ -176,6 +179,109 @@ class TestPlot(BaseTestCase):
         self.assertIsFile(filename)
         pl.Path(filename).unlink()
 
+    def test_generate_plot_decimated(self):
+        """Test generate_plot with min/max decimation of long lines."""
+        xs = numpy.linspace(0, 10, 200000)
+        ys = numpy.sin(xs)
+        ys[123457] = 5.0
+        ax = generate_plot(
+            [xs], [ys], "Test decimated plot", show_plot_already=False
+        )
+        line = ax.lines[0]
+        width = ax.get_window_extent().width
+        self.assertLessEqual(len(line.get_xdata()), 2 * width + 2)
+        self.assertEqual(line.get_ydata().max(), 5.0)
+        self.assertEqual(line.get_xdata()[0], 0)
+        self.assertEqual(line.get_xdata()[-1], 10)
+
+        # zooming in recomputes the line from the full data
+        ax.set_xlim(1, 1.01)
+        start = numpy.searchsorted(xs, 1) - 1
+        stop = numpy.searchsorted(xs, 1.01, side="right") + 1
+        numpy.testing.assert_array_equal(line.get_xdata(), xs[start:stop])
+
+        ax = generate_plot(
+            [xs], [ys], "Test plot", show_plot_already=False, decimate=False
+        )
+        self.assertEqual(len(ax.lines[0].get_xdata()), len(xs))
+
+    def test_generate_plot_line_collection(self):
+        """Test generate_plot drawing many lines as a LineCollection."""
+        xs = numpy.linspace(0, 1, 100)
+        ys = [numpy.sin(xs) + i for i in range(20)]
+        ax = generate_plot(
+            [xs] * 20,
+            ys,
+            "Test line collection plot",
+            labels=[str(i) for i in range(20)],
+            show_plot_already=False,
+            line_collection_threshold=10,
+        )
+        self.assertEqual(len(ax.lines), 0)
+        self.assertEqual(len(ax.collections), 1)
+        self.assertEqual(len(ax.collections[0].get_segments()), 20)
+        self.assertIsNone(ax.get_legend())
+        self.assertLessEqual(ax.get_ylim()[0], 0)
+        self.assertGreaterEqual(ax.get_ylim()[1], 19)
+
+        ax = generate_plot(
+            [xs] * 20,
+            ys,
+            "Test plot",
+            show_plot_already=False,
+            line_collection_threshold=None,
+        )
+        self.assertEqual(len(ax.lines), 20)
+
+    def test_figure_context(self):
+        """Test FigureContext reuse of figures."""
+        xs = numpy.linspace(0, 1, 100)
+        filenames = [
+            "tests/plot/test_figure_context_0.png",
+            "tests/plot/test_figure_context_1.png",
+            "tests/plot/test_figure_context_1.svg",
+        ]
+        with FigureContext(
+            2, "Test figure context", labels=["a", "b"], xlim=[0, 1], ylim=[-2, 2]
+        ) as fc:
+            fig = fc.fig
+            fc.update([xs, xs], [numpy.sin(xs), numpy.cos(xs)])
+            fc.save(filenames[0])
+
+            fc.update([xs, xs[:10]], [xs * 5, xs[:10]], title="new", rescale=True)
+            self.assertIs(fc.fig, fig)
+            self.assertEqual(len(fc.lines[1].get_xdata()), 10)
+            self.assertGreaterEqual(fc.ax.get_ylim()[1], 5)
+            fc.save(filenames[1])
+            fc.save(filenames[2])
+
+            with self.assertRaises(ValueError):
+                fc.update([xs], [xs])
+
+        for filename in filenames:
+            self.assertIsFile(filename)
+            pl.Path(filename).unlink()
+
+    def test_minmax_decimate(self):
+        """Test _minmax_decimate"""
+        x = numpy.arange(100)
+        y = numpy.zeros(100)
+        y[[5, 17, 60]] = [1, -1, 2]
+        dx, dy = _minmax_decimate(x, y, 10)
+        self.assertLessEqual(len(dx), 22)
+        numpy.testing.assert_array_equal(numpy.diff(dx) > 0, True)
+        for i in [0, 5, 17, 60, 99]:
+            self.assertIn(i, dx)
+        numpy.testing.assert_array_equal(dy, y[dx])
+
+        # short series are not decimated
+        dx, dy = _minmax_decimate(x, y, 50)
+        self.assertEqual(len(dx), 100)
+
+        # only the view range and its neighbours are kept
+        dx, dy = _minmax_decimate(x, y, 50, xlim=(10.5, 20.5))
+        numpy.testing.assert_array_equal(dx, numpy.arange(10, 22))
+
     def test_generate_interactive_plot(self):
         """Test generate_interactive_plot function."""
         filename = "tests/plot/test_generate_interactive_plot.png"
@@ -208,6 +314,61 @@ class TestPlot(BaseTestCase):
         self.assertIsFile(filename)
         pl.Path(filename).unlink()
 
+    def test_generate_interactive_plot_resampled(self):
+        """Test generate_interactive_plot resampling of long traces."""
+        xs = numpy.linspace(0, 10, 100000)
+        ys = numpy.sin(xs)
+        ys[54321] = 5.0
+        for resampler in ["minmax", "lttb"]:
+            fig = generate_interactive_plot(
+                xvalues=[xs, xs[:100]],
+                yvalues=[ys, ys[:100]],
+                labels=["long", "short"],
+                title="test resampled interactive plot",
+                show_interactive=False,
+                max_points=1000,
+                resampler=resampler,
+            )
+            self.assertLessEqual(len(fig.data[0].x), 1000)
+            self.assertEqual(max(fig.data[0].y), 5.0)
+            self.assertEqual(len(fig.data[1].x), 100)
+
+        fig = generate_interactive_plot(
+            xvalues=[xs],
+            yvalues=[ys],
+            labels=["long"],
+            title="test interactive plot",
+            show_interactive=False,
+            max_points=None,
+        )
+        self.assertEqual(len(fig.data[0].x), len(xs))
+
+    def test_resample(self):
+        """Test _resample and _lttb_downsample"""
+        x = numpy.arange(1000.0)
+        y = numpy.zeros(1000)
+        y[500] = 1.0
+
+        indices = _lttb_downsample(x, y, 50)
+        self.assertEqual(len(indices), 50)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertIn(500, indices)
+        numpy.testing.assert_array_equal(numpy.diff(indices) > 0, True)
+
+        for method in ["minmax", "lttb"]:
+            rx, ry = _resample(x, y, 50, method)
+            self.assertLessEqual(len(rx), 50)
+            self.assertIn(500, rx)
+
+            # only the range in view is resampled
+            rx, ry = _resample(x, y, 50, method, xlim=(100, 200))
+            self.assertGreaterEqual(rx[0], 99)
+            self.assertLessEqual(rx[-1], 201)
+
+        with self.assertRaises(ValueError):
+            _resample(x, y, 50, "mean")
+
 
 if __name__ == "__main__":
     unittest.main()
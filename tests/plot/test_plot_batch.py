@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test pyneuroml.plot.PlotBatch module
+
+File: tests/plot/test_plot_batch.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import os
+import tempfile
+import unittest
+
+from pyneuroml.plot.PlotBatch import render_plots
+
+from .. import BaseTestCase
+
+
+class TestPlotBatch(BaseTestCase):
+    """Test PlotBatch module"""
+
+    def test_render_plots(self):
+        """Test render_plots"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jobs = [
+                {
+                    "function": "generate_plot",
+                    "kwargs": {
+                        "xvalues": [[0, 1, 2]],
+                        "yvalues": [[i, i + 1, i]],
+                        "title": f"plot {i}",
+                    },
+                    "output": os.path.join(tmpdir, f"plot{i}.png"),
+                }
+                for i in range(3)
+            ]
+            jobs.append(
+                {
+                    "function": "plot_spikes",
+                    "kwargs": {
+                        "spike_data": [
+                            {"name": "pop", "times": [0.1, 0.2], "ids": [0, 1]}
+                        ]
+                    },
+                    "output": os.path.join(tmpdir, "spikes.png"),
+                }
+            )
+            # mismatched lengths
+            jobs.append(
+                {
+                    "function": "generate_plot",
+                    "kwargs": {"xvalues": [[0]], "yvalues": [], "title": "bad"},
+                    "output": os.path.join(tmpdir, "bad.png"),
+                }
+            )
+            jobs.append({"function": "plot_3D", "output": "none.png"})
+
+            results = render_plots(jobs, max_workers=2)
+
+            self.assertEqual(len(results), len(jobs))
+            for job, result in zip(jobs[:4], results[:4]):
+                self.assertEqual(result["output"], job["output"])
+                self.assertIsNone(result["error"])
+                self.assertGreater(result["time"], 0)
+                self.assertIsFile(job["output"])
+
+            self.assertIn("ValueError", results[4]["error"])
+            self.assertFalse(os.path.exists(jobs[4]["output"]))
+            self.assertIn("Unknown plot function", results[5]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
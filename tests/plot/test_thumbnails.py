@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test thumbnail cache
+
+File: tests/plot/test_thumbnails.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from PIL import Image
+
+from pyneuroml.plot.PlotThumbnails import THUMBNAIL_SIZES, ThumbnailCache
+
+from .. import BaseTestCase
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+class TestThumbnails(BaseTestCase):
+    """Test PlotThumbnails module"""
+
+    def setUp(self):
+        """Use a temporary cache directory"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.nml_file = "tests/plot/Cell_497232312.cell.nml"
+
+    def tearDown(self):
+        """Remove the temporary cache directory"""
+        shutil.rmtree(self.cache_dir)
+
+    def test_get_thumbnail(self):
+        """Test that thumbnails are rendered once and then reused"""
+        cache = ThumbnailCache(self.cache_dir)
+        thumbnail = cache.get_thumbnail(
+            self.nml_file, size="small", plot_type="constant"
+        )
+        self.assertIsFile(thumbnail)
+        with Image.open(thumbnail) as image:
+            self.assertEqual(max(image.size), THUMBNAIL_SIZES["small"])
+
+        # all sizes are generated together
+        with mock.patch("pyneuroml.plot.PlotMorphology.plot_2D") as plot_2D:
+            another_cache = ThumbnailCache(self.cache_dir)
+            large = another_cache.get_thumbnail(
+                self.nml_file, size="large", plot_type="constant"
+            )
+            plot_2D.assert_not_called()
+        with Image.open(large) as image:
+            self.assertEqual(max(image.size), THUMBNAIL_SIZES["large"])
+
+        # different options give different thumbnails
+        self.assertNotEqual(
+            cache.get_key(self.nml_file, plot_type="constant"),
+            cache.get_key(self.nml_file, plot_type="detailed"),
+        )
+
+        with self.assertRaises(ValueError):
+            cache.get_thumbnail(self.nml_file, size="huge")
+
+        # thumbnails that were just rendered are kept, even if the cache is
+        # too small for them
+        small_cache = ThumbnailCache(self.cache_dir, max_bytes=1)
+        thumbnail = small_cache.get_thumbnail(
+            self.nml_file, size="small", plot_type="detailed"
+        )
+        self.assertIsFile(thumbnail)
+        self.assertEqual(len(small_cache._get_thumbnail_files()), len(THUMBNAIL_SIZES))
+
+    def test_get_key_includes(self):
+        """Test that included files are part of the key"""
+        shutil.copy("tests/plot/test.cell.nml", self.cache_dir)
+        network_file = os.path.join(self.cache_dir, "net.nml")
+        with open(network_file, "w") as f:
+            f.write('<neuroml><include href="test.cell.nml"/></neuroml>')
+
+        cache = ThumbnailCache(self.cache_dir)
+        key = cache.get_key(network_file)
+        with open(os.path.join(self.cache_dir, "test.cell.nml"), "a") as f:
+            f.write("\n")
+        self.assertNotEqual(key, cache.get_key(network_file))
+
+    def test_evict(self):
+        """Test that least recently used thumbnails are evicted"""
+        cache = ThumbnailCache(self.cache_dir)
+        for i in range(3):
+            with open(os.path.join(self.cache_dir, f"{i}_small.png"), "wb") as f:
+                f.write(b"0" * 100)
+            os.utime(f.name, (i, i))
+
+        cache.max_bytes = 250
+        cache.evict()
+        self.assertEqual(cache.get_size(), 200)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "0_small.png")))
+
+        cache.clear()
+        self.assertEqual(cache.get_size(), 0)
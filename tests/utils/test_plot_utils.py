@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test plot utils
+
+File: tests/utils/test_plot_utils.py
+
+Copyright 2024 NeuroML contributors
+"""
+
+import matplotlib
+import numpy
+from matplotlib import pyplot as plt
+
+from pyneuroml.utils.plot import (
+    LineDataUnits,
+    add_box_to_matplotlib_2D_plot,
+    add_boxes_to_matplotlib_2D_plot,
+    add_density_image_to_matplotlib_2D_plot,
+    add_lines_to_matplotlib_2D_plot,
+    add_points_to_matplotlib_2D_plot,
+)
+
+from .. import BaseTestCase
+
+
+class TestPlotUtils(BaseTestCase):
+    """Test plot utils module"""
+
+    def test_add_lines_to_matplotlib_2D_plot(self):
+        """Test add_lines_to_matplotlib_2D_plot"""
+        fig, ax = plt.subplots(1, 1)
+        axis_min_max = [float("inf"), -1 * float("inf")]
+        collections = add_lines_to_matplotlib_2D_plot(
+            ax,
+            numpy.array([[0, 10], [5, 5], [-3, 2]]),
+            numpy.array([[0, 10], [5, 5], [1, 1]]),
+            numpy.array([1.0, 2.0, 3.0]),
+            ["r", "g", "b"],
+            axis_min_max,
+        )
+        # one collection for points (drawn as circles), one for all lines
+        self.assertEqual(len(collections), 2)
+        self.assertEqual(len(collections[0].get_segments()), 1)
+        self.assertEqual(len(collections[1].get_segments()), 3)
+        self.assertEqual(axis_min_max[0], -3)
+        self.assertEqual(axis_min_max[1], 10)
+        numpy.testing.assert_allclose(
+            collections[0].get_colors(), [matplotlib.colors.to_rgba("g")]
+        )
+
+        # widths in data units match those of LineDataUnits
+        line = LineDataUnits([0, 10], [0, 10], linewidth=1.0)
+        ax.add_line(line)
+        fig.canvas.draw()
+        self.assertAlmostEqual(collections[1].get_linewidths()[0], line.get_linewidth())
+        self.assertAlmostEqual(
+            collections[1].get_linewidths()[2], 3 * line.get_linewidth()
+        )
+        plt.close(fig)
+
+    def test_add_points_to_matplotlib_2D_plot(self):
+        """Test add_points_to_matplotlib_2D_plot"""
+        fig, ax = plt.subplots(1, 1)
+        axis_min_max = [float("inf"), -1 * float("inf")]
+        collection = add_points_to_matplotlib_2D_plot(
+            ax,
+            numpy.array([0.0, 10.0, -3.0]),
+            numpy.array([0.0, 0.0, 0.0]),
+            numpy.array([1.0, 2.0, 4.0]),
+            ["r", "g", "b"],
+            axis_min_max,
+        )
+        self.assertEqual(len(collection.get_offsets()), 3)
+        self.assertEqual(axis_min_max, [-3, 10])
+        # data limits include the whole circles
+        numpy.testing.assert_allclose(ax.dataLim.bounds, [-5, -2, 16, 4])
+        numpy.testing.assert_allclose(
+            collection.get_facecolors()[1], matplotlib.colors.to_rgba("g")
+        )
+        plt.close(fig)
+
+    def test_add_density_image_to_matplotlib_2D_plot(self):
+        """Test add_density_image_to_matplotlib_2D_plot"""
+        fig, ax = plt.subplots(1, 1)
+        axis_min_max = [float("inf"), -1 * float("inf")]
+        xs = numpy.array([0.0, 0.1, 0.2, 9.9, 10.0])
+        ys = numpy.array([0.0, 0.1, 0.2, 4.9, 5.0])
+        image = add_density_image_to_matplotlib_2D_plot(
+            ax, xs, ys, "r", axis_min_max, bins=(10, 5)
+        )
+        data = image.get_array()
+        self.assertEqual(data.shape, (5, 10, 4))
+        # most dense bin is opaque, empty bins are transparent
+        self.assertAlmostEqual(data[0, 0, 3], 1.0)
+        self.assertAlmostEqual(data[2, 5, 3], 0.0)
+        self.assertGreater(data[4, 9, 3], 0.0)
+        numpy.testing.assert_allclose(data[0, 0, :3], [1, 0, 0])
+        self.assertEqual(axis_min_max, [0, 10])
+        plt.close(fig)
+
+    def test_add_boxes_to_matplotlib_2D_plot(self):
+        """Test add_boxes_to_matplotlib_2D_plot"""
+        fig, ax = plt.subplots(1, 1)
+        collection = add_boxes_to_matplotlib_2D_plot(
+            ax,
+            numpy.array([0.0, 5.0]),
+            numpy.array([0.0, -2.0]),
+            heights=numpy.array([1.0, 3.0]),
+            widths=2.0,
+            colors=["r", "g"],
+        )
+        # same corners as rectangle patches
+        add_box_to_matplotlib_2D_plot(ax, [5.0, -2.0], height=3.0, width=2.0, color="g")
+        numpy.testing.assert_allclose(
+            collection.get_paths()[1].vertices[:4],
+            ax.patches[0]
+            .get_patch_transform()
+            .transform(ax.patches[0].get_path().vertices)[:4],
+        )
+        numpy.testing.assert_allclose(ax.dataLim.bounds, [0, -2, 7, 3])
+        numpy.testing.assert_allclose(
+            collection.get_facecolors()[0], matplotlib.colors.to_rgba("r")
+        )
+        plt.close(fig)